@@ -0,0 +1,130 @@
+"""
+Проверка времени холодного импорта particleswarm.
+
+Каждая инструкция выполняется в отдельном процессе с -X importtime, время берется
+из суммарного (cumulative) времени всех импортов, выполненных инструкцией. Учитываются
+и модули, которые загружаются лениво через particleswarm.__getattr__ уже после импорта
+пакета (например, numpy при первом обращении к Swarm).
+Программа завершается с кодом 1, если импорт particleswarm превысил бюджет
+или загрузил модули, которые должны загружаться только при первом использовании.
+
+Запуск из корня репозитория:
+    python benchmarks/import_time.py --budget-ms 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Модули, которые "import particleswarm" не должен загружать
+HEAVY_MODULES = [
+    "numpy",
+    "multiprocessing",
+    "concurrent.futures",
+    "cProfile",
+    "OpenGL",
+    "glfw",
+    "tkinter",
+    "numba",
+]
+
+# Строка, которую процесс выводит в stderr перед инструкцией: импорты до нее
+# выполняет сам интерпретатор при запуске
+_START_MARKER = "particleswarm-import-time-start"
+
+# Инструкции, время которых выводится для сведения
+REPORTED_STATEMENTS = [
+    "from particleswarm import Swarm",
+    "from particleswarm import SwarmRastrigin",
+    "import particleswarm.cli",
+]
+
+
+def measureImport(statement, repeat):
+    """
+    Лучшее из repeat измерений суммарного времени импортов, выполненных statement,
+    в микросекундах и список модулей, загруженных к концу выполнения statement
+    """
+    environment = dict(os.environ, PYTHONPATH=str(ROOT))
+    environment.pop("PARTICLESWARM_PROFILE", None)
+
+    script = (
+        "import sys\n"
+        "print({!r}, file=sys.stderr, flush=True)\n"
+        "{}\n"
+        "print('\\n'.join(sys.modules), file=sys.stdout)"
+    ).format(_START_MARKER, statement)
+
+    best = None
+    modules = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            env=environment,
+            check=True,
+        )
+
+        total = 0
+        lines = completed.stderr.splitlines()
+        for line in lines[lines.index(_START_MARKER) + 1:]:
+            # Формат строки: "import time: self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+
+            _, cumulative, name = line[len("import time:"):].split("|")
+            # Вложенные импорты записаны с дополнительным отступом и уже учтены в cumulative
+            if not name.startswith("  "):
+                total += int(cumulative)
+
+        best = total if best is None else min(best, total)
+        modules = completed.stdout.split()
+
+    return best, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import time budget for particleswarm")
+    parser.add_argument(
+        "--budget-ms", type=float, default=15.0, help="budget for 'import particleswarm'"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per statement")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    packageTime, modules = measureImport("import particleswarm", args.repeat)
+    print("{:<45} {:8.2f} ms".format("import particleswarm", packageTime / 1000.0))
+
+    if packageTime / 1000.0 > args.budget_ms:
+        failures.append(
+            "import particleswarm took {:.2f} ms, budget is {:.2f} ms".format(
+                packageTime / 1000.0, args.budget_ms
+            )
+        )
+
+    loadedHeavy = [
+        name
+        for name in HEAVY_MODULES
+        if any(module == name or module.startswith(name + ".") for module in modules)
+    ]
+    if loadedHeavy:
+        failures.append("import particleswarm loaded " + ", ".join(loadedHeavy))
+
+    for statement in REPORTED_STATEMENTS:
+        statementTime, _ = measureImport(statement, args.repeat)
+        print("{:<45} {:8.2f} ms".format(statement, statementTime / 1000.0))
+
+    for failure in failures:
+        print("FAILED", failure)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Качество оптимизации встроенных целевых функций при хранении состояния роя
+в float64 и float32 (параметр dtype класса Swarm).
+
+Запуск из корня репозитория:
+    python benchmarks/precision.py --dimension 10 --swarmsize 2000 --iterations 300 --runs 5
+
+Для каждой функции и каждого типа выводятся медиана и разброс лучшего значения по запускам
+с одинаковыми начальными значениями генератора. Результаты на x86-64 (--backend numpy --runs 10):
+
+--dimension 10 --swarmsize 2000 --iterations 300
+     objective   dtype    median best        min        max
+     rastrigin float64        6.53469     3.9798      17.04
+     rastrigin float32        6.60454     2.9865     9.2886
+      schwefel float64         1456.4     855.27     1710.9
+      schwefel float32        1476.28     1315.3     1703.7
+    paraboloid float64      0.0619677   0.009337     1.1854
+    paraboloid float32      0.0627528  0.0043165     1.1079
+
+--dimension 2 --swarmsize 2000 --iterations 300
+     objective   dtype    median best        min        max
+     rastrigin float64              0          0          0
+     rastrigin float32              0          0          0
+      schwefel float64    2.54551e-05 2.5455e-05 2.5455e-05
+      schwefel float32   -6.10352e-05 -6.1035e-05          0
+    paraboloid float64   5.67437e-110 1.8808e-110 1.5476e-107
+    paraboloid float32              0          0          0
+
+Пока рой не сошелся, качество определяется тем, в какой локальный минимум он попал,
+и float32 не хуже float64. После сходимости значение целевой функции в float32 известно
+с абсолютной ошибкой порядка 1e-7 от ее величины: для функции Швефеля (около 838 в двумерном
+случае до вычитания) это 1e-4, поэтому найденный минимум может оказаться даже "ниже"
+истинного. Для окончательного значения лучшее положение роя (оно хранится в float64)
+надо пересчитать в float64
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from particleswarm.objectives import OBJECTIVES  # noqa: E402
+
+DTYPES = ["float64", "float32"]
+
+
+def runObjective(objective, dtype, dimension, swarmsize, iterations, runs, backend="auto"):
+    """
+    Лучшие значения целевой функции runs запусков с начальными значениями 0 .. runs - 1
+    """
+    swarmClass, bound = OBJECTIVES[objective]
+    bestFinalFuncs = []
+
+    for seed in range(runs):
+        with swarmClass(
+            swarmsize,
+            [-bound] * dimension,
+            [bound] * dimension,
+            0.5,
+            2.0,
+            5.0,
+            seed=seed,
+            dtype=dtype,
+            backend=backend,
+        ) as swarm:
+            bestFinalFuncs.append(swarm.run(maxIterations=iterations).bestFinalFunc)
+
+    return np.array(bestFinalFuncs)
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Compare float64 and float32 swarm quality")
+    parser.add_argument(
+        "--objectives", nargs="+", choices=list(OBJECTIVES), default=list(OBJECTIVES)
+    )
+    parser.add_argument("--dimension", type=int, default=10)
+    parser.add_argument("--swarmsize", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5, help="independent runs per case")
+    parser.add_argument(
+        "--backend", choices=["auto", "numpy", "numba"], default="auto", help="iteration backend"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+
+    print(
+        "{:>10} {:>7} {:>14} {:>10} {:>10}".format("objective", "dtype", "median best", "min", "max")
+    )
+    for objective in args.objectives:
+        for dtype in DTYPES:
+            bestFinalFuncs = runObjective(
+                objective,
+                dtype,
+                args.dimension,
+                args.swarmsize,
+                args.iterations,
+                args.runs,
+                args.backend,
+            )
+            print(
+                "{:>10} {:>7} {:>14.6g} {:>10.5g} {:>10.5g}".format(
+                    objective,
+                    dtype,
+                    np.median(bestFinalFuncs),
+                    bestFinalFuncs.min(),
+                    bestFinalFuncs.max(),
+                )
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
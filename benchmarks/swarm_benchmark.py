@@ -0,0 +1,246 @@
+"""
+Микробенчмарки горячих участков particleswarm: создание роя, одна итерация,
+расчет целевой функции и штрафа для сетки размеров роя и размерностей задачи.
+
+Запуск из корня репозитория:
+    python benchmarks/swarm_benchmark.py --output bench.json
+    python benchmarks/swarm_benchmark.py --baseline bench.json --tolerance 0.2
+    python benchmarks/swarm_benchmark.py --dtype float32 --backend numpy
+
+--dtype и --backend выбирают тип чисел состояния роя и способ выполнения итерации
+(см. Swarm). Качество оптимизации в float32 сравнивается в benchmarks/precision.py
+
+При сравнении с сохраненным результатом программа завершается с кодом 1,
+если хотя бы одно измерение стало медленнее больше чем на tolerance
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from particleswarm.objectives import OBJECTIVES  # noqa: E402
+
+SWARM_SIZES = [100, 1000, 10000, 100000]
+DIMENSIONS = [2, 10, 100, 1000]
+
+# Измерения, которые сравниваются с сохраненным результатом
+TIMINGS = ["constructTime", "iterationTime", "evaluateTime", "penaltyTime"]
+
+
+def createSwarm(objective, swarmsize, dimension, backend="auto", dtype="float64"):
+    swarmClass, bound = OBJECTIVES[objective]
+    return swarmClass(
+        swarmsize,
+        [-bound] * dimension,
+        [bound] * dimension,
+        0.5,
+        2.0,
+        5.0,
+        seed=0,
+        backend=backend,
+        dtype=dtype,
+    )
+
+
+def bestTime(function, repeat):
+    """
+    Лучшее время выполнения function из repeat попыток
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def measurePeakMemory(objective, swarmsize, dimension, backend, dtype):
+    """
+    Пиковый объем памяти, выделенной при создании роя и одной итерации
+    """
+    tracemalloc.start()
+    try:
+        swarm = createSwarm(objective, swarmsize, dimension, backend, dtype)
+        swarm.nextIteration()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    swarm.close()
+    return peak
+
+
+def benchmarkCase(objective, swarmsize, dimension, repeat, backend="auto", dtype="float64"):
+    constructTime = bestTime(
+        lambda: createSwarm(objective, swarmsize, dimension, backend, dtype).close(), repeat
+    )
+
+    # Первая итерация не измеряется: в ней компилируется ядро Numba
+    swarm = createSwarm(objective, swarmsize, dimension, backend, dtype)
+    swarm.nextIteration()
+    backend = swarm.backend
+
+    iterationTime = bestTime(swarm.nextIteration, repeat)
+    evaluateTime = bestTime(lambda: swarm._finalFuncBatch(swarm.positions), repeat)
+    penaltyTime = bestTime(lambda: swarm._getPenaltyBatch(swarm.positions, 10000.0), repeat)
+    swarm.close()
+
+    return {
+        "objective": objective,
+        "swarmsize": swarmsize,
+        "dimension": dimension,
+        "backend": backend,
+        "dtype": dtype,
+        "constructTime": constructTime,
+        "iterationTime": iterationTime,
+        "evaluateTime": evaluateTime,
+        "penaltyTime": penaltyTime,
+        "updatesPerSecond": swarmsize / iterationTime,
+        "peakMemory": measurePeakMemory(objective, swarmsize, dimension, backend, dtype),
+    }
+
+
+def runBenchmarks(
+    objectives, sizes, dimensions, repeat, maxElements, backend="auto", dtype="float64"
+):
+    results = []
+    for objective in objectives:
+        for swarmsize in sizes:
+            for dimension in dimensions:
+                if swarmsize * dimension > maxElements:
+                    continue
+
+                result = benchmarkCase(
+                    objective, swarmsize, dimension, repeat, backend, dtype
+                )
+                results.append(result)
+                print(
+                    "{objective:>10} {backend:<5} {dtype:<7} N={swarmsize:<7} D={dimension:<5} "
+                    "iteration {iterationTime:.6f} s  {updatesPerSecond:,.0f} updates/s  "
+                    "peak {peakMemory:,} B".format(**result)
+                )
+
+    return results
+
+
+def compareWithBaseline(results, baseline, tolerance):
+    """
+    Сравнить результаты с сохраненными. Сравниваются только измерения с тем же
+    выполненным способом итерации и типом чисел. Возвращает список описаний замедлений
+    """
+    def key(result):
+        # В результатах, сохраненных до появления backend и dtype, итерация выполнялась
+        # через NumPy во float64
+        return (
+            result["objective"],
+            result["swarmsize"],
+            result["dimension"],
+            result.get("backend", "numpy"),
+            result.get("dtype", "float64"),
+        )
+
+    baselineResults = {key(result): result for result in baseline["results"]}
+
+    regressions = []
+    for result in results:
+        old = baselineResults.get(key(result))
+        if old is None:
+            print("NO BASELINE {} N={} D={} {} {}".format(*key(result)))
+            continue
+
+        for timing in TIMINGS:
+            if result[timing] > old[timing] * (1.0 + tolerance):
+                regressions.append(
+                    "{} N={} D={} {} {} {}: {:.6f} s -> {:.6f} s ({:+.0%})".format(
+                        *key(result),
+                        timing,
+                        old[timing],
+                        result[timing],
+                        result[timing] / old[timing] - 1.0,
+                    )
+                )
+
+    return regressions
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for particleswarm hot paths")
+    parser.add_argument(
+        "--objectives", nargs="+", choices=list(OBJECTIVES), default=list(OBJECTIVES)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=SWARM_SIZES)
+    parser.add_argument("--dimensions", nargs="+", type=int, default=DIMENSIONS)
+    parser.add_argument("--repeat", type=int, default=5, help="attempts per measurement")
+    parser.add_argument(
+        "--max-elements",
+        type=int,
+        default=20_000_000,
+        help="skip cases where swarmsize * dimension exceeds this value",
+    )
+    parser.add_argument(
+        "--backend", choices=["auto", "numpy", "numba"], default="auto", help="iteration backend"
+    )
+    parser.add_argument(
+        "--dtype", choices=["float64", "float32"], default="float64", help="swarm state precision"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare results with this JSON file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative slowdown compared with the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+
+    results = runBenchmarks(
+        args.objectives,
+        args.sizes,
+        args.dimensions,
+        args.repeat,
+        args.max_elements,
+        args.backend,
+        args.dtype,
+    )
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compareWithBaseline(results, json.load(file), args.tolerance)
+
+        for regression in regressions:
+            print("REGRESSION", regression)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
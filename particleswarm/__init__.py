@@ -1 +1,47 @@
-from .swarm import Swarm
+import importlib
+import os
+
+# Имена пакета и модули, из которых они загружаются при первом обращении.
+# Сам импорт particleswarm не загружает ни numpy, ни тяжелые подсистемы
+_LAZY_ATTRIBUTES = {
+    "Swarm": ".swarm",
+    "Particle": ".particle",
+    "SwarmRastrigin": ".objectives",
+    "SwarmSchwefel": ".objectives",
+    "SwarmX2": ".objectives",
+    "Instrumentation": ".instrumentation",
+    "CheckpointWriter": ".checkpoint",
+    "TrajectoryRecorder": ".trajectory",
+    "TrajectoryReader": ".trajectory",
+    "ChunkedSwarm": ".outofcore",
+    "OptimizerThread": ".worker",
+    "Telemetry": ".telemetry",
+    "RunResult": ".stopping",
+    "StopReason": ".stopping",
+    "ProcessPoolEvaluator": ".parallel",
+    "IslandModel": ".islands",
+    "runRestarts": ".restarts",
+    "profile": ".profiling",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    moduleName = _LAZY_ATTRIBUTES.get(name)
+    if moduleName is None:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    value = getattr(importlib.import_module(moduleName, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if os.environ.get("PARTICLESWARM_PROFILE"):
+    from .profiling import startFromEnvironment
+
+    startFromEnvironment()
@@ -0,0 +1,118 @@
+"""
+Ядра итерации роя, компилируемые Numba. Модуль импортируется только через
+particleswarm.kernels, когда выбран backend "numba"
+"""
+
+import math
+
+import numba
+
+# Номера встроенных целевых функций
+RASTRIGIN = 0
+SCHWEFEL = 1
+PARABOLOID = 2
+
+# Номера способов обработки границ
+PENALTY = 0
+CLIP = 1
+REFLECT = 2
+PERIODIC = 3
+
+
+@numba.njit(parallel=True, cache=True)
+def fusedIteration(
+    positions,
+    velocities,
+    localBestPositions,
+    localBestFinalFuncs,
+    finalFuncs,
+    improved,
+    coefficients,
+    bestPositions,
+    commonRatio,
+    localVelocityRatio,
+    globalVelocityRatio,
+    maxVelocity,
+    minvalues,
+    maxvalues,
+    objective,
+    boundary,
+    penaltyRatio,
+):
+    """
+    Одна итерация роя за один проход по частицам: скорость, положение, обработка границ,
+    целевая функция со штрафом и лучшее положение частицы. Все массивы изменяются на месте
+    coefficients - случайные коэффициенты скорости, массив (2, swarmsize, dimension)
+    bestPositions - лучшие положения соседей: (swarmsize, dimension) или (1, dimension),
+        если они общие для всего роя
+    maxVelocity - ограничение скорости (dimension,) или пустой вектор
+    """
+    swarmsize, dimension = positions.shape
+    # Для общего лучшего положения всегда берется строка 0
+    bestStride = 0 if bestPositions.shape[0] == 1 else 1
+    clampVelocity = maxVelocity.shape[0] > 0
+
+    # Порядок операций тот же, что в Swarm._updateVelocities
+    localFactor = commonRatio * localVelocityRatio
+    globalFactor = commonRatio * globalVelocityRatio
+
+    for i in numba.prange(swarmsize):
+        bestRow = i * bestStride
+        value = 0.0
+        penalty = 0.0
+
+        for j in range(dimension):
+            position = positions[i, j]
+            velocity = (
+                commonRatio * velocities[i, j]
+                + localFactor * coefficients[0, i, j] * (localBestPositions[i, j] - position)
+                + globalFactor * coefficients[1, i, j] * (bestPositions[bestRow, j] - position)
+            )
+
+            if clampVelocity:
+                velocity = min(max(velocity, -maxVelocity[j]), maxVelocity[j])
+
+            position += velocity
+            low = minvalues[j]
+            high = maxvalues[j]
+
+            if boundary == CLIP:
+                if position < low or position > high:
+                    position = min(max(position, low), high)
+                    velocity = 0.0
+            elif boundary == REFLECT:
+                if position < low or position > high:
+                    width = high - low
+                    shifted = (position - low) % (2.0 * width)
+                    position = low + width - abs(shifted - width)
+                    velocity = -velocity
+            elif boundary == PERIODIC:
+                position = low + (position - low) % (high - low)
+
+            positions[i, j] = position
+            velocities[i, j] = velocity
+
+            if objective == RASTRIGIN:
+                value += position * position - 10.0 * math.cos(2.0 * math.pi * position)
+            elif objective == SCHWEFEL:
+                value -= position * math.sin(math.sqrt(abs(position)))
+            else:
+                value += position * position
+
+            penalty += max(low - position, 0.0) + max(position - high, 0.0)
+
+        if objective == RASTRIGIN:
+            value += 10.0 * dimension
+        elif objective == SCHWEFEL:
+            value += 418.9829 * dimension
+
+        finalFunc = value + penaltyRatio * penalty
+        finalFuncs[i] = finalFunc
+
+        if finalFunc < localBestFinalFuncs[i]:
+            improved[i] = True
+            localBestFinalFuncs[i] = finalFunc
+            for j in range(dimension):
+                localBestPositions[i, j] = positions[i, j]
+        else:
+            improved[i] = False
@@ -0,0 +1,131 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+
+def getPenalty(positions, minvalues, maxvalues, ratio):
+    """
+    Рассчитать штрафную функцию для каждой строки матрицы positions
+    positions - матрица (N, dimension) координат, для которых рассчитывается штраф
+    minvalues, maxvalues - границы области поиска для каждой координаты
+    ratio - вес штрафа
+    """
+    penalty1 = np.maximum(minvalues - positions, 0.0).sum(axis=1)
+    penalty2 = np.maximum(positions - maxvalues, 0.0).sum(axis=1)
+
+    return ratio * (penalty1 + penalty2)
+
+
+class Boundary(metaclass=ABCMeta):
+    """
+    Базовый класс для способа обработки выхода частиц за границы области поиска.
+    Обработка выполняется сразу для всей матрицы положений роя
+    """
+
+    @abstractmethod
+    def apply(self, swarm):
+        """
+        Скорректировать положения (и при необходимости скорости) частиц роя на месте
+        """
+        pass
+
+
+class PenaltyBoundary(Boundary):
+    """
+    Частицы могут свободно покидать область поиска, выход за границы учитывается
+    только штрафом в целевой функции
+    """
+
+    def apply(self, swarm):
+        pass
+
+
+class ClipBoundary(Boundary):
+    """
+    Координаты, вышедшие за границы, прижимаются к границе, а соответствующие
+    компоненты скорости обнуляются
+    """
+
+    def apply(self, swarm):
+        positions = swarm.positions
+        outside = (positions < swarm.minvalues) | (positions > swarm.maxvalues)
+
+        np.clip(positions, swarm.minvalues, swarm.maxvalues, out=positions)
+        swarm.velocities[outside] = 0.0
+
+
+class ReflectBoundary(Boundary):
+    """
+    Координаты, вышедшие за границы, отражаются от границы внутрь области,
+    соответствующие компоненты скорости меняют знак
+    """
+
+    def apply(self, swarm):
+        positions = swarm.positions
+        outside = (positions < swarm.minvalues) | (positions > swarm.maxvalues)
+
+        # Многократное отражение эквивалентно периодическому продолжению с периодом 2 * width
+        width = swarm.maxvalues - swarm.minvalues
+        shifted = np.mod(positions - swarm.minvalues, 2.0 * width)
+        positions[...] = swarm.minvalues + width - np.abs(shifted - width)
+
+        np.negative(swarm.velocities, out=swarm.velocities, where=outside)
+
+
+class PeriodicBoundary(Boundary):
+    """
+    Область поиска замыкается сама на себя: вышедшая за верхнюю границу частица
+    появляется у нижней и наоборот
+    """
+
+    def apply(self, swarm):
+        positions = swarm.positions
+        width = swarm.maxvalues - swarm.minvalues
+
+        positions[...] = swarm.minvalues + np.mod(positions - swarm.minvalues, width)
+
+
+class RandomBoundary(Boundary):
+    """
+    Координаты, вышедшие за границы, заменяются случайными значениями из области поиска
+    """
+
+    def apply(self, swarm):
+        positions = swarm.positions
+        outside = (positions < swarm.minvalues) | (positions > swarm.maxvalues)
+
+        if not outside.any():
+            return
+
+        # Последний индекс - номер координаты, массив положений может иметь любую размерность
+        index = np.nonzero(outside)
+        cols = index[-1]
+        width = swarm.maxvalues - swarm.minvalues
+        positions[index] = swarm.rng.random(len(cols)) * width[cols] + swarm.minvalues[cols]
+
+
+_BOUNDARIES = {
+    "penalty": PenaltyBoundary,
+    "clip": ClipBoundary,
+    "reflect": ReflectBoundary,
+    "periodic": PeriodicBoundary,
+    "random": RandomBoundary,
+}
+
+
+def createBoundary(boundary) -> Boundary:
+    """
+    Возвращает объект обработки границ
+    boundary - экземпляр Boundary или имя режима: "penalty", "clip", "reflect", "periodic", "random"
+    """
+    if isinstance(boundary, Boundary):
+        return boundary
+
+    if boundary not in _BOUNDARIES:
+        raise ValueError(
+            "Unknown boundary mode '{}', expected one of: {}".format(
+                boundary, ", ".join(_BOUNDARIES)
+            )
+        )
+
+    return _BOUNDARIES[boundary]()
@@ -0,0 +1,146 @@
+"""
+Контрольные точки роя.
+
+Состояние роя (Swarm.getState) записывается в файл .npz: массивы положений, скоростей
+и лучших значений, их тип чисел, коэффициенты, счетчики, время выполнения итераций,
+состояние генератора случайных чисел и состояние топологии. Продолжение с контрольной точки повторяет траекторию
+непрерывного запуска в точности.
+
+CheckpointWriter подключается к рою как функция, вызываемая после итерации,
+и сохраняет контрольную точку каждые interval итераций, при необходимости в фоновом потоке
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+# Версия формата файла контрольной точки
+CHECKPOINT_VERSION = 2
+
+
+def writeCheckpoint(path, state):
+    """
+    Записать состояние роя state (словарь из Swarm.getState) в файл path.
+    Файл сначала пишется во временный, а затем переименовывается,
+    поэтому прерванная запись не портит предыдущую контрольную точку
+    """
+    arrays = {name: value for name, value in state.items() if name != "rngState"}
+    arrays["rngState"] = np.array(json.dumps(state["rngState"]))
+    arrays["version"] = np.array(CHECKPOINT_VERSION)
+
+    temporaryPath = "{}.tmp".format(path)
+    with open(temporaryPath, "wb") as file:
+        np.savez(file, **arrays)
+
+    os.replace(temporaryPath, path)
+
+
+def readCheckpoint(path):
+    """
+    Прочитать состояние роя из файла контрольной точки path
+    """
+    with np.load(path, allow_pickle=False) as data:
+        state = {name: data[name] for name in data.files}
+
+    version = int(state.pop("version"))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(
+            "Unsupported checkpoint version {} in '{}', expected {}".format(
+                version, path, CHECKPOINT_VERSION
+            )
+        )
+
+    state["rngState"] = json.loads(str(state["rngState"]))
+    return state
+
+
+class CheckpointWriter:
+    """
+    Периодическое сохранение контрольных точек роя:
+
+        writer = CheckpointWriter("run.npz", interval=100)
+        swarm.addIterationCallback(writer)
+        ...
+        writer.close()
+
+    В асинхронном режиме рой копирует свое состояние, а запись в файл выполняется
+    в фоновом потоке. Одновременно записывается не больше одной контрольной точки:
+    если предыдущая запись еще не закончилась, итерация ждет ее завершения
+    """
+
+    def __init__(self, path, interval: int = 100, asynchronous: bool = True):
+        """
+        path - файл контрольной точки, перезаписывается при каждом сохранении
+        interval - период сохранения в итерациях
+        asynchronous - True - записывать файл в фоновом потоке
+        """
+        assert interval >= 1
+
+        self._path = path
+        self._interval = interval
+        self._asynchronous = asynchronous
+        self._thread = None
+        self._error = None
+        self._savedIteration = None
+
+    def __call__(self, swarm):
+        if swarm.iteration % self._interval == 0:
+            self.save(swarm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def save(self, swarm):
+        """
+        Сохранить контрольную точку роя swarm
+        """
+        state = swarm.getState()
+
+        if not self._asynchronous:
+            writeCheckpoint(self._path, state)
+            self._savedIteration = swarm.iteration
+            return
+
+        self.wait()
+        self._thread = threading.Thread(
+            target=self._write, args=(state, swarm.iteration), daemon=True
+        )
+        self._thread.start()
+
+    def _write(self, state, iteration):
+        try:
+            writeCheckpoint(self._path, state)
+            self._savedIteration = iteration
+        except Exception as error:
+            self._error = error
+
+    def wait(self):
+        """
+        Дождаться окончания фоновой записи. Ошибка фоновой записи выбрасывается здесь
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        self.wait()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def savedIteration(self):
+        """
+        Номер итерации последней записанной контрольной точки или None
+        """
+        return self._savedIteration
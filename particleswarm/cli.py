@@ -0,0 +1,321 @@
+"""
+Запуск оптимизации без графического интерфейса:
+
+    python -m particleswarm --objective rastrigin --dimension 10 --swarmsize 2000 \\
+        --iterations 300 --seed 1 --output result.json
+
+Параметры можно задать в JSON-файле (--config), ключи совпадают с именами параметров
+ниже (swarmsize, dimension, currentVelocityRatio, ...). Аргументы командной строки
+имеют приоритет над файлом.
+Результат записывается в JSON (итог и кривая сходимости) или CSV (кривая сходимости)
+в зависимости от расширения файла --output.
+С параметром --checkpoint состояние роя сохраняется в файл .npz каждые --checkpoint-interval
+итераций, а с --resume прерванный запуск продолжается с этой контрольной точки:
+ограничения --iterations, --max-evaluations и --time-limit считаются от его начала,
+а --record и --telemetry должны указывать на новые пути.
+С параметром --record положения и значения целевой функции всех частиц записываются
+в каталог траектории (см. particleswarm.trajectory), а с --telemetry показатели сходимости
+каждой итерации - в файл .csv, .jsonl или .npz (см. particleswarm.telemetry).
+--summary-interval выводит строку о ходе расчета раз в заданное количество итераций
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from .checkpoint import CheckpointWriter
+from .objectives import OBJECTIVES
+from .telemetry import Telemetry
+from .trajectory import TrajectoryRecorder
+
+# Параметры запуска: имя, флаг командной строки, тип, значение по умолчанию, описание
+PARAMETERS = [
+    ("objective", "--objective", str, "rastrigin", ", ".join(OBJECTIVES)),
+    ("dimension", "--dimension", int, 2, "problem dimension"),
+    ("swarmsize", "--swarmsize", int, 2000, "number of particles"),
+    ("minvalue", "--min-value", float, None, "lower bound of every coordinate"),
+    ("maxvalue", "--max-value", float, None, "upper bound of every coordinate"),
+    ("currentVelocityRatio", "--current-velocity-ratio", float, 0.5, "velocity scale"),
+    ("localVelocityRatio", "--local-velocity-ratio", float, 2.0, "personal best weight"),
+    ("globalVelocityRatio", "--global-velocity-ratio", float, 5.0, "global best weight"),
+    ("boundary", "--boundary", str, "penalty", "penalty, clip, reflect, periodic or random"),
+    ("topology", "--topology", str, "global", "global, ring, vonneumann or random"),
+    ("maxVelocity", "--max-velocity", float, None, "velocity limit for every coordinate"),
+    ("workers", "--workers", int, None, "evaluate the objective in this many processes"),
+    ("backend", "--backend", str, "auto", "auto, numpy or numba"),
+    ("dtype", "--dtype", str, "float64", "float64 or float32 swarm state"),
+    ("iterations", "--iterations", int, 300, "maximum number of iterations"),
+    ("targetFinalFunc", "--target", float, None, "stop when the best value reaches this"),
+    ("stagnationWindow", "--stagnation-window", int, None, "iterations without progress"),
+    ("stagnationTolerance", "--stagnation-tolerance", float, 0.0, "progress over the window"),
+    ("minDiameter", "--min-diameter", float, None, "stop when the swarm diameter is smaller"),
+    ("maxEvaluations", "--max-evaluations", int, None, "objective evaluation budget"),
+    ("timeLimit", "--time-limit", float, None, "wall-clock limit in seconds"),
+    ("seed", "--seed", int, None, "random seed"),
+    ("checkpoint", "--checkpoint", str, None, "save the swarm state to this .npz file"),
+    ("checkpointInterval", "--checkpoint-interval", int, 100, "iterations between checkpoints"),
+    ("record", "--record", str, None, "record the trajectory into this directory"),
+    ("recordDtype", "--record-dtype", str, "float32", "float32 or float64 trajectory storage"),
+    ("recordEvery", "--record-every", int, 1, "record every k-th iteration"),
+    ("telemetry", "--telemetry", str, None, "write per-iteration metrics to .csv, .jsonl or .npz"),
+    ("summaryInterval", "--summary-interval", int, None, "print progress every k iterations"),
+]
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m particleswarm",
+        description="Run particle swarm optimisation without rendering",
+    )
+    parser.add_argument("--config", help="JSON file with parameters")
+    parser.add_argument("--output", help="write results to a .json or .csv file")
+    parser.add_argument("--quiet", action="store_true", help="do not print the result")
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from the checkpoint file if it exists"
+    )
+
+    # Значения по умолчанию подставляются позже, чтобы отличать заданные аргументы от незаданных
+    for name, flag, type_, _, description in PARAMETERS:
+        parser.add_argument(flag, dest=name, type=type_, default=None, help=description)
+
+    return parser.parse_args(argv)
+
+
+def loadParameters(args):
+    """
+    Собрать параметры запуска: значения по умолчанию, затем файл конфигурации,
+    затем аргументы командной строки
+    """
+    parameters = {name: default for name, _, _, default, _ in PARAMETERS}
+
+    if args.config:
+        with open(args.config, encoding="utf-8") as file:
+            config = json.load(file)
+
+        unknown = set(config) - set(parameters)
+        if unknown:
+            raise ValueError("Unknown parameters in config: " + ", ".join(sorted(unknown)))
+
+        parameters.update(config)
+
+    for name in parameters:
+        value = getattr(args, name)
+        if value is not None:
+            parameters[name] = value
+
+    if parameters["objective"] not in OBJECTIVES:
+        raise ValueError(
+            "Unknown objective '{}', expected one of: {}".format(
+                parameters["objective"], ", ".join(OBJECTIVES)
+            )
+        )
+
+    return parameters
+
+
+def createSwarm(parameters):
+    """
+    Создать рой по параметрам запуска
+    """
+    swarmClass, bound = OBJECTIVES[parameters["objective"]]
+    dimension = parameters["dimension"]
+
+    minvalue = parameters["minvalue"] if parameters["minvalue"] is not None else -bound
+    maxvalue = parameters["maxvalue"] if parameters["maxvalue"] is not None else bound
+
+    evaluator = None
+    if parameters["workers"] is not None:
+        from .parallel import ProcessPoolEvaluator
+
+        evaluator = ProcessPoolEvaluator(workers=parameters["workers"])
+
+    return swarmClass(
+        parameters["swarmsize"],
+        [minvalue] * dimension,
+        [maxvalue] * dimension,
+        parameters["currentVelocityRatio"],
+        parameters["localVelocityRatio"],
+        parameters["globalVelocityRatio"],
+        boundary=parameters["boundary"],
+        topology=parameters["topology"],
+        seed=parameters["seed"],
+        backend=parameters["backend"],
+        dtype=parameters["dtype"],
+        maxVelocity=parameters["maxVelocity"],
+        evaluator=evaluator,
+    )
+
+
+def isResuming(parameters, resume):
+    """
+    Возвращает True, если запуск продолжается с существующей контрольной точки
+    """
+    checkpoint = parameters["checkpoint"]
+    return resume and checkpoint is not None and os.path.exists(checkpoint)
+
+
+def checkResumeOutputs(parameters, resume):
+    """
+    Проверить, что продолжение запуска не перезапишет траекторию и телеметрию
+    прерванного запуска: они не дописываются, а создаются заново
+    """
+    if not resume:
+        return
+
+    outputs = (("--record", parameters["record"]), ("--telemetry", parameters["telemetry"]))
+    for option, path in outputs:
+        if path is not None and os.path.exists(path):
+            raise ValueError(
+                "Cannot resume with existing {} output '{}': it would be overwritten, "
+                "choose a new path".format(option, path)
+            )
+
+
+def runOptimization(parameters, resume=False):
+    """
+    Выполнить оптимизацию. Возвращает результат Swarm.run и кривую сходимости:
+    список (итерация, количество расчетов целевой функции, лучшее значение)
+    resume - продолжить с контрольной точки parameters["checkpoint"], если файл существует.
+        Ограничения iterations, maxEvaluations и timeLimit в этом случае считаются
+        от начала прерванного запуска. Запись траектории и телеметрии в этом случае
+        не должна существовать: они не дописываются, а перезаписывались бы с середины запуска
+    """
+    checkpoint = parameters["checkpoint"]
+    resume = isResuming(parameters, resume)
+    checkResumeOutputs(parameters, resume)
+
+    with createSwarm(parameters) as swarm:
+        # Расчеты целевой функции при создании роя в бюджет maxEvaluations не входят
+        createdEvaluations = swarm.evaluationCount
+
+        if resume:
+            swarm.loadCheckpoint(checkpoint)
+
+        maxIterations = parameters["iterations"]
+        if maxIterations is not None:
+            maxIterations = max(maxIterations - swarm.iteration, 0)
+
+        maxEvaluations = parameters["maxEvaluations"]
+        if maxEvaluations is not None:
+            maxEvaluations = max(maxEvaluations - (swarm.evaluationCount - createdEvaluations), 0)
+
+        timeLimit = parameters["timeLimit"]
+        if timeLimit is not None:
+            timeLimit = max(timeLimit - swarm.elapsed, 0.0)
+
+        writer = None
+        if checkpoint is not None:
+            writer = CheckpointWriter(checkpoint, parameters["checkpointInterval"])
+            swarm.addIterationCallback(writer)
+
+        recorder = None
+        if parameters["record"] is not None:
+            recorder = TrajectoryRecorder(
+                parameters["record"], parameters["recordDtype"], parameters["recordEvery"]
+            )
+            recorder.record(swarm)
+            swarm.addIterationCallback(recorder)
+
+        telemetry = None
+        if parameters["telemetry"] is not None or parameters["summaryInterval"] is not None:
+            telemetry = Telemetry(
+                parameters["telemetry"], summaryInterval=parameters["summaryInterval"]
+            )
+            telemetry.record(swarm)
+            swarm.addIterationCallback(telemetry)
+
+        convergence = [(swarm.iteration, swarm.evaluationCount, swarm.globalBestFinalFunc)]
+        swarm.addIterationCallback(
+            lambda swarm: convergence.append(
+                (swarm.iteration, swarm.evaluationCount, swarm.globalBestFinalFunc)
+            )
+        )
+
+        try:
+            result = swarm.run(
+                maxIterations=maxIterations,
+                targetFinalFunc=parameters["targetFinalFunc"],
+                stagnationWindow=parameters["stagnationWindow"],
+                stagnationTolerance=parameters["stagnationTolerance"],
+                minDiameter=parameters["minDiameter"],
+                maxEvaluations=maxEvaluations,
+                timeLimit=timeLimit,
+            )
+
+            # Итоговое состояние сохраняется всегда, чтобы --resume не повторял последние итерации
+            if writer is not None:
+                writer.save(swarm)
+        finally:
+            if writer is not None:
+                writer.close()
+            if recorder is not None:
+                recorder.close()
+            if telemetry is not None:
+                telemetry.close()
+
+    return result, convergence
+
+
+def writeResult(path, parameters, result, convergence):
+    """
+    Записать результат в JSON (параметры, итог и кривая сходимости) или CSV (кривая сходимости)
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["iteration", "evaluations", "bestFinalFunc"])
+            writer.writerows(convergence)
+        return
+
+    report = {
+        "parameters": parameters,
+        "result": {
+            "stopReason": result.stopReason,
+            "bestFinalFunc": result.bestFinalFunc,
+            "bestPosition": result.bestPosition.tolist(),
+            "iterations": result.iterations,
+            "evaluations": result.evaluations,
+            "elapsed": result.elapsed,
+        },
+        "convergence": {
+            "iteration": [row[0] for row in convergence],
+            "evaluations": [row[1] for row in convergence],
+            "bestFinalFunc": [row[2] for row in convergence],
+        },
+    }
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+
+    try:
+        parameters = loadParameters(args)
+        checkResumeOutputs(parameters, isResuming(parameters, args.resume))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    result, convergence = runOptimization(parameters, args.resume)
+
+    if args.output:
+        writeResult(args.output, parameters, result, convergence)
+
+    if not args.quiet:
+        print(
+            "Stop reason: {}\nIterations: {}\nEvaluations: {}\nElapsed: {:.3f} s\n"
+            "Best Position: {}\nBest Final Func: {}".format(
+                result.stopReason,
+                result.iterations,
+                result.evaluations,
+                result.elapsed,
+                result.bestPosition,
+                result.bestFinalFunc,
+            )
+        )
+
+    return 0
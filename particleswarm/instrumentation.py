@@ -0,0 +1,110 @@
+class Instrumentation:
+    """
+    Сбор времени этапов итерации и счетчиков работы роя.
+    Подключается к рою через параметр instrumentation или свойство Swarm.instrumentation.
+    Пока экземпляр не подключен, рой не выполняет никаких замеров
+    """
+
+    PHASES = ("velocity", "position", "evaluation", "bests")
+
+    def __init__(self, keepHistory: bool = True):
+        """
+        keepHistory - сохранять количество улучшений и время каждой итерации,
+            а не только суммарные значения
+        """
+        self._keepHistory = keepHistory
+        self.reset()
+
+    def reset(self):
+        """
+        Обнулить все накопленные измерения
+        """
+        self._phaseTimes = dict.fromkeys(self.PHASES, 0.0)
+        self._iterationCount = 0
+        self._evaluationCount = 0
+        self._improvementCount = 0
+        self._improvements = []
+        self._iterationTimes = []
+
+    def recordIteration(
+        self,
+        velocityTime: float,
+        positionTime: float,
+        evaluationTime: float,
+        bestsTime: float,
+        evaluations: int,
+        improvements: int,
+    ):
+        """
+        Учесть одну итерацию роя
+        velocityTime, positionTime, evaluationTime, bestsTime - время этапов итерации в секундах
+        evaluations - количество расчетов целевой функции
+        improvements - количество частиц, улучшивших свое лучшее значение
+        """
+        self._phaseTimes["velocity"] += velocityTime
+        self._phaseTimes["position"] += positionTime
+        self._phaseTimes["evaluation"] += evaluationTime
+        self._phaseTimes["bests"] += bestsTime
+
+        self._iterationCount += 1
+        self._evaluationCount += evaluations
+        self._improvementCount += improvements
+
+        if self._keepHistory:
+            self._improvements.append(improvements)
+            self._iterationTimes.append(velocityTime + positionTime + evaluationTime + bestsTime)
+
+    @property
+    def phaseTimes(self):
+        """
+        Суммарное время каждого этапа итерации в секундах
+        """
+        return dict(self._phaseTimes)
+
+    @property
+    def iterationCount(self):
+        return self._iterationCount
+
+    @property
+    def evaluationCount(self):
+        return self._evaluationCount
+
+    @property
+    def improvementCount(self):
+        return self._improvementCount
+
+    @property
+    def improvements(self):
+        """
+        Количество улучшений лучших значений частиц на каждой итерации
+        """
+        return self._improvements
+
+    @property
+    def iterationTimes(self):
+        """
+        Время каждой итерации в секундах
+        """
+        return self._iterationTimes
+
+    def report(self):
+        """
+        Возвращает текстовую сводку измерений
+        """
+        total = sum(self._phaseTimes.values())
+        lines = [
+            "Iterations: {}".format(self._iterationCount),
+            "Evaluations: {}".format(self._evaluationCount),
+            "Improvements: {}".format(self._improvementCount),
+            "Total time: {:.6f} s".format(total),
+        ]
+
+        for phase in self.PHASES:
+            phaseTime = self._phaseTimes[phase]
+            lines.append(
+                "  {:<10} {:.6f} s ({:.1%})".format(
+                    phase, phaseTime, phaseTime / total if total > 0 else 0.0
+                )
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,302 @@
+import multiprocessing
+
+import numpy as np
+
+
+def _createIsland(swarmFactory, seed):
+    """
+    Создать рой острова. Каждый остров получает собственную ветвь SeedSequence,
+    поэтому потоки случайных чисел островов независимы и воспроизводимы
+    """
+    return swarmFactory(seed=seed)
+
+
+def _executeCommand(swarm, command, args):
+    """
+    Выполнить команду координатора над роем острова
+    """
+    if command == "iterate":
+        for _ in range(args[0]):
+            swarm.nextIteration()
+        return swarm.globalBestFinalFunc, np.array(swarm.globalBestPosition)
+
+    if command == "emigrants":
+        return swarm.getBestParticles(args[0])
+
+    if command == "immigrants":
+        swarm.replaceWorstParticles(*args)
+        return swarm.globalBestFinalFunc, np.array(swarm.globalBestPosition)
+
+    raise ValueError("Unknown island command '{}'".format(command))
+
+
+def _runIsland(connection, swarmFactory, seed):
+    """
+    Главный цикл процесса острова: принимает команды координатора и отправляет результаты
+    """
+    swarm = _createIsland(swarmFactory, seed)
+    try:
+        while True:
+            command, args = connection.recv()
+            if command == "close":
+                break
+
+            try:
+                connection.send((True, _executeCommand(swarm, command, args)))
+            except Exception as error:
+                connection.send((False, error))
+    finally:
+        swarm.close()
+        connection.close()
+
+
+class _LocalIsland:
+    """
+    Остров, рой которого живет в текущем процессе (для отладки и однопроцессорных машин)
+    """
+
+    def __init__(self, swarmFactory, seed):
+        self._swarm = _createIsland(swarmFactory, seed)
+        self._result = None
+
+    def send(self, command, *args):
+        self._result = _executeCommand(self._swarm, command, args)
+
+    def receive(self):
+        return self._result
+
+    def close(self):
+        self._swarm.close()
+
+
+class _ProcessIsland:
+    """
+    Остров, рой которого живет в отдельном процессе
+    """
+
+    def __init__(self, context, swarmFactory, seed):
+        self._connection, childConnection = context.Pipe()
+        self._process = context.Process(
+            target=_runIsland,
+            args=(childConnection, swarmFactory, seed),
+            daemon=True,
+        )
+        self._process.start()
+        childConnection.close()
+
+    def send(self, command, *args):
+        self._connection.send((command, args))
+
+    def receive(self):
+        success, result = self._connection.recv()
+        if not success:
+            raise result
+
+        return result
+
+    def close(self):
+        if self._process.is_alive():
+            self._connection.send(("close", ()))
+            self._process.join()
+
+        self._connection.close()
+
+
+class IslandModel:
+    """
+    Островная модель: несколько независимых роев (островов), каждый в своем процессе.
+    Каждые migrationInterval итераций острова обмениваются лучшими частицами
+    в соответствии с топологией миграции
+    """
+
+    TOPOLOGIES = ("ring", "full", "random")
+
+    def __init__(
+        self,
+        swarmFactory,
+        islandCount: int,
+        migrationInterval: int = 10,
+        migrationSize: int = 1,
+        topology: str = "ring",
+        seed=None,
+        processes: bool = True,
+        context=None,
+    ):
+        """
+        swarmFactory - вызываемый объект с именованным аргументом seed, создающий рой острова
+            (например, functools.partial(SwarmRastrigin, swarmsize, minvalues, ...)).
+            seed получает независимую ветвь numpy.random.SeedSequence для каждого острова.
+            При запуске в отдельных процессах он должен поддерживать pickle
+        islandCount - количество островов
+        migrationInterval - количество итераций между миграциями
+        migrationSize - количество лучших частиц, которые остров отправляет за одну миграцию
+        topology - топология миграции: "ring" (остров i отправляет частицы острову i + 1),
+            "full" (каждый остров отправляет частицы всем остальным),
+            "random" (каждый остров отправляет частицы случайному другому острову)
+        seed - начальное значение для генераторов случайных чисел островов и топологии "random"
+        processes - True - каждый остров в своем процессе, False - все острова в текущем процессе
+        context - способ запуска процессов ("fork", "spawn", "forkserver"). None - по умолчанию для ОС
+        """
+        assert islandCount >= 1
+        assert migrationInterval >= 1
+        assert migrationSize >= 0
+
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(
+                "Unknown migration topology '{}', expected one of: {}".format(
+                    topology, ", ".join(self.TOPOLOGIES)
+                )
+            )
+
+        self._islandCount = islandCount
+        self._migrationInterval = migrationInterval
+        self._migrationSize = migrationSize
+        self._topology = topology
+
+        # Последняя ветвь используется для выбора получателей в топологии "random"
+        seedSequence = np.random.SeedSequence(seed)
+        *islandSeeds, migrationSeed = seedSequence.spawn(islandCount + 1)
+        self._rng = np.random.default_rng(migrationSeed)
+
+        if processes:
+            mpContext = multiprocessing.get_context(context)
+            self._islands = [
+                _ProcessIsland(mpContext, swarmFactory, islandSeed) for islandSeed in islandSeeds
+            ]
+        else:
+            self._islands = [
+                _LocalIsland(swarmFactory, islandSeed) for islandSeed in islandSeeds
+            ]
+
+        self._iteration = 0
+        self._islandBestFinalFuncs = np.full(islandCount, np.inf)
+        self._islandBestPositions = [None] * islandCount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Остановить процессы островов
+        """
+        for island in self._islands:
+            island.close()
+
+        self._islands = []
+
+    @property
+    def islandCount(self):
+        return self._islandCount
+
+    @property
+    def iteration(self):
+        """
+        Количество выполненных итераций каждого острова
+        """
+        return self._iteration
+
+    @property
+    def islandBestFinalFuncs(self):
+        """
+        Лучшие значения целевой функции каждого острова, вектор (islandCount,)
+        """
+        return self._islandBestFinalFuncs
+
+    @property
+    def islandBestPositions(self):
+        """
+        Лучшие положения каждого острова, матрица (islandCount, dimension)
+        """
+        return np.array(self._islandBestPositions)
+
+    @property
+    def globalBestFinalFunc(self):
+        return float(np.min(self._islandBestFinalFuncs))
+
+    @property
+    def globalBestPosition(self):
+        return self._islandBestPositions[int(np.argmin(self._islandBestFinalFuncs))]
+
+    def run(self, iterCount: int):
+        """
+        Выполнить iterCount итераций на всех островах с миграцией каждые migrationInterval итераций
+        """
+        remaining = iterCount
+        while remaining > 0:
+            # До ближайшей миграции, чтобы повторные вызовы run не сбивали расписание
+            steps = min(
+                remaining, self._migrationInterval - self._iteration % self._migrationInterval
+            )
+
+            for island in self._islands:
+                island.send("iterate", steps)
+            self._collectBests()
+
+            self._iteration += steps
+            remaining -= steps
+
+            if self._iteration % self._migrationInterval == 0:
+                self.migrate()
+
+    def migrate(self):
+        """
+        Обменяться лучшими частицами между островами
+        """
+        if self._islandCount < 2 or self._migrationSize == 0:
+            return
+
+        for island in self._islands:
+            island.send("emigrants", self._migrationSize)
+        emigrants = [island.receive() for island in self._islands]
+
+        allSources = self._getMigrationSources()
+        receivers = []
+        for index, (island, sources) in enumerate(zip(self._islands, allSources)):
+            if not sources:
+                continue
+
+            positions = np.concatenate([emigrants[source][0] for source in sources])
+            finalFuncs = np.concatenate([emigrants[source][1] for source in sources])
+            island.send("immigrants", positions, finalFuncs)
+            receivers.append(index)
+
+        self._collectBests(receivers)
+
+    def _getMigrationSources(self):
+        """
+        Возвращает для каждого острова список номеров островов, отправляющих ему частицы
+        """
+        islands = range(self._islandCount)
+
+        if self._topology == "ring":
+            return [[(target - 1) % self._islandCount] for target in islands]
+
+        if self._topology == "full":
+            return [[source for source in islands if source != target] for target in islands]
+
+        # Каждый остров выбирает случайного получателя, отличного от себя
+        targets = (
+            np.arange(self._islandCount)
+            + self._rng.integers(1, self._islandCount, size=self._islandCount)
+        ) % self._islandCount
+
+        sources = [[] for _ in islands]
+        for source, target in enumerate(targets):
+            sources[target].append(source)
+
+        return sources
+
+    def _collectBests(self, indices=None):
+        """
+        Получить лучшие результаты островов с номерами indices (по умолчанию всех)
+        """
+        if indices is None:
+            indices = range(self._islandCount)
+
+        for index in indices:
+            finalFunc, position = self._islands[index].receive()
+            self._islandBestFinalFuncs[index] = finalFunc
+            self._islandBestPositions[index] = position
@@ -0,0 +1,153 @@
+"""
+Выбор способа выполнения итерации роя.
+
+backend "numpy" - итерация выполняется операциями NumPy над всем роем по этапам
+(скорости, положения, границы, целевая функция, лучшие положения).
+backend "numba" - итерация выполняется одним параллельным циклом по частицам,
+скомпилированным Numba: для каждой частицы за один проход обновляются скорость и положение,
+обрабатываются границы, считается встроенная целевая функция и лучшее положение частицы,
+без промежуточных матриц (swarmsize, dimension).
+backend "auto" - "numba", если пакет numba установлен и рой поддерживается ядром, иначе "numpy".
+
+Ядро поддерживает встроенные целевые функции (particleswarm.objectives), способы обработки
+границ "penalty", "clip", "reflect", "periodic" и любые топологии. Рой с параллельным
+расчетом целевой функции (evaluator) или с подключенной инструментацией выполняет итерацию
+через NumPy. Numba загружается при первой итерации, а не при импорте particleswarm
+"""
+
+import importlib.util
+
+import numpy as np
+
+from .boundary import ClipBoundary, PenaltyBoundary, PeriodicBoundary, ReflectBoundary
+from .lazy import lazyImport
+
+_numbaKernels = lazyImport("particleswarm._numbakernels")
+
+BACKENDS = ("auto", "numpy", "numba")
+
+# Номера целевых функций и способов обработки границ в ядре (см. particleswarm._numbakernels)
+_OBJECTIVES = {
+    "rastrigin": 0,
+    "schwefel": 1,
+    "paraboloid": 2,
+}
+
+_BOUNDARIES = {
+    PenaltyBoundary: 0,
+    ClipBoundary: 1,
+    ReflectBoundary: 2,
+    PeriodicBoundary: 3,
+}
+
+# Пустой вектор вместо ограничения скорости
+_NO_LIMIT = np.empty(0)
+
+
+def isNumbaAvailable() -> bool:
+    """
+    Возвращает True, если пакет numba установлен (сам пакет не импортируется)
+    """
+    return importlib.util.find_spec("numba") is not None
+
+
+def _getObjective(swarm):
+    """
+    Имя встроенной целевой функции роя swarm или None.
+    Целевая функция считается встроенной, если класс, определяющий _finalFuncBatch,
+    объявляет атрибут OBJECTIVE, а штрафная функция не переопределена после него
+    """
+    owner = next(cls for cls in type(swarm).__mro__ if "_finalFuncBatch" in vars(cls))
+    objective = vars(owner).get("OBJECTIVE")
+
+    if type(swarm)._getPenaltyBatch is not owner._getPenaltyBatch:
+        return None
+
+    return objective
+
+
+def getUnsupportedReason(swarm):
+    """
+    Возвращает причину, по которой итерацию роя swarm нельзя выполнить ядром Numba,
+    или None, если можно
+    """
+    if _getObjective(swarm) not in _OBJECTIVES:
+        return "the objective is not one of the built-in objectives"
+
+    if type(swarm.boundary) not in _BOUNDARIES:
+        return "boundary {} is not supported".format(type(swarm.boundary).__name__)
+
+    if swarm.evaluator is not None:
+        return "the objective is evaluated by {}".format(type(swarm.evaluator).__name__)
+
+    return None
+
+
+class FusedIteration:
+    """
+    Итерация роя ядром Numba. Хранит только номера целевой функции и способа обработки
+    границ, поэтому рой с ней можно передавать в другие процессы
+    """
+
+    def __init__(self, objective: int, boundary: int, penaltyRatio: float):
+        self._objective = objective
+        self._boundary = boundary
+        self._penaltyRatio = penaltyRatio
+
+    def __call__(self, swarm, coefficients):
+        """
+        Выполнить итерацию роя swarm со случайными коэффициентами скорости coefficients,
+        массив (2, swarmsize, dimension). Массивы роя изменяются на месте
+        """
+        bestPositions = np.atleast_2d(swarm.topology.getBestPositions(swarm))
+        maxVelocity = swarm.maxVelocity if swarm.maxVelocity is not None else _NO_LIMIT
+
+        _numbaKernels.fusedIteration(
+            swarm.positions,
+            swarm.velocities,
+            swarm.localBestPositions,
+            swarm.localBestFinalFuncs,
+            swarm.finalFuncs,
+            swarm.improved,
+            coefficients,
+            bestPositions,
+            swarm.commonRatio,
+            swarm.localVelocityRatio,
+            swarm.globalVelocityRatio,
+            np.ascontiguousarray(maxVelocity, dtype=swarm.positions.dtype),
+            swarm.minvalues,
+            swarm.maxvalues,
+            self._objective,
+            self._boundary,
+            self._penaltyRatio,
+        )
+
+
+def createFusedIteration(swarm, backend: str = "auto"):
+    """
+    Возвращает FusedIteration для роя swarm или None, если итерация выполняется через NumPy
+    backend - "auto", "numpy" или "numba"
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            "Unknown backend '{}', expected one of: {}".format(backend, ", ".join(BACKENDS))
+        )
+
+    if backend == "numpy":
+        return None
+
+    reason = getUnsupportedReason(swarm)
+    if backend == "auto" and (reason is not None or not isNumbaAvailable()):
+        return None
+
+    if reason is not None:
+        raise ValueError("The numba backend cannot run this swarm: " + reason)
+
+    if not isNumbaAvailable():
+        raise ImportError("The numba backend requires the numba package")
+
+    return FusedIteration(
+        _OBJECTIVES[_getObjective(swarm)],
+        _BOUNDARIES[type(swarm.boundary)],
+        type(swarm).PENALTY_RATIO,
+    )
@@ -0,0 +1,34 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Модуль, который импортируется только при первом обращении к его атрибуту.
+    Используется для тяжелых необязательных зависимостей (OpenGL, glfw, tkinter),
+    чтобы они не загружались, пока действительно не понадобятся
+    """
+
+    def __init__(self, name: str):
+        """
+        name - полное имя модуля, например "OpenGL.GL"
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # Вызывается только для атрибутов, которых нет у самого LazyModule
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return "<lazy module '{}' ({})>".format(self._name, state)
+
+
+def lazyImport(name: str) -> LazyModule:
+    """
+    Возвращает модуль name, который будет импортирован при первом обращении к нему
+    """
+    return LazyModule(name)
@@ -0,0 +1,139 @@
+"""
+Построение сетки поверхности целевой функции для отрисовки.
+
+Сетка строится один раз в виде непрерывных массивов NumPy, готовых к загрузке
+в буферы вершин OpenGL (см. particleswarm.rendering). Модуль не использует OpenGL
+и может проверяться без графического контекста
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SurfaceMesh(NamedTuple):
+    """
+    Треугольная сетка поверхности z = f(x, y)
+    vertices - координаты вершин, массив (rows * columns, 3) float32
+    normals - единичные нормали в вершинах, массив (rows * columns, 3) float32
+    colors - цвета вершин RGB, массив (rows * columns, 3) float32
+    indices - номера вершин треугольников, вектор (6 * (rows - 1) * (columns - 1),) uint32
+    shape - количество узлов сетки (rows, columns)
+    """
+
+    vertices: np.ndarray
+    normals: np.ndarray
+    colors: np.ndarray
+    indices: np.ndarray
+    shape: tuple
+
+    @property
+    def triangleCount(self):
+        return len(self.indices) // 3
+
+
+def getGridIndices(rows: int, columns: int):
+    """
+    Номера вершин треугольников для прямоугольной сетки rows x columns узлов,
+    пронумерованных по строкам. Каждая ячейка делится на два треугольника
+    """
+    assert rows >= 2 and columns >= 2
+
+    corner = (
+        np.arange(rows - 1, dtype=np.uint32)[:, np.newaxis] * columns
+        + np.arange(columns - 1, dtype=np.uint32)
+    ).ravel()
+
+    right = corner + 1
+    below = corner + columns
+    diagonal = below + 1
+
+    return np.stack((corner, right, below, right, diagonal, below), axis=1).ravel()
+
+
+def getGridNormals(X, Y, Z):
+    """
+    Нормали поверхности в узлах сетки по конечным разностям, массив (rows, columns, 3)
+    """
+    dZdy, dZdx = np.gradient(Z, Y[:, 0], X[0, :])
+    normals = np.stack((-dZdx, -dZdy, np.ones_like(Z)), axis=-1)
+    normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+    return normals
+
+
+def buildSurfaceMesh(function, xRange, yRange, resolution, color=(0.2, 0.5, 0.8)):
+    """
+    Построить сетку поверхности z = function(x, y)
+    function - векторизованная функция двух матриц координат X, Y
+    xRange, yRange - пары (минимум, максимум) по осям
+    resolution - количество узлов по каждой оси: число или пара (по x, по y)
+    color - цвет RGB всей поверхности или функция color(Z), возвращающая
+        массив (rows, columns, 3) цветов узлов по матрице высот
+    """
+    xCount, yCount = np.broadcast_to(resolution, (2,))
+
+    x = np.linspace(xRange[0], xRange[1], int(xCount))
+    y = np.linspace(yRange[0], yRange[1], int(yCount))
+    X, Y = np.meshgrid(x, y)
+    Z = np.asarray(function(X, Y), dtype=float)
+
+    rows, columns = Z.shape
+    vertices = np.stack((X, Y, Z), axis=-1)
+    normals = getGridNormals(X, Y, Z)
+
+    if callable(color):
+        colors = np.asarray(color(Z), dtype=float)
+    else:
+        colors = np.broadcast_to(np.asarray(color, dtype=float), (rows, columns, 3))
+
+    return SurfaceMesh(
+        vertices=np.ascontiguousarray(vertices.reshape(-1, 3), dtype=np.float32),
+        normals=np.ascontiguousarray(normals.reshape(-1, 3), dtype=np.float32),
+        colors=np.ascontiguousarray(colors.reshape(-1, 3), dtype=np.float32),
+        indices=getGridIndices(rows, columns),
+        shape=(rows, columns),
+    )
+
+
+def getParticleVertices(positions, heights, out=None):
+    """
+    Координаты вершин частиц для отрисовки, массив (N, 3) float32:
+    x и y - первые две координаты положений, z - heights (например, уже рассчитанные
+    значения целевой функции, чтобы не считать ее заново ради отрисовки)
+    positions - матрица положений (N, dimension)
+    heights - вектор (N,) или число
+    out - буфер (N, 3) float32 для результата. Если его размер не подходит, создается новый
+    """
+    if out is None or out.shape != (len(positions), 3):
+        out = np.empty((len(positions), 3), dtype=np.float32)
+
+    out[:, :2] = positions[:, :2]
+    out[:, 2] = heights
+
+    return out
+
+
+def getFitnessColors(
+    finalFuncs, bestColor=(1.0, 1.0, 0.0), worstColor=(1.0, 0.0, 0.0), out=None
+):
+    """
+    Цвета частиц по значениям целевой функции, массив (N, 3) float32:
+    лучшее значение кадра получает bestColor, худшее - worstColor, остальные - промежуточные
+    out - буфер (N, 3) float32 для результата. Если его размер не подходит, создается новый
+    """
+    if out is None or out.shape != (len(finalFuncs), 3):
+        out = np.empty((len(finalFuncs), 3), dtype=np.float32)
+
+    low = np.min(finalFuncs)
+    high = np.max(finalFuncs)
+    scale = 1.0 / (high - low) if high > low else 0.0
+
+    bestColor = np.asarray(bestColor, dtype=np.float32)
+    worstColor = np.asarray(worstColor, dtype=np.float32)
+
+    ratio = (np.asarray(finalFuncs, dtype=np.float32) - low) * scale
+    np.multiply(ratio[:, np.newaxis], worstColor - bestColor, out=out)
+    out += bestColor
+
+    return out
@@ -0,0 +1,121 @@
+import numpy as np
+
+from .swarm import Swarm
+
+
+class SwarmRastrigin(Swarm):
+    # Имя целевой функции для ядра итерации (particleswarm.kernels)
+    OBJECTIVE = "rastrigin"
+    PENALTY_RATIO = 10000.0
+
+    def __init__(
+        self,
+        swarmsize: int,
+        minvalues: list[float],
+        maxvalues: list[float],
+        currentVelocityRatio: float,
+        localVelocityRatio: float,
+        globalVelocityRatio: float,
+        **kwargs,
+    ):
+        super().__init__(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+            **kwargs,
+        )
+
+    def _finalFunc(self, position):
+        return self._finalFuncBatch(np.atleast_2d(position))[0]
+
+    def _finalFuncBatch(self, positions):
+        function = 10.0 * len(self.minvalues) + np.sum(
+            positions * positions - 10.0 * np.cos(2 * np.pi * positions), axis=1
+        )
+        penalty = self._getPenaltyBatch(positions, self.PENALTY_RATIO)
+
+        return function + penalty
+
+
+class SwarmSchwefel(Swarm):
+    # Имя целевой функции для ядра итерации (particleswarm.kernels)
+    OBJECTIVE = "schwefel"
+    PENALTY_RATIO = 10000.0
+
+    def __init__(
+        self,
+        swarmsize: int,
+        minvalues: list[float],
+        maxvalues: list[float],
+        currentVelocityRatio: float,
+        localVelocityRatio: float,
+        globalVelocityRatio: float,
+        **kwargs,
+    ):
+        super().__init__(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+            **kwargs,
+        )
+
+    def _finalFunc(self, position):
+        """Вычисляет значение функции Швефеля с учётом штрафа."""
+        return self._finalFuncBatch(np.atleast_2d(position))[0]
+
+    def _finalFuncBatch(self, positions):
+        """Вычисляет значения функции Швефеля с учётом штрафа для каждой строки матрицы."""
+        function_value = 418.9829 * positions.shape[1] - np.sum(
+            positions * np.sin(np.sqrt(np.abs(positions))), axis=1
+        )
+        penalty = self._getPenaltyBatch(positions, self.PENALTY_RATIO)
+        return function_value + penalty
+
+
+class SwarmX2(Swarm):
+    # Имя целевой функции для ядра итерации (particleswarm.kernels)
+    OBJECTIVE = "paraboloid"
+    PENALTY_RATIO = 10000.0
+
+    def __init__(
+        self,
+        swarmsize: int,
+        minvalues: list[float],
+        maxvalues: list[float],
+        currentVelocityRatio: float,
+        localVelocityRatio: float,
+        globalVelocityRatio: float,
+        **kwargs,
+    ):
+        super().__init__(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+            **kwargs,
+        )
+
+    def _finalFunc(self, position):
+        return self._finalFuncBatch(np.atleast_2d(position))[0]
+
+    def _finalFuncBatch(self, positions):
+        penalty = self._getPenaltyBatch(positions, self.PENALTY_RATIO)
+        finalfunc = np.sum(positions ** 2, axis=1)
+
+        return finalfunc + penalty
+
+
+# Встроенные целевые функции: имя -> (класс роя, граница области поиска по каждой координате)
+OBJECTIVES = {
+    "rastrigin": (SwarmRastrigin, 5.12),
+    "schwefel": (SwarmSchwefel, 500.0),
+    "paraboloid": (SwarmX2, 100.0),
+}
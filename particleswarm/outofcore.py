@@ -0,0 +1,514 @@
+"""
+Рой, состояние которого хранится в файлах, отображаемых в память, а не в памяти процесса.
+
+Для роев из десятков миллионов частиц матрицы (swarmsize, dimension) положений, скоростей
+и лучших положений частиц не помещаются в память. ChunkedSwarm хранит их в каталоге:
+    meta.json - размер роя, размерность, тип данных, номер итерации, лучшее положение роя
+        и состояние генератора случайных чисел после последней завершенной итерации.
+        Перед каждым проходом по рою в нем ставится отметка inProgress, после прохода
+        она снимается: блоки записываются в файлы по ходу итерации, и прерванную итерацию
+        продолжить нельзя
+    positions.dat, velocities.dat, localBestPositions.dat - матрицы (swarmsize, dimension)
+    localBestFinalFuncs.dat - вектор (swarmsize,)
+
+Итерация проходит по рою блоками по chunksize частиц: часть файлов с блоком отображается
+в память, копируется в буферы, обновляется и записывается обратно. Пока обрабатывается
+один блок, фоновый поток читает следующий и записывает предыдущий, поэтому работа с файлами
+перекрывается с расчетом. Память процесса - два набора буферов блока - не зависит от swarmsize.
+
+Параметры алгоритма (границы, коэффициенты, способ обработки границ, ограничение скорости,
+тип чисел) и целевая функция берутся у роя-образца, как в particleswarm.restarts.
+Поддерживается только глобальная топология и расчет целевой функции в текущем процессе:
+лучшее положение роя находится редукцией по блокам и, как в Swarm, учитывается
+скоростями со следующей итерации
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from .stopping import RunResult, runUntilStopped
+from .topology import GlobalTopology
+
+# Версия формата каталога
+CHUNKED_VERSION = 1
+
+_META_FILE = "meta.json"
+
+# Массивы состояния, которые хранятся в файлах
+_ARRAYS = ("positions", "velocities", "localBestPositions", "localBestFinalFuncs")
+
+
+def getUnsupportedReason(swarm):
+    """
+    Возвращает причину, по которой рой-образец swarm нельзя использовать в ChunkedSwarm,
+    или None, если можно
+    """
+    if not isinstance(swarm.topology, GlobalTopology):
+        return "topology {} is not supported".format(type(swarm.topology).__name__)
+
+    if swarm.evaluator is not None:
+        return "the objective is evaluated by {}".format(type(swarm.evaluator).__name__)
+
+    return None
+
+
+class _ChunkState:
+    """
+    Блок роя в форме, которую понимают классы обработки границ (Boundary)
+    """
+
+    def __init__(self, minvalues, maxvalues, rng):
+        self.positions = None
+        self.velocities = None
+        self.minvalues = minvalues
+        self.maxvalues = maxvalues
+        self.rng = rng
+
+
+class _ChunkBuffers:
+    """
+    Буферы одного блока частиц. Блок занимает первые count строк буферов
+    """
+
+    def __init__(self, chunksize, dimension, dtype):
+        self.arrays = {
+            name: np.empty((chunksize,) if name == "localBestFinalFuncs" else (chunksize, dimension), dtype)
+            for name in _ARRAYS
+        }
+        self.start = 0
+        self.count = 0
+
+    def __getitem__(self, name):
+        return self.arrays[name][: self.count]
+
+
+class ChunkedSwarm:
+    """
+    Рой, который хранится в каталоге path и обновляется блоками:
+
+        sample = SwarmRastrigin(1, [-5.12] * 100, [5.12] * 100, 0.5, 2.0, 5.0, dtype="float32")
+        with ChunkedSwarm(sample, 20_000_000, "big.swarm", seed=1) as swarm:
+            result = swarm.run(maxIterations=100)
+    """
+
+    def __init__(
+        self,
+        swarm,
+        swarmsize: int,
+        path,
+        chunksize: int = 16384,
+        seed=None,
+        resume: bool = False,
+    ):
+        """
+        swarm - рой-образец: от него берутся границы, коэффициенты, способ обработки границ,
+            ограничение скорости, тип чисел и целевая функция. Состояние самого роя не изменяется
+        swarmsize - размер роя
+        path - каталог состояния, создается при необходимости
+        chunksize - количество частиц в блоке
+        seed - начальное значение генератора случайных чисел.
+            None - независимый генератор, порожденный от генератора роя-образца
+        resume - продолжить с состояния, сохраненного в path, если оно есть.
+            Иначе рой создается заново. Состояние, в котором итерация была прервана,
+            продолжить нельзя (ValueError)
+        """
+        assert swarmsize >= 1
+        assert chunksize >= 1
+
+        reason = getUnsupportedReason(swarm)
+        if reason is not None:
+            raise ValueError("ChunkedSwarm cannot run this swarm: " + reason)
+
+        self._swarm = swarm
+        self._swarmsize = swarmsize
+        self._dimension = swarm.dimension
+        self._dtype = np.dtype(swarm.dtype)
+        self._path = path
+        self._chunksize = min(chunksize, swarmsize)
+
+        self._rng = swarm.spawnGenerators(1)[0] if seed is None else np.random.default_rng(seed)
+        self._state = _ChunkState(swarm.minvalues, swarm.maxvalues, self._rng)
+
+        # Два набора буферов: в один читается следующий блок, пока обрабатывается другой
+        self._buffers = [
+            _ChunkBuffers(self._chunksize, self._dimension, self._dtype) for _ in range(2)
+        ]
+        # Коэффициенты хранятся как (chunksize, 2, dimension), чтобы часть буфера
+        # для неполного последнего блока оставалась непрерывной
+        self._randomCoefficients = np.empty((self._chunksize, 2, self._dimension), self._dtype)
+        self._differences = np.empty((self._chunksize, self._dimension), self._dtype)
+        self._improved = np.empty(self._chunksize, dtype=bool)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._iteration = 0
+        self._evaluationCount = 0
+        self._globalBestFinalFunc: Optional[float] = None
+        self._globalBestPosition = np.empty(self._dimension)
+        self._lowerCorner = np.empty(self._dimension)
+        self._upperCorner = np.empty(self._dimension)
+        self._iterationCallbacks = []
+
+        # Лучшее положение и границы роя, найденные на текущей итерации
+        self._candidateFinalFunc = None
+        self._candidatePosition = np.empty(self._dimension)
+
+        if resume and os.path.exists(os.path.join(path, _META_FILE)):
+            self._readMeta()
+        else:
+            self._createSwarm()
+
+    def __len__(self):
+        return self._swarmsize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Дождаться окончания записи и остановить фоновый поток
+        """
+        self._executor.shutdown(wait=True)
+
+    def _getChunks(self):
+        """
+        Начало и размер каждого блока
+        """
+        return [
+            (start, min(self._chunksize, self._swarmsize - start))
+            for start in range(0, self._swarmsize, self._chunksize)
+        ]
+
+    def _openArray(self, name, start, count, mode):
+        """
+        Отобразить в память строки [start, start + count) файла массива name
+        """
+        rowShape = () if name == "localBestFinalFuncs" else (self._dimension,)
+        rowSize = self._dtype.itemsize * int(np.prod(rowShape))
+
+        return np.memmap(
+            os.path.join(self._path, name + ".dat"),
+            dtype=self._dtype,
+            mode=mode,
+            offset=start * rowSize,
+            shape=(count,) + rowShape,
+        )
+
+    def _assign(self, buffers, start, count):
+        """
+        Отдать буферы блоку [start, start + count) без чтения файлов
+        """
+        buffers.start = start
+        buffers.count = count
+
+    def _load(self, buffers, start, count):
+        """
+        Прочитать блок [start, start + count) в буферы
+        """
+        buffers.start = start
+        buffers.count = count
+
+        for name in _ARRAYS:
+            np.copyto(buffers[name], self._openArray(name, start, count, "r"))
+
+    def _store(self, buffers):
+        """
+        Записать буферы блока в файлы
+        """
+        for name in _ARRAYS:
+            chunk = self._openArray(name, buffers.start, buffers.count, "r+")
+            chunk[...] = buffers[name]
+            chunk.flush()
+
+    def _forEachChunk(self, process, load=True):
+        """
+        Обработать рой по блокам: process(buffers) изменяет буферы блока на месте.
+        Чтение следующего блока и запись предыдущего выполняются фоновым потоком
+        во время обработки текущего. Потоку передаются задания по порядку,
+        поэтому буферы блока не перезаписываются чтением, пока они не записаны в файлы
+        """
+        chunks = self._getChunks()
+        prepare = self._load if load else self._assign
+        stores = []
+
+        pending = self._executor.submit(prepare, self._buffers[0], *chunks[0])
+        for index in range(len(chunks)):
+            buffers = self._buffers[index % 2]
+            pending.result()
+
+            # Подготовка следующего блока ставится в очередь после записи предыдущего
+            # блока из тех же буферов
+            if index + 1 < len(chunks):
+                pending = self._executor.submit(
+                    prepare, self._buffers[(index + 1) % 2], *chunks[index + 1]
+                )
+
+            process(buffers)
+            stores.append(self._executor.submit(self._store, buffers))
+
+        for store in stores:
+            store.result()
+
+    def _createFiles(self):
+        os.makedirs(self._path, exist_ok=True)
+
+        for name in _ARRAYS:
+            rowSize = self._dtype.itemsize * (1 if name == "localBestFinalFuncs" else self._dimension)
+            with open(os.path.join(self._path, name + ".dat"), "wb") as file:
+                file.truncate(self._swarmsize * rowSize)
+
+    def _createSwarm(self):
+        """
+        Создать рой из частиц со случайными координатами
+        """
+        self._createFiles()
+        self._writeMeta(inProgress=True)
+
+        minvalues = self._swarm.minvalues
+        maxvalues = self._swarm.maxvalues
+        maxVelocity = maxvalues - minvalues
+        if self._swarm.maxVelocity is not None:
+            maxVelocity = np.minimum(maxVelocity, self._swarm.maxVelocity)
+
+        def initialize(buffers):
+            shape = (buffers.count, self._dimension)
+            positions = buffers["positions"]
+            positions[...] = self._rng.random(shape, self._dtype) * (maxvalues - minvalues) + minvalues
+            buffers["velocities"][...] = (
+                self._rng.random(shape, self._dtype) * (2.0 * maxVelocity) - maxVelocity
+            )
+            buffers["localBestPositions"][...] = positions
+            buffers["localBestFinalFuncs"][...] = self._evaluate(positions)
+            self._reduce(positions, buffers["localBestFinalFuncs"])
+
+        self._startReduction()
+        self._forEachChunk(initialize, load=False)
+        self._finishReduction()
+        self._writeMeta()
+
+    def _evaluate(self, positions):
+        self._evaluationCount += len(positions)
+        return np.asarray(self._swarm._finalFuncBatch(positions), dtype=self._dtype)
+
+    def _startReduction(self):
+        self._candidateFinalFunc = None
+        self._lowerCorner.fill(np.inf)
+        self._upperCorner.fill(-np.inf)
+
+    def _reduce(self, positions, finalFuncs):
+        """
+        Учесть блок в лучшем значении и границах роя на текущей итерации
+        """
+        best = np.argmin(finalFuncs)
+        if self._candidateFinalFunc is None or finalFuncs[best] < self._candidateFinalFunc:
+            self._candidateFinalFunc = float(finalFuncs[best])
+            self._candidatePosition[...] = positions[best]
+
+        np.minimum(self._lowerCorner, positions.min(axis=0), out=self._lowerCorner)
+        np.maximum(self._upperCorner, positions.max(axis=0), out=self._upperCorner)
+
+    def _finishReduction(self):
+        """
+        Обновить лучшее положение роя после обработки всех блоков
+        """
+        if self._globalBestFinalFunc is None or self._candidateFinalFunc < self._globalBestFinalFunc:
+            self._globalBestFinalFunc = self._candidateFinalFunc
+            self._globalBestPosition[...] = self._candidatePosition
+
+    def _updateChunk(self, buffers):
+        """
+        Итерация для одного блока частиц. Порядок операций тот же, что в Swarm._updateVelocities
+        """
+        swarm = self._swarm
+        count = buffers.count
+        positions = buffers["positions"]
+        velocities = buffers["velocities"]
+        localBestPositions = buffers["localBestPositions"]
+        localBestFinalFuncs = buffers["localBestFinalFuncs"]
+
+        coefficients = self._randomCoefficients[:count]
+        differences = self._differences[:count]
+        self._rng.random(dtype=self._dtype, out=coefficients)
+        rnd_localBestPosition = coefficients[:, 0]
+        rnd_globalBestPosition = coefficients[:, 1]
+
+        rnd_localBestPosition *= swarm.commonRatio * swarm.localVelocityRatio
+        np.subtract(localBestPositions, positions, out=differences)
+        rnd_localBestPosition *= differences
+
+        rnd_globalBestPosition *= swarm.commonRatio * swarm.globalVelocityRatio
+        np.subtract(self._globalBestPosition, positions, out=differences)
+        rnd_globalBestPosition *= differences
+
+        velocities *= swarm.commonRatio
+        velocities += rnd_localBestPosition
+        velocities += rnd_globalBestPosition
+
+        if swarm.maxVelocity is not None:
+            np.clip(velocities, -swarm.maxVelocity, swarm.maxVelocity, out=velocities)
+
+        positions += velocities
+        self._state.positions = positions
+        self._state.velocities = velocities
+        swarm.boundary.apply(self._state)
+
+        finalFuncs = self._evaluate(positions)
+        improved = np.less(finalFuncs, localBestFinalFuncs, out=self._improved[:count])
+        np.copyto(localBestPositions, positions, where=improved[:, np.newaxis])
+        np.copyto(localBestFinalFuncs, finalFuncs, where=improved)
+
+        self._reduce(positions, finalFuncs)
+
+    def nextIteration(self):
+        """
+        Выполнить следующую итерацию алгоритма
+        """
+        self._writeMeta(inProgress=True)
+        self._startReduction()
+        self._forEachChunk(self._updateChunk)
+        self._finishReduction()
+
+        self._iteration += 1
+        self._writeMeta()
+
+        for callback in self._iterationCallbacks:
+            callback(self)
+
+    def run(self, **criteria) -> RunResult:
+        """
+        Выполнять итерации, пока не сработает одно из условий остановки.
+        Условия те же, что в Swarm.run
+        """
+        return runUntilStopped(self, **criteria)
+
+    def _writeMeta(self, inProgress=False):
+        """
+        Записать meta.json. inProgress - отметка о том, что файлы блоков сейчас изменяются
+        """
+        meta = {
+            "version": CHUNKED_VERSION,
+            "swarmsize": self._swarmsize,
+            "dimension": self._dimension,
+            "dtype": self._dtype.name,
+            "iteration": self._iteration,
+            "evaluationCount": self._evaluationCount,
+            "globalBestFinalFunc": self._globalBestFinalFunc,
+            "globalBestPosition": self._globalBestPosition.tolist(),
+            "lowerCorner": self._lowerCorner.tolist(),
+            "upperCorner": self._upperCorner.tolist(),
+            "rngState": self._rng.bit_generator.state,
+            "inProgress": inProgress,
+        }
+
+        temporaryPath = os.path.join(self._path, _META_FILE + ".tmp")
+        with open(temporaryPath, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+
+        os.replace(temporaryPath, os.path.join(self._path, _META_FILE))
+
+    def _readMeta(self):
+        with open(os.path.join(self._path, _META_FILE), encoding="utf-8") as file:
+            meta = json.load(file)
+
+        if meta["version"] != CHUNKED_VERSION:
+            raise ValueError(
+                "Unsupported chunked swarm version {} in '{}', expected {}".format(
+                    meta["version"], self._path, CHUNKED_VERSION
+                )
+            )
+
+        if meta["inProgress"]:
+            raise ValueError(
+                "Chunked swarm in '{}' was interrupted after iteration {} "
+                "and cannot be resumed".format(self._path, meta["iteration"])
+            )
+
+        expected = (self._swarmsize, self._dimension, self._dtype.name)
+        stored = (meta["swarmsize"], meta["dimension"], meta["dtype"])
+        if stored != expected:
+            raise ValueError(
+                "Chunked swarm in '{}' has (swarmsize, dimension, dtype) {}, expected {}".format(
+                    self._path, stored, expected
+                )
+            )
+
+        self._iteration = meta["iteration"]
+        self._evaluationCount = meta["evaluationCount"]
+        self._globalBestFinalFunc = meta["globalBestFinalFunc"]
+        self._globalBestPosition[...] = meta["globalBestPosition"]
+        self._lowerCorner[...] = meta["lowerCorner"]
+        self._upperCorner[...] = meta["upperCorner"]
+        self._rng.bit_generator.state = meta["rngState"]
+
+    def readArray(self, name, start: int = 0, stop: Optional[int] = None):
+        """
+        Возвращает копию строк [start, stop) массива состояния name:
+        "positions", "velocities", "localBestPositions" или "localBestFinalFuncs"
+        """
+        if name not in _ARRAYS:
+            raise ValueError(
+                "Unknown array '{}', expected one of: {}".format(name, ", ".join(_ARRAYS))
+            )
+
+        stop = self._swarmsize if stop is None else min(stop, self._swarmsize)
+        return np.array(self._openArray(name, start, stop - start, "r"))
+
+    def getDiameter(self) -> float:
+        """
+        Диаметр роя после последней итерации (см. Swarm.getDiameter)
+        """
+        return float(np.linalg.norm(self._upperCorner - self._lowerCorner))
+
+    def addIterationCallback(self, callback):
+        """
+        Добавить функцию callback(swarm), вызываемую после каждой итерации
+        """
+        self._iterationCallbacks.append(callback)
+
+    def removeIterationCallback(self, callback):
+        self._iterationCallbacks.remove(callback)
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def chunksize(self):
+        return self._chunksize
+
+    @property
+    def dimension(self):
+        return self._dimension
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def rng(self):
+        return self._rng
+
+    @property
+    def iteration(self):
+        return self._iteration
+
+    @property
+    def evaluationCount(self):
+        return self._evaluationCount
+
+    @property
+    def globalBestPosition(self):
+        """
+        Лучшее положение роя. Это буфер, который обновляется на месте при каждом улучшении
+        """
+        return self._globalBestPosition
+
+    @property
+    def globalBestFinalFunc(self):
+        return self._globalBestFinalFunc
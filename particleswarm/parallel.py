@@ -0,0 +1,131 @@
+import math
+import multiprocessing
+import os
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Состояние процесса-исполнителя, заполняется один раз при запуске пула
+_workerSwarm = None
+_workerMemory = None
+_workerPositions = None
+
+
+def _initWorker(swarm, memoryName, shape, dtype):
+    """
+    Подключить процесс-исполнитель к разделяемой матрице положений
+    """
+    global _workerSwarm, _workerMemory, _workerPositions
+
+    _workerSwarm = swarm
+    _workerMemory = shared_memory.SharedMemory(name=memoryName)
+    _workerPositions = np.ndarray(shape, dtype=dtype, buffer=_workerMemory.buf)
+
+
+def _evaluateChunk(start, stop):
+    """
+    Рассчитать целевую функцию для частиц с номерами [start, stop)
+    """
+    return _workerSwarm._finalFuncBatch(_workerPositions[start:stop])
+
+
+def _release(pool, memory):
+    pool.terminate()
+    pool.join()
+
+    try:
+        memory.close()
+    except BufferError:
+        # На разделяемую память еще ссылаются массивы, отображение освободится вместе с ними
+        pass
+
+    memory.unlink()
+
+
+class ProcessPoolEvaluator:
+    """
+    Параллельный расчет целевой функции в пуле процессов.
+    Матрица положений роя хранится в разделяемой памяти, процессы-исполнители
+    считают целевую функцию для непрерывных блоков частиц и возвращают только ее значения.
+    Пул создается один раз и живет, пока рой не будет закрыт (Swarm.close)
+    """
+
+    def __init__(self, workers=None, chunksize=None, context=None):
+        """
+        workers - количество процессов-исполнителей. None - по количеству ядер
+        chunksize - количество частиц в одном задании. None - рой делится поровну между процессами
+        context - способ запуска процессов ("fork", "spawn", "forkserver"). None - по умолчанию для ОС
+        """
+        self._workers = workers if workers is not None else os.cpu_count()
+        self._chunksize = chunksize
+        self._context = context
+
+        self._memory = None
+        self._positions = None
+        self._pool = None
+        self._chunks = None
+        self._finalizer = None
+
+        assert self._workers >= 1
+        assert chunksize is None or chunksize >= 1
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def chunksize(self):
+        return self._chunksize
+
+    def attach(self, swarm, positions):
+        """
+        Перенести матрицу положений роя в разделяемую память и запустить пул процессов.
+        Возвращает матрицу в разделяемой памяти, которую рой должен использовать вместо positions
+        """
+        assert self._pool is None, "evaluator is already attached to a swarm"
+
+        self._memory = shared_memory.SharedMemory(create=True, size=max(positions.nbytes, 1))
+        self._positions = np.ndarray(positions.shape, dtype=positions.dtype, buffer=self._memory.buf)
+        self._positions[...] = positions
+
+        swarmsize = positions.shape[0]
+        chunksize = self._chunksize or math.ceil(swarmsize / self._workers)
+        self._chunks = [
+            (start, min(start + chunksize, swarmsize))
+            for start in range(0, swarmsize, chunksize)
+        ]
+
+        context = multiprocessing.get_context(self._context)
+        self._pool = context.Pool(
+            self._workers,
+            initializer=_initWorker,
+            initargs=(swarm, self._memory.name, positions.shape, positions.dtype),
+        )
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._memory)
+
+        return self._positions
+
+    def evaluate(self, swarm, positions):
+        """
+        Рассчитать целевую функцию для каждой строки матрицы positions.
+        Параллельно считается только матрица положений роя, лежащая в разделяемой памяти,
+        остальные матрицы считаются в текущем процессе
+        """
+        if positions is not self._positions:
+            return swarm._finalFuncBatch(positions)
+
+        return np.concatenate(self._pool.starmap(_evaluateChunk, self._chunks))
+
+    def close(self):
+        """
+        Остановить процессы-исполнители и освободить разделяемую память
+        """
+        self._positions = None
+
+        if self._finalizer is not None:
+            self._finalizer()
+
+        self._pool = None
+        self._memory = None
+        self._finalizer = None
@@ -0,0 +1,153 @@
+"""
+Профилирование запусков роя.
+
+profile(path, mode) - контекстный менеджер, записывающий профиль выполнения своего блока в файл:
+    mode="cprofile" - детерминированный профиль cProfile (читается через pstats или snakeviz)
+    mode="sampling" - выборочный профиль: стек профилируемого потока снимается каждые interval секунд,
+        результат записывается в формате свернутых стеков (flamegraph.pl, speedscope)
+
+Чтобы профилировать программу без ее изменения, задайте переменную окружения
+PARTICLESWARM_PROFILE=путь[:режим], например PARTICLESWARM_PROFILE=run.prof:cprofile.
+Профилирование начнется при импорте particleswarm и завершится при выходе из программы
+"""
+
+import atexit
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_ENVIRONMENT_VARIABLE = "PARTICLESWARM_PROFILE"
+
+MODES = ("cprofile", "sampling")
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик: отдельный поток периодически снимает стек вызовов
+    профилируемого потока и подсчитывает, сколько раз встретился каждый стек
+    """
+
+    def __init__(self, interval: float = 0.001, thread=None):
+        """
+        interval - период снятия стека в секундах
+        thread - профилируемый поток. None - поток, вызвавший start
+        """
+        self._interval = interval
+        self._threadId = thread.ident if thread is not None else None
+        self._stacks = Counter()
+        self._stopEvent = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if self._threadId is None:
+            self._threadId = threading.get_ident()
+
+        self._stopEvent.clear()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stopEvent.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample(self):
+        while not self._stopEvent.wait(self._interval):
+            frame = sys._current_frames().get(self._threadId)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    "{} ({}:{})".format(
+                        code.co_name, os.path.basename(code.co_filename), code.co_firstlineno
+                    )
+                )
+                frame = frame.f_back
+
+            self._stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def stacks(self):
+        """
+        Количество попаданий каждого стека, стек записан от внешней функции к внутренней через ";"
+        """
+        return self._stacks
+
+    def dump(self, path):
+        """
+        Записать профиль в формате свернутых стеков: "стек количество" в каждой строке
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self._stacks.most_common():
+                file.write("{} {}\n".format(stack, count))
+
+
+def _createProfiler(mode, interval):
+    if mode == "cprofile":
+        return cProfile.Profile()
+
+    if mode == "sampling":
+        return SamplingProfiler(interval)
+
+    raise ValueError(
+        "Unknown profiler mode '{}', expected one of: {}".format(mode, ", ".join(MODES))
+    )
+
+
+def _start(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.enable()
+    else:
+        profiler.start()
+
+
+def _stop(profiler, path):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        profiler.dump(path)
+
+
+@contextmanager
+def profile(path, mode: str = "cprofile", interval: float = 0.001):
+    """
+    Профилировать блок кода и записать результат в файл path
+    mode - "cprofile" или "sampling"
+    interval - период снятия стека для режима "sampling" в секундах
+    """
+    profiler = _createProfiler(mode, interval)
+    _start(profiler)
+    try:
+        yield profiler
+    finally:
+        _stop(profiler, path)
+
+
+def startFromEnvironment():
+    """
+    Начать профилирование всей программы, если задана переменная окружения PARTICLESWARM_PROFILE.
+    Профиль записывается при завершении программы. Возвращает профилировщик или None
+    """
+    value = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    if not value:
+        return None
+
+    # Режим указывается после последнего двоеточия, само двоеточие может быть и частью пути
+    path, separator, mode = value.rpartition(":")
+    if not separator or mode not in MODES:
+        path, mode = value, "cprofile"
+
+    profiler = _createProfiler(mode, 0.001)
+    _start(profiler)
+    atexit.register(_stop, profiler, path)
+
+    return profiler
@@ -0,0 +1,273 @@
+"""
+Отрисовка сеток поверхностей (particleswarm.mesh, particleswarm.surfacecache)
+и частиц через буферы вершин OpenGL.
+OpenGL загружается при первой отрисовке, а не при импорте модуля
+"""
+
+import ctypes
+from collections import OrderedDict
+
+from .lazy import lazyImport
+from .mesh import getFitnessColors, getParticleVertices
+from .surfacecache import chooseResolution, getVisibleRange
+
+gl = lazyImport("OpenGL.GL")
+
+
+class SurfaceRenderer:
+    """
+    Буферы вершин одной сетки поверхности в текущем контексте OpenGL.
+    Данные загружаются в видеопамять при первом вызове draw, после этого
+    каждый кадр рисуется одним вызовом glDrawElements.
+    Буферы принадлежат контексту, в котором были созданы: для каждого окна
+    со своим контекстом нужен отдельный SurfaceRenderer
+    """
+
+    def __init__(self, mesh):
+        """
+        mesh - SurfaceMesh
+        """
+        self._mesh = mesh
+        self._buffers = None
+
+    def upload(self):
+        """
+        Загрузить массивы сетки в буферы текущего контекста OpenGL
+        """
+        if self._buffers is not None:
+            return
+
+        mesh = self._mesh
+        self._buffers = list(gl.glGenBuffers(4))
+        arrays = (mesh.vertices, mesh.normals, mesh.colors)
+
+        for buffer, array in zip(self._buffers, arrays):
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, buffer)
+            gl.glBufferData(gl.GL_ARRAY_BUFFER, array.nbytes, array, gl.GL_STATIC_DRAW)
+
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, self._buffers[3])
+        gl.glBufferData(
+            gl.GL_ELEMENT_ARRAY_BUFFER, mesh.indices.nbytes, mesh.indices, gl.GL_STATIC_DRAW
+        )
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        """
+        Нарисовать поверхность в текущем контексте OpenGL
+        """
+        self.upload()
+        vertexBuffer, normalBuffer, colorBuffer, indexBuffer = self._buffers
+
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_NORMAL_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vertexBuffer)
+        gl.glVertexPointer(3, gl.GL_FLOAT, 0, ctypes.c_void_p(0))
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, normalBuffer)
+        gl.glNormalPointer(gl.GL_FLOAT, 0, ctypes.c_void_p(0))
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, colorBuffer)
+        gl.glColorPointer(3, gl.GL_FLOAT, 0, ctypes.c_void_p(0))
+
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, indexBuffer)
+        gl.glDrawElements(
+            gl.GL_TRIANGLES, len(self._mesh.indices), gl.GL_UNSIGNED_INT, ctypes.c_void_p(0)
+        )
+
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, 0)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_NORMAL_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+    def release(self):
+        """
+        Удалить буферы. Вызывается, пока контекст, в котором они созданы, еще текущий
+        """
+        if self._buffers is not None:
+            gl.glDeleteBuffers(len(self._buffers), self._buffers)
+            self._buffers = None
+
+    @property
+    def mesh(self):
+        return self._mesh
+
+
+class ParticleRenderer:
+    """
+    Отрисовка частиц точками из массивов вершин и цветов. Вершины и цвета
+    хранятся в собственных буферах и перезаписываются на месте при каждом update,
+    в видеопамять они передаются одним вызовом glBufferData на кадр.
+    Как и SurfaceRenderer, объект привязан к контексту OpenGL, в котором впервые рисует
+    """
+
+    def __init__(
+        self, pointSize: float = 5.0, color=(1.0, 0.0, 0.0), colorByFitness: bool = False
+    ):
+        """
+        pointSize - размер точки в пикселях
+        color - цвет RGB всех частиц, если colorByFitness равен False
+        colorByFitness - раскрашивать частицы по значениям целевой функции (mesh.getFitnessColors)
+        """
+        self._pointSize = pointSize
+        self._color = color
+        self._colorByFitness = colorByFitness
+
+        self._vertices = None
+        self._colors = None
+        self._buffers = None
+
+    def update(self, positions, heights, finalFuncs=None):
+        """
+        Подготовить вершины частиц к отрисовке
+        positions - матрица положений (N, dimension)
+        heights - высота точек: вектор (N,) или число (например, 0 для плоского вида)
+        finalFuncs - значения целевой функции (N,) для раскраски при colorByFitness
+        """
+        self._vertices = getParticleVertices(positions, heights, out=self._vertices)
+
+        if self._colorByFitness:
+            self._colors = getFitnessColors(finalFuncs, out=self._colors)
+
+    def draw(self):
+        """
+        Нарисовать частицы в текущем контексте OpenGL
+        """
+        if self._vertices is None:
+            return
+
+        if self._buffers is None:
+            self._buffers = list(gl.glGenBuffers(2))
+
+        vertexBuffer, colorBuffer = self._buffers
+
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vertexBuffer)
+        gl.glBufferData(
+            gl.GL_ARRAY_BUFFER, self._vertices.nbytes, self._vertices, gl.GL_STREAM_DRAW
+        )
+        gl.glVertexPointer(3, gl.GL_FLOAT, 0, ctypes.c_void_p(0))
+
+        if self._colorByFitness:
+            gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, colorBuffer)
+            gl.glBufferData(
+                gl.GL_ARRAY_BUFFER, self._colors.nbytes, self._colors, gl.GL_STREAM_DRAW
+            )
+            gl.glColorPointer(3, gl.GL_FLOAT, 0, ctypes.c_void_p(0))
+        else:
+            gl.glColor3f(*self._color)
+
+        gl.glPointSize(self._pointSize)
+        gl.glDrawArrays(gl.GL_POINTS, 0, len(self._vertices))
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+    def release(self):
+        """
+        Удалить буферы. Вызывается, пока контекст, в котором они созданы, еще текущий
+        """
+        if self._buffers is not None:
+            gl.glDeleteBuffers(len(self._buffers), self._buffers)
+            self._buffers = None
+
+
+class LevelOfDetailSurface:
+    """
+    Поверхность, сетка которой выбирается по расстоянию камеры: видимая часть области
+    и разрешение определяются функциями surfacecache.getVisibleRange и chooseResolution,
+    сетки берутся из SurfaceMeshCache. Буферы нескольких последних сеток остаются
+    в видеопамяти, буферы вытесненных сеток удаляются.
+    Объект привязан к контексту OpenGL, в котором рисует
+    """
+
+    def __init__(
+        self,
+        cache,
+        name,
+        function,
+        xRange,
+        yRange,
+        color=(0.2, 0.5, 0.8),
+        fieldOfView: float = 45.0,
+        viewportSize: int = 800,
+        pixelsPerCell: float = 4.0,
+        minResolution: int = 16,
+        maxResolution: int = 512,
+        capacity: int = 4,
+    ):
+        """
+        cache - SurfaceMeshCache
+        name, function, xRange, yRange, color - поверхность (см. SurfaceMeshCache.getMesh)
+        fieldOfView, viewportSize, pixelsPerCell, minResolution, maxResolution -
+            параметры выбора разрешения (см. surfacecache.chooseResolution)
+        capacity - количество сеток, буферы которых хранятся в видеопамяти
+        """
+        self._cache = cache
+        self._name = name
+        self._function = function
+        self._xRange = xRange
+        self._yRange = yRange
+        self._color = color
+        self._fieldOfView = fieldOfView
+        self._viewportSize = viewportSize
+        self._pixelsPerCell = pixelsPerCell
+        self._minResolution = minResolution
+        self._maxResolution = maxResolution
+        self._capacity = capacity
+
+        self._renderers = OrderedDict()
+
+    def selectLevel(self, cameraDistance: float, center=(0.0, 0.0)):
+        """
+        Возвращает видимые диапазоны по x и y и разрешение сетки для камеры
+        на расстоянии cameraDistance, направленной в точку center
+        """
+        xRange = getVisibleRange(self._xRange, center[0], cameraDistance, self._fieldOfView)
+        yRange = getVisibleRange(self._yRange, center[1], cameraDistance, self._fieldOfView)
+
+        resolution = chooseResolution(
+            cameraDistance,
+            max(xRange[1] - xRange[0], yRange[1] - yRange[0]),
+            viewportSize=self._viewportSize,
+            fieldOfView=self._fieldOfView,
+            pixelsPerCell=self._pixelsPerCell,
+            minResolution=self._minResolution,
+            maxResolution=self._maxResolution,
+        )
+
+        return xRange, yRange, resolution
+
+    def draw(self, cameraDistance: float, center=(0.0, 0.0)):
+        """
+        Нарисовать поверхность в текущем контексте OpenGL
+        """
+        level = self.selectLevel(cameraDistance, center)
+
+        renderer = self._renderers.get(level)
+        if renderer is None:
+            mesh = self._cache.getMesh(self._name, self._function, *level, color=self._color)
+            renderer = SurfaceRenderer(mesh)
+            self._renderers[level] = renderer
+
+            if len(self._renderers) > self._capacity:
+                _, evicted = self._renderers.popitem(last=False)
+                evicted.release()
+        else:
+            self._renderers.move_to_end(level)
+
+        renderer.draw()
+
+    def release(self):
+        """
+        Удалить буферы всех сеток. Вызывается, пока контекст еще текущий
+        """
+        for renderer in self._renderers.values():
+            renderer.release()
+
+        self._renderers.clear()
@@ -0,0 +1,225 @@
+"""
+Воспроизведение записанной траектории роя (см. particleswarm.trajectory).
+
+ReplayPlayer не зависит от графических библиотек: он хранит номер текущего кадра,
+паузу, скорость и прореживание кадров, а кадры читает из записи по мере необходимости.
+Прореживание задает только шаг воспроизведения: переход к кадру (seek, seekIteration,
+Home / End) выполняется точно, в том числе к последнему кадру записи.
+Программы визуализации вызывают update с прошедшим временем и рисуют кадр
+из свойства frame.
+
+Управление с клавиатуры в окне glfw (createKeyCallback):
+    пробел - пауза / продолжить
+    стрелки влево / вправо - на шаг назад / вперед (шаг - frameSkip кадров)
+    стрелки вверх / вниз - увеличить / уменьшить скорость вдвое
+    [ / ] - уменьшить / увеличить frameSkip
+    Home / End - в начало / в конец записи
+    L - зациклить воспроизведение
+"""
+
+import numpy as np
+
+from .trajectory import TrajectoryReader
+
+
+class ReplayPlayer:
+    """
+    Состояние воспроизведения записанной траектории
+    """
+
+    MIN_SPEED = 1.0 / 64.0
+    MAX_SPEED = 64.0
+
+    def __init__(
+        self,
+        reader,
+        framesPerSecond: float = 30.0,
+        speed: float = 1.0,
+        frameSkip: int = 1,
+        loop: bool = False,
+    ):
+        """
+        reader - TrajectoryReader или путь к каталогу записи
+        framesPerSecond - количество кадров записи в секунду при скорости 1
+        speed - множитель скорости воспроизведения
+        frameSkip - при воспроизведении и шагах показывать каждый frameSkip-й кадр
+        loop - начинать сначала после последнего кадра
+        """
+        assert framesPerSecond > 0
+        assert frameSkip >= 1
+
+        if not isinstance(reader, TrajectoryReader):
+            reader = TrajectoryReader(reader)
+
+        if len(reader) == 0:
+            raise ValueError("Trajectory '{}' has no frames to replay".format(reader.path))
+
+        self._reader = reader
+        self._framesPerSecond = framesPerSecond
+        self._speed = speed
+        self._frameSkip = frameSkip
+        self._loop = loop
+
+        # Номер текущего кадра и накопленная доля шага воспроизведения
+        self._position = 0
+        self._progress = 0.0
+        self._paused = False
+
+    def __len__(self):
+        return len(self._reader)
+
+    def update(self, elapsed: float):
+        """
+        Продвинуть воспроизведение на elapsed секунд. Возвращает номер текущего кадра
+        """
+        if not self._paused and len(self._reader) > 0:
+            # Воспроизведение идет целыми шагами по frameSkip кадров
+            self._progress += elapsed * self._framesPerSecond * self._speed
+            steps = int(self._progress)
+            self._progress -= steps
+
+            if steps:
+                self._position += steps * self._frameSkip
+                self._wrap()
+
+        return self.frameIndex
+
+    def _wrap(self):
+        """
+        Вернуть положение воспроизведения в пределы записи
+        """
+        lastFrame = len(self._reader) - 1
+        if self._position <= lastFrame:
+            self._position = max(self._position, 0)
+            return
+
+        if self._loop and lastFrame > 0:
+            self._position %= lastFrame + 1
+        else:
+            # Воспроизведение останавливается на последнем кадре
+            self._position = lastFrame
+            self._paused = True
+
+    def seek(self, frameIndex: int):
+        """
+        Перейти к кадру frameIndex (отрицательные значения считаются от конца)
+        """
+        if frameIndex < 0:
+            frameIndex += len(self._reader)
+
+        self._position = int(frameIndex)
+        self._progress = 0.0
+        self._wrap()
+
+    def seekIteration(self, iteration: int):
+        """
+        Перейти к первому кадру с номером итерации не меньше iteration
+        (к последнему кадру, если такого нет)
+        """
+        self.seek(int(np.searchsorted(self._reader.iterations, iteration)))
+
+    def step(self, count: int = 1):
+        """
+        Сдвинуться на count шагов по frameSkip кадров (назад при count < 0)
+        """
+        self._position += count * self._frameSkip
+        self._wrap()
+
+    def togglePause(self):
+        self._paused = not self._paused
+
+    def toggleLoop(self):
+        self._loop = not self._loop
+
+    def changeSpeed(self, factor: float):
+        """
+        Умножить скорость воспроизведения на factor
+        """
+        self._speed = float(np.clip(self._speed * factor, self.MIN_SPEED, self.MAX_SPEED))
+
+    def changeFrameSkip(self, delta: int):
+        self._frameSkip = max(self._frameSkip + delta, 1)
+
+    @property
+    def reader(self):
+        return self._reader
+
+    @property
+    def frameIndex(self):
+        """
+        Номер текущего кадра записи
+        """
+        return self._position
+
+    @property
+    def frame(self):
+        """
+        Текущий кадр: номер итерации, положения (swarmsize, dimension)
+        и значения целевой функции (swarmsize,)
+        """
+        return self._reader.getFrame(self.frameIndex)
+
+    @property
+    def bestFinalFunc(self):
+        """
+        Лучшее значение целевой функции роя в текущем кадре
+        """
+        return float(self._reader.bestFinalFuncs[self.frameIndex])
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @paused.setter
+    def paused(self, paused):
+        self._paused = paused
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @property
+    def frameSkip(self):
+        return self._frameSkip
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def getStatus(self):
+        """
+        Строка состояния для заголовка окна
+        """
+        return "iteration {} ({}/{}) x{:g} skip {}{}".format(
+            self.frame[0],
+            self.frameIndex + 1,
+            len(self._reader),
+            self._speed,
+            self._frameSkip,
+            " [paused]" if self._paused else "",
+        )
+
+
+def createKeyCallback(player, glfw):
+    """
+    Возвращает обработчик клавиатуры glfw, управляющий воспроизведением player.
+    glfw - модуль glfw программы визуализации (этот модуль его не импортирует)
+    """
+    commands = {
+        glfw.KEY_SPACE: player.togglePause,
+        glfw.KEY_RIGHT: lambda: player.step(1),
+        glfw.KEY_LEFT: lambda: player.step(-1),
+        glfw.KEY_UP: lambda: player.changeSpeed(2.0),
+        glfw.KEY_DOWN: lambda: player.changeSpeed(0.5),
+        glfw.KEY_RIGHT_BRACKET: lambda: player.changeFrameSkip(1),
+        glfw.KEY_LEFT_BRACKET: lambda: player.changeFrameSkip(-1),
+        glfw.KEY_HOME: lambda: player.seek(0),
+        glfw.KEY_END: lambda: player.seek(-1),
+        glfw.KEY_L: player.toggleLoop,
+    }
+
+    def keyCallback(window, key, scancode, action, mods):
+        if action in (glfw.PRESS, glfw.REPEAT) and key in commands:
+            commands[key]()
+
+    return keyCallback
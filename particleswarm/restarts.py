@@ -0,0 +1,125 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .topology import GlobalTopology
+
+
+class RestartResult(NamedTuple):
+    """
+    Результаты серии независимых запусков
+    bestFinalFuncs - лучшее значение целевой функции каждого запуска, вектор (runs,)
+    bestPositions - лучшее положение каждого запуска, матрица (runs, dimension)
+    convergence - лучшее значение целевой функции каждого запуска после каждой итерации,
+        матрица (runs, iterCount + 1), нулевой столбец - после инициализации роя
+    """
+
+    bestFinalFuncs: np.ndarray
+    bestPositions: np.ndarray
+    convergence: np.ndarray
+
+
+class _StackedState:
+    """
+    Состояние всех запусков в форме, которую понимают классы обработки границ (Boundary)
+    """
+
+    def __init__(self, positions, velocities, minvalues, maxvalues, rng):
+        self.positions = positions
+        self.velocities = velocities
+        self.minvalues = minvalues
+        self.maxvalues = maxvalues
+        self.rng = rng
+
+
+def runRestarts(swarm, runs: int, iterCount: int, seed=None) -> RestartResult:
+    """
+    Выполнить runs независимых запусков алгоритма с параметрами роя swarm.
+    Состояние всех запусков хранится в массивах (runs, swarmsize, dimension)
+    и обновляется одной векторной операцией за итерацию.
+    swarm - рой-образец: от него берутся размер, границы, коэффициенты, способ обработки
+        границ, тип чисел и целевая функция. Поддерживается только глобальная топология:
+        частицы каждого запуска притягиваются к лучшему положению этого запуска.
+        Состояние самого роя не изменяется
+    runs - количество независимых запусков
+    iterCount - количество итераций в каждом запуске
+    seed - начальное значение генератора случайных чисел.
+        None - независимый генератор, порожденный от генератора роя-образца
+    """
+    if not isinstance(swarm.topology, GlobalTopology):
+        raise ValueError(
+            "runRestarts cannot run this swarm: topology {} is not supported".format(
+                type(swarm.topology).__name__
+            )
+        )
+
+    rng = swarm.spawnGenerators(1)[0] if seed is None else np.random.default_rng(seed)
+
+    shape = (runs, len(swarm), swarm.dimension)
+    dtype = swarm.dtype
+    minvalues = swarm.minvalues
+    maxvalues = swarm.maxvalues
+
+    initVelocity = maxvalues - minvalues
+    if swarm.maxVelocity is not None:
+        initVelocity = np.minimum(initVelocity, swarm.maxVelocity)
+
+    positions = rng.random(shape, dtype) * (maxvalues - minvalues) + minvalues
+    velocities = rng.random(shape, dtype) * 2.0 * initVelocity - initVelocity
+    state = _StackedState(positions, velocities, minvalues, maxvalues, rng)
+
+    def evaluate():
+        finalFuncs = swarm._finalFuncBatch(positions.reshape(-1, swarm.dimension))
+        return np.asarray(finalFuncs, dtype=dtype).reshape(shape[:2])
+
+    localBestPositions = positions.copy()
+    localBestFinalFuncs = evaluate()
+
+    runIndex = np.arange(runs)
+    best = np.argmin(localBestFinalFuncs, axis=1)
+    bestFinalFuncs = localBestFinalFuncs[runIndex, best]
+    bestPositions = localBestPositions[runIndex, best]
+
+    improved = np.zeros(shape[:2], dtype=bool)
+    randomCoefficients = np.empty((2,) + shape, dtype)
+
+    convergence = np.empty((runs, iterCount + 1))
+    convergence[:, 0] = bestFinalFuncs
+
+    commonRatio = swarm.commonRatio
+    for iteration in range(1, iterCount + 1):
+        rng.random(dtype=dtype, out=randomCoefficients)
+        rnd_localBestPosition, rnd_globalBestPosition = randomCoefficients
+
+        velocities[...] = (
+            commonRatio * velocities
+            + commonRatio
+            * swarm.localVelocityRatio
+            * rnd_localBestPosition
+            * (localBestPositions - positions)
+            + commonRatio
+            * swarm.globalVelocityRatio
+            * rnd_globalBestPosition
+            * (bestPositions[:, np.newaxis, :] - positions)
+        )
+
+        if swarm.maxVelocity is not None:
+            np.clip(velocities, -swarm.maxVelocity, swarm.maxVelocity, out=velocities)
+
+        positions += velocities
+        swarm.boundary.apply(state)
+
+        finalFuncs = evaluate()
+        np.less(finalFuncs, localBestFinalFuncs, out=improved)
+        np.copyto(localBestPositions, positions, where=improved[..., np.newaxis])
+        np.copyto(localBestFinalFuncs, finalFuncs, where=improved)
+
+        best = np.argmin(localBestFinalFuncs, axis=1)
+        candidates = localBestFinalFuncs[runIndex, best]
+        better = candidates < bestFinalFuncs
+        bestFinalFuncs[better] = candidates[better]
+        bestPositions[better] = localBestPositions[runIndex[better], best[better]]
+
+        convergence[:, iteration] = bestFinalFuncs
+
+    return RestartResult(bestFinalFuncs, bestPositions, convergence)
@@ -0,0 +1,168 @@
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class StopReason:
+    """
+    Причины остановки Swarm.run
+    """
+
+    MAX_ITERATIONS = "maxIterations"
+    TARGET_FINAL_FUNC = "targetFinalFunc"
+    STAGNATION = "stagnation"
+    DIAMETER = "diameter"
+    MAX_EVALUATIONS = "maxEvaluations"
+    TIME_LIMIT = "timeLimit"
+
+
+class RunResult(NamedTuple):
+    """
+    Результат Swarm.run
+    stopReason - причина остановки (одна из констант StopReason)
+    bestPosition - лучшее найденное положение
+    bestFinalFunc - лучшее найденное значение целевой функции
+    iterations - количество итераций, выполненных за этот запуск
+    evaluations - количество расчетов целевой функции за этот запуск
+    elapsed - время запуска в секундах
+    """
+
+    stopReason: str
+    bestPosition: np.ndarray
+    bestFinalFunc: float
+    iterations: int
+    evaluations: int
+    elapsed: float
+
+
+class StoppingCriteria:
+    """
+    Набор условий остановки. Условия, равные None, не проверяются
+    """
+
+    def __init__(
+        self,
+        maxIterations: Optional[int] = None,
+        targetFinalFunc: Optional[float] = None,
+        stagnationWindow: Optional[int] = None,
+        stagnationTolerance: float = 0.0,
+        minDiameter: Optional[float] = None,
+        maxEvaluations: Optional[int] = None,
+        timeLimit: Optional[float] = None,
+    ):
+        """
+        maxIterations - максимальное количество итераций
+        targetFinalFunc - остановиться, когда лучшее значение целевой функции станет не больше этого
+        stagnationWindow - остановиться, если за столько итераций лучшее значение
+            улучшилось не больше чем на stagnationTolerance
+        stagnationTolerance - минимальное улучшение за stagnationWindow итераций
+        minDiameter - остановиться, когда диаметр роя (Swarm.getDiameter) станет меньше этого
+        maxEvaluations - максимальное количество расчетов целевой функции.
+            Итерация, которая превысила бы этот бюджет, не выполняется
+        timeLimit - максимальное время работы в секундах
+        """
+        assert any(
+            criterion is not None
+            for criterion in (
+                maxIterations,
+                targetFinalFunc,
+                stagnationWindow,
+                minDiameter,
+                maxEvaluations,
+                timeLimit,
+            )
+        ), "at least one stopping criterion is required"
+        assert stagnationWindow is None or stagnationWindow >= 1
+
+        self._maxIterations = maxIterations
+        self._targetFinalFunc = targetFinalFunc
+        self._stagnationWindow = stagnationWindow
+        self._stagnationTolerance = stagnationTolerance
+        self._minDiameter = minDiameter
+        self._maxEvaluations = maxEvaluations
+        self._timeLimit = timeLimit
+
+        self._history = None
+
+    def start(self):
+        """
+        Подготовиться к новому запуску
+        """
+        if self._stagnationWindow is not None:
+            self._history = deque(maxlen=self._stagnationWindow + 1)
+
+    def check(self, swarm, iterations, evaluations, elapsed):
+        """
+        Проверить условия остановки перед очередной итерацией.
+        Возвращает причину остановки или None, если надо продолжать
+        swarm - рой
+        iterations, evaluations, elapsed - итерации, расчеты целевой функции и время с начала запуска
+        """
+        bestFinalFunc = swarm.globalBestFinalFunc
+
+        if self._targetFinalFunc is not None and bestFinalFunc <= self._targetFinalFunc:
+            return StopReason.TARGET_FINAL_FUNC
+
+        if self._maxIterations is not None and iterations >= self._maxIterations:
+            return StopReason.MAX_ITERATIONS
+
+        if (
+            self._maxEvaluations is not None
+            and evaluations + len(swarm) > self._maxEvaluations
+        ):
+            return StopReason.MAX_EVALUATIONS
+
+        if self._timeLimit is not None and elapsed >= self._timeLimit:
+            return StopReason.TIME_LIMIT
+
+        if self._history is not None:
+            self._history.append(bestFinalFunc)
+            if (
+                len(self._history) == self._history.maxlen
+                and self._history[0] - self._history[-1] <= self._stagnationTolerance
+            ):
+                return StopReason.STAGNATION
+
+        if self._minDiameter is not None and swarm.getDiameter() < self._minDiameter:
+            return StopReason.DIAMETER
+
+        return None
+
+
+def runUntilStopped(swarm, **criteria) -> RunResult:
+    """
+    Выполнять итерации роя swarm, пока не сработает одно из условий остановки
+    (аргументы StoppingCriteria). Рой - любой объект с методом nextIteration,
+    свойствами iteration, evaluationCount, globalBestPosition, globalBestFinalFunc,
+    а также __len__ и getDiameter для условий по бюджету и диаметру
+    Возвращает RunResult с причиной остановки и лучшим найденным результатом
+    """
+    criteria = StoppingCriteria(**criteria)
+    criteria.start()
+
+    start = time.perf_counter()
+    startIteration = swarm.iteration
+    startEvaluations = swarm.evaluationCount
+
+    while True:
+        stopReason = criteria.check(
+            swarm,
+            swarm.iteration - startIteration,
+            swarm.evaluationCount - startEvaluations,
+            time.perf_counter() - start,
+        )
+        if stopReason is not None:
+            break
+
+        swarm.nextIteration()
+
+    return RunResult(
+        stopReason=stopReason,
+        bestPosition=np.array(swarm.globalBestPosition),
+        bestFinalFunc=swarm.globalBestFinalFunc,
+        iterations=swarm.iteration - startIteration,
+        evaluations=swarm.evaluationCount - startEvaluations,
+        elapsed=time.perf_counter() - start,
+    )
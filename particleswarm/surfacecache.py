@@ -0,0 +1,169 @@
+"""
+Кэш сеток поверхностей и выбор уровня детализации.
+
+Сетки (particleswarm.mesh.SurfaceMesh) хранятся по ключу (имя поверхности, границы, разрешение)
+в LRU-кэше в памяти и, при необходимости, в каталоге на диске, поэтому повторные запуски
+и возврат к прежнему масштабу не строят сетку заново.
+Разрешение и видимая область выбираются по расстоянию камеры (chooseResolution,
+getVisibleRange) и округляются до фиксированных уровней, чтобы небольшие изменения
+масштаба попадали в уже построенные сетки. Модуль не использует OpenGL
+"""
+
+import hashlib
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from .mesh import SurfaceMesh, buildSurfaceMesh
+
+
+def chooseResolution(
+    cameraDistance: float,
+    regionSize: float,
+    viewportSize: int = 800,
+    fieldOfView: float = 45.0,
+    pixelsPerCell: float = 4.0,
+    minResolution: int = 16,
+    maxResolution: int = 512,
+) -> int:
+    """
+    Количество узлов сетки по оси, при котором ячейка занимает на экране около pixelsPerCell
+    пикселей. Результат - степень двойки в пределах [minResolution, maxResolution]
+    cameraDistance - расстояние от камеры до поверхности
+    regionSize - размер отображаемой области поверхности по оси
+    viewportSize - размер окна в пикселях
+    fieldOfView - угол обзора камеры в градусах
+    """
+    visibleSize = 2.0 * cameraDistance * math.tan(math.radians(fieldOfView) / 2.0)
+    projectedSize = viewportSize * regionSize / max(visibleSize, 1e-12)
+
+    resolution = 2 ** round(math.log2(max(projectedSize / pixelsPerCell, 1.0)))
+    return int(min(max(resolution, minResolution), maxResolution))
+
+
+def getVisibleRange(bounds, center: float, cameraDistance: float, fieldOfView=45.0, tiles=8):
+    """
+    Часть отрезка bounds = (минимум, максимум), видимая с расстояния cameraDistance
+    при взгляде в точку center. Границы округляются наружу до сетки из tiles плиток,
+    поэтому близкие положения камеры дают одинаковые области
+    """
+    low, high = bounds
+    tileSize = (high - low) / tiles
+    halfSize = cameraDistance * math.tan(math.radians(fieldOfView) / 2.0)
+
+    visibleLow = math.floor((center - halfSize - low) / tileSize) * tileSize + low
+    visibleHigh = math.ceil((center + halfSize - low) / tileSize) * tileSize + low
+
+    return max(visibleLow, low), min(visibleHigh, high)
+
+
+class SurfaceMeshCache:
+    """
+    LRU-кэш сеток поверхностей в памяти с необязательным хранением на диске
+    """
+
+    def __init__(self, capacity: int = 8, directory=None):
+        """
+        capacity - наибольшее количество сеток в памяти
+        directory - каталог для сохранения сеток между запусками. None - только память
+        """
+        assert capacity >= 1
+
+        self._capacity = capacity
+        self._directory = directory
+        self._meshes = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._meshes)
+
+    def getMesh(self, name, function, xRange, yRange, resolution, color=(0.2, 0.5, 0.8)):
+        """
+        Возвращает сетку поверхности из кэша или строит ее через buildSurfaceMesh.
+        name - имя поверхности; оно входит в ключ вместе с границами и разрешением,
+            поэтому разные функции или раскраски должны иметь разные имена
+        Остальные параметры - как у buildSurfaceMesh
+        """
+        key = (
+            name,
+            (float(xRange[0]), float(xRange[1])),
+            (float(yRange[0]), float(yRange[1])),
+            tuple(int(count) for count in np.broadcast_to(resolution, (2,))),
+        )
+
+        mesh = self._meshes.get(key)
+        if mesh is not None:
+            self._meshes.move_to_end(key)
+            self._hits += 1
+            return mesh
+
+        self._misses += 1
+        mesh = self._load(key)
+        if mesh is None:
+            mesh = buildSurfaceMesh(function, xRange, yRange, resolution, color)
+            self._save(key, mesh)
+
+        self._meshes[key] = mesh
+        if len(self._meshes) > self._capacity:
+            self._meshes.popitem(last=False)
+
+        return mesh
+
+    def _getPath(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self._directory, "{}-{}.npz".format(key[0], digest))
+
+    def _load(self, key):
+        if self._directory is None:
+            return None
+
+        path = self._getPath(key)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            return SurfaceMesh(
+                vertices=data["vertices"],
+                normals=data["normals"],
+                colors=data["colors"],
+                indices=data["indices"],
+                shape=tuple(int(size) for size in data["shape"]),
+            )
+
+    def _save(self, key, mesh):
+        if self._directory is None:
+            return
+
+        path = self._getPath(key)
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            np.savez(
+                file,
+                vertices=mesh.vertices,
+                normals=mesh.normals,
+                colors=mesh.colors,
+                indices=mesh.indices,
+                shape=np.array(mesh.shape),
+            )
+
+        os.replace(temporaryPath, path)
+
+    def clear(self):
+        """
+        Очистить кэш в памяти (файлы на диске остаются)
+        """
+        self._meshes.clear()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
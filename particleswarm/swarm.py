@@ -1,9 +1,16 @@
 from abc import ABCMeta, abstractmethod
 from typing import Optional
 
+import time
+
 import numpy as np
 
+from .boundary import createBoundary, getPenalty
+from .checkpoint import readCheckpoint, writeCheckpoint
+from .kernels import createFusedIteration
 from .particle import Particle
+from .stopping import RunResult, runUntilStopped
+from .topology import createTopology
 
 
 class Swarm(metaclass=ABCMeta):
@@ -18,6 +25,14 @@ class Swarm(metaclass=ABCMeta):
         currentVelocityRatio: float,
         localVelocityRatio: float,
         globalVelocityRatio: float,
+        boundary="penalty",
+        maxVelocity=None,
+        evaluator=None,
+        instrumentation=None,
+        topology="global",
+        seed=None,
+        backend="auto",
+        dtype="float64",
     ):
         """
         swarmsize - размер роя (количество частиц)
@@ -25,43 +40,503 @@ class Swarm(metaclass=ABCMeta):
         maxvalues - список, задающий максимальные значения для каждой координаты частицы
         currentVelocityRatio - общий масштабирующий коэффициент для скорости
         localVelocityRatio - коэффициент, задающий влияние лучшей точки, найденной частицей на будущую скорость
-        globalVelocityRatio - коэффициент, задающий влияние лучшей точки, найденной всеми частицами на будущую скорость
+        globalVelocityRatio - коэффициент, задающий влияние лучшей точки, найденной всеми частицами
+            (соседями частицы для локальных топологий) на будущую скорость
+        boundary - способ обработки выхода частиц за границы: "penalty" (только штраф в целевой функции),
+            "clip", "reflect", "periodic", "random" или экземпляр класса Boundary
+        maxVelocity - ограничение модуля скорости: число или список для каждой координаты.
+            None - скорость не ограничивается
+        evaluator - объект для параллельного расчета целевой функции (например, ProcessPoolEvaluator).
+            None - целевая функция считается в текущем процессе
+        instrumentation - экземпляр Instrumentation для сбора времени этапов итерации и счетчиков.
+            None - измерения не выполняются
+        topology - топология соседства: "global" (все частицы притягиваются к лучшему положению роя),
+            "ring", "vonneumann", "random" или экземпляр класса Topology
+        seed - начальное значение генератора случайных чисел роя: число, numpy.random.SeedSequence
+            или готовый numpy.random.Generator. None - случайное начальное значение
+        backend - способ выполнения итерации: "numpy", "numba" (один параллельный цикл
+            по частицам, см. particleswarm.kernels) или "auto" - "numba", если он доступен
+            и поддерживает этот рой
+        dtype - тип чисел для положений, скоростей, лучших положений частиц и значений
+            целевой функции: "float64" или "float32". float32 вдвое уменьшает объем памяти
+            и передаваемых данных на итерацию. Лучшее положение и лучшее значение роя
+            всегда хранятся в float64
         """
         self._swarmsize = swarmsize
 
         assert len(minvalues) == len(maxvalues)
         assert (localVelocityRatio + globalVelocityRatio) > 4
 
-        self._minvalues = np.array(minvalues[:])
-        self._maxvalues = np.array(maxvalues[:])
+        self._dtype = np.dtype(dtype)
+        if self._dtype not in (np.float32, np.float64):
+            raise ValueError(
+                "Unsupported dtype '{}', expected float64 or float32".format(self._dtype)
+            )
+
+        self._minvalues = np.array(minvalues[:], dtype=self._dtype)
+        self._maxvalues = np.array(maxvalues[:], dtype=self._dtype)
+
+        self._rng = np.random.default_rng(seed)
+        self._boundary = createBoundary(boundary)
+        self._topology = createTopology(topology)
+        self._evaluator = evaluator
+        self._instrumentation = instrumentation
+        self._iterationCallbacks = []
+        self._fusedIteration = createFusedIteration(self, backend)
+
+        self._maxVelocity = None
+        if maxVelocity is not None:
+            self._maxVelocity = np.broadcast_to(
+                np.abs(np.array(maxVelocity, dtype=self._dtype)), self._minvalues.shape
+            )
 
         self._currentVelocityRatio = currentVelocityRatio
         self._localVelocityRatio = localVelocityRatio
         self._globalVelocityRatio = globalVelocityRatio
 
+        veloRatio = localVelocityRatio + globalVelocityRatio
+        # Обычное число, а не скаляр NumPy: в операциях с массивами float32 оно не повышает
+        # точность до float64, и результат не зависит от того, восстановлен ли рой из setState
+        self._commonRatio = float(
+            2.0
+            * currentVelocityRatio
+            / (np.abs(2.0 - veloRatio - np.sqrt(veloRatio**2 - 4.0 * veloRatio)))
+        )
+
         self._globalBestFinalFunc: Optional[float] = None
         self._globalBestPosition = None
 
-        self._swarm = self._createSwarm()
+        # Состояние роя хранится в виде массивов: строка - частица, столбец - координата
+        self._positions = None
+        self._velocities = None
+        self._localBestPositions = None
+        self._localBestFinalFuncs = None
+        self._finalFuncs = None
+        # Маска частиц, улучшивших свое лучшее значение на последней итерации
+        self._improved = None
+        # Буфер для случайных коэффициентов скорости, заполняется одним вызовом генератора
+        self._randomCoefficients = None
+        # Буфер для разностей между лучшими и текущими положениями
+        self._differences = None
+
+        self._iteration = 0
+        self._evaluationCount = 0
+        # Время выполнения итераций в секундах, сохраняется в контрольных точках
+        self._elapsed = 0.0
+
+        self._createSwarm()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        # Пул процессов, разделяемая память и наблюдатели не передаются в другие процессы
+        state = self.__dict__.copy()
+        state["_evaluator"] = None
+        state["_instrumentation"] = None
+        state["_iterationCallbacks"] = []
+        return state
+
+    def close(self):
+        """
+        Освободить ресурсы, занятые для параллельного расчета целевой функции
+        """
+        if self._evaluator is not None:
+            self._positions = self._positions.copy()
+            self._evaluator.close()
+            self._evaluator = None
+
+    def __len__(self):
+        return self._swarmsize
 
     def __getitem__(self, index):
         """
         Возвращает частицу с заданным номером
         """
-        return self._swarm[index]
+        if index < 0:
+            index += self._swarmsize
+
+        if not 0 <= index < self._swarmsize:
+            raise IndexError("particle index out of range")
+
+        return Particle(self, index)
+
+    def __iter__(self):
+        return (Particle(self, index) for index in range(self._swarmsize))
 
     def _createSwarm(self):
         """
         Создать рой из частиц со случайными координатами
         """
-        return [Particle(self) for _ in range(self._swarmsize)]
+        self._positions = self._getInitPositions()
+        if self._evaluator is not None:
+            self._positions = self._evaluator.attach(self, self._positions)
+
+        self._localBestPositions = self._positions.copy()
+        self._finalFuncs = self.getFinalFuncBatch(self._positions)
+        self._localBestFinalFuncs = self._finalFuncs.copy()
+        self._improved = np.zeros(self._swarmsize, dtype=bool)
+        self._randomCoefficients = np.empty((2, self._swarmsize, self.dimension), self._dtype)
+        self._differences = np.empty((self._swarmsize, self.dimension), self._dtype)
+        self._velocities = self._getInitVelocities()
+
+    def _getInitPositions(self):
+        """
+        Возвращает матрицу со случайными координатами частиц для заданного интервала изменений
+        """
+        return (
+            self._rng.random((self._swarmsize, self.dimension), self._dtype)
+            * (self.maxvalues - self.minvalues)
+            + self.minvalues
+        )
+
+    def _getInitVelocities(self):
+        """
+        Сгенерировать начальные случайные скорости частиц.
+        Если задано ограничение скорости, начальные скорости лежат в его пределах
+        """
+        maxval = self.maxvalues - self.minvalues
+        if self._maxVelocity is not None:
+            maxval = np.minimum(maxval, self._maxVelocity)
+
+        minval = -maxval
+
+        return (
+            self._rng.random((self._swarmsize, self.dimension), self._dtype) * (maxval - minval)
+            + minval
+        )
+
+    def _evaluate(self, positions):
+        """
+        Рассчитать целевую функцию для каждой строки матрицы positions
+        без обновления лучшего глобального значения
+        """
+        self._evaluationCount += len(positions)
+
+        if self._evaluator is not None:
+            finalFuncs = self._evaluator.evaluate(self, positions)
+        else:
+            finalFuncs = self._finalFuncBatch(positions)
+
+        # Значения целевой функции хранятся в типе роя, даже если функция считает в другом
+        return np.asarray(finalFuncs, dtype=self._dtype)
 
     def nextIteration(self):
         """
         Выполнить следующую итерацию алгоритма
         """
-        for particle in self._swarm:
-            particle.nextIteration(self)
+        start = time.perf_counter()
+
+        if self._instrumentation is not None:
+            self._nextIterationInstrumented()
+        elif self._fusedIteration is not None:
+            self._nextIterationFused()
+        else:
+            self._updateVelocities()
+            self._updatePositions()
+            self._finalFuncs = self._evaluate(self._positions)
+            self._updateBests(self._finalFuncs)
+
+        self._iteration += 1
+        self._elapsed += time.perf_counter() - start
+
+        for callback in self._iterationCallbacks:
+            callback(self)
+
+    def _nextIterationInstrumented(self):
+        """
+        Та же итерация, что и в nextIteration, но с замером времени каждого этапа
+        """
+        start = time.perf_counter()
+        self._updateVelocities()
+        velocityDone = time.perf_counter()
+        self._updatePositions()
+        positionDone = time.perf_counter()
+        self._finalFuncs = self._evaluate(self._positions)
+        evaluationDone = time.perf_counter()
+        improved = self._updateBests(self._finalFuncs)
+        bestsDone = time.perf_counter()
+
+        self._instrumentation.recordIteration(
+            velocityTime=velocityDone - start,
+            positionTime=positionDone - velocityDone,
+            evaluationTime=evaluationDone - positionDone,
+            bestsTime=bestsDone - evaluationDone,
+            evaluations=len(self._finalFuncs),
+            improvements=int(np.count_nonzero(improved)),
+        )
+
+    def _nextIterationFused(self):
+        """
+        Та же итерация, что и в nextIteration, выполненная ядром particleswarm.kernels
+        за один проход по частицам
+        """
+        self._rng.random(dtype=self._dtype, out=self._randomCoefficients)
+        self._fusedIteration(self, self._randomCoefficients)
+        self._evaluationCount += self._swarmsize
+        self._updateGlobalBest(self._positions, self._finalFuncs)
+
+    def _updateVelocities(self):
+        """
+        Посчитать новые скорости всех частиц
+        """
+        # Случайные коэффициенты для коррекции скорости с учетом лучшей позиции каждой частицы
+        # и лучшей позиции ее соседей (всех частиц для глобальной топологии)
+        self._rng.random(dtype=self._dtype, out=self._randomCoefficients)
+        rnd_localBestPosition, rnd_globalBestPosition = self._randomCoefficients
+
+        # Слагаемые скорости считаются на месте в буферах коэффициентов и разностей,
+        # без временных матриц. Порядок операций тот же, что в формуле
+        # commonRatio * velocity + commonRatio * localVelocityRatio * rnd * (localBest - position)
+        #     + commonRatio * globalVelocityRatio * rnd * (best - position),
+        # поэтому результат совпадает с расчетом по ней до последнего бита
+        differences = self._differences
+
+        rnd_localBestPosition *= self._commonRatio * self._localVelocityRatio
+        np.subtract(self._localBestPositions, self._positions, out=differences)
+        rnd_localBestPosition *= differences
+
+        rnd_globalBestPosition *= self._commonRatio * self._globalVelocityRatio
+        np.subtract(self._topology.getBestPositions(self), self._positions, out=differences)
+        rnd_globalBestPosition *= differences
+
+        self._velocities *= self._commonRatio
+        self._velocities += rnd_localBestPosition
+        self._velocities += rnd_globalBestPosition
+
+        if self._maxVelocity is not None:
+            np.clip(
+                self._velocities, -self._maxVelocity, self._maxVelocity, out=self._velocities
+            )
+
+    def _updatePositions(self):
+        """
+        Сдвинуть частицы на их скорости и обработать выход за границы
+        """
+        self._positions += self._velocities
+        self._boundary.apply(self)
+
+    def _updateBests(self, finalFuncs):
+        """
+        Обновить лучшие положения частиц и роя по значениям целевой функции в текущих положениях.
+        Возвращает маску частиц, улучшивших свое лучшее значение
+        """
+        # Запись по маске в заранее выделенные буферы: лучшие положения остаются копиями,
+        # а не представлениями текущих положений, и не создаются новые массивы
+        improved = np.less(finalFuncs, self._localBestFinalFuncs, out=self._improved)
+        np.copyto(self._localBestPositions, self._positions, where=improved[:, np.newaxis])
+        np.copyto(self._localBestFinalFuncs, finalFuncs, where=improved)
+
+        self._updateGlobalBest(self._positions, finalFuncs)
+
+        return improved
+
+    def _updateGlobalBest(self, positions, finalFuncs):
+        """
+        Обновить лучшее значение роя, если среди finalFuncs есть лучшее
+        """
+        best = np.argmin(finalFuncs)
+        if (
+            self._globalBestFinalFunc is None
+            or finalFuncs[best] < self._globalBestFinalFunc
+        ):
+            self._globalBestFinalFunc = float(finalFuncs[best])
+            self._setGlobalBestPosition(positions[best])
+
+    def _setGlobalBestPosition(self, position):
+        """
+        Скопировать position в буфер лучшего положения роя
+        """
+        if self._globalBestPosition is None:
+            self._globalBestPosition = np.empty(self.dimension)
+
+        self._globalBestPosition[...] = position
+
+    def run(
+        self,
+        maxIterations: Optional[int] = None,
+        targetFinalFunc: Optional[float] = None,
+        stagnationWindow: Optional[int] = None,
+        stagnationTolerance: float = 0.0,
+        minDiameter: Optional[float] = None,
+        maxEvaluations: Optional[int] = None,
+        timeLimit: Optional[float] = None,
+    ) -> RunResult:
+        """
+        Выполнять итерации, пока не сработает одно из условий остановки.
+        Условия, равные None, не проверяются, но хотя бы одно должно быть задано
+        maxIterations - максимальное количество итераций
+        targetFinalFunc - остановиться, когда лучшее значение целевой функции станет не больше этого
+        stagnationWindow - остановиться, если за столько итераций лучшее значение
+            улучшилось не больше чем на stagnationTolerance
+        stagnationTolerance - минимальное улучшение за stagnationWindow итераций
+        minDiameter - остановиться, когда диаметр роя станет меньше этого
+        maxEvaluations - бюджет расчетов целевой функции на этот запуск
+        timeLimit - максимальное время работы в секундах
+        Возвращает RunResult с причиной остановки и лучшим найденным результатом
+        """
+        return runUntilStopped(
+            self,
+            maxIterations=maxIterations,
+            targetFinalFunc=targetFinalFunc,
+            stagnationWindow=stagnationWindow,
+            stagnationTolerance=stagnationTolerance,
+            minDiameter=minDiameter,
+            maxEvaluations=maxEvaluations,
+            timeLimit=timeLimit,
+        )
+
+    def getState(self):
+        """
+        Возвращает копию полного состояния роя: словарь массивов и состояние генератора
+        случайных чисел ("rngState"). По нему setState восстанавливает рой так,
+        что дальнейшие итерации повторяют траекторию исходного роя
+        """
+        state = {
+            "positions": self._positions.copy(),
+            "velocities": self._velocities.copy(),
+            "localBestPositions": self._localBestPositions.copy(),
+            "localBestFinalFuncs": self._localBestFinalFuncs.copy(),
+            "finalFuncs": self._finalFuncs.copy(),
+            "globalBestPosition": self._globalBestPosition.copy(),
+            "globalBestFinalFunc": np.array(self._globalBestFinalFunc),
+            "minvalues": self._minvalues.copy(),
+            "maxvalues": self._maxvalues.copy(),
+            "currentVelocityRatio": np.array(self._currentVelocityRatio),
+            "localVelocityRatio": np.array(self._localVelocityRatio),
+            "globalVelocityRatio": np.array(self._globalVelocityRatio),
+            "commonRatio": np.array(self._commonRatio),
+            "iteration": np.array(self._iteration),
+            "evaluationCount": np.array(self._evaluationCount),
+            "elapsed": np.array(self._elapsed),
+            "dtype": np.array(self._dtype.name),
+            "rngState": self._rng.bit_generator.state,
+        }
+
+        if self._maxVelocity is not None:
+            state["maxVelocity"] = np.array(self._maxVelocity)
+
+        for name, value in self._topology.getState().items():
+            state["topology." + name] = value
+
+        return state
+
+    def setState(self, state):
+        """
+        Восстановить состояние роя, полученное из getState.
+        Размер роя, размерность задачи и тип чисел должны совпадать с текущими
+        """
+        if str(state["dtype"]) != self._dtype.name:
+            raise ValueError(
+                "Swarm state has dtype {}, expected {}".format(state["dtype"], self._dtype.name)
+            )
+
+        if state["positions"].shape != self._positions.shape:
+            raise ValueError(
+                "Swarm state has shape {}, expected {}".format(
+                    state["positions"].shape, self._positions.shape
+                )
+            )
+
+        # Массивы копируются на место: положения могут находиться в разделяемой памяти
+        self._positions[...] = state["positions"]
+        self._velocities[...] = state["velocities"]
+        self._localBestPositions[...] = state["localBestPositions"]
+        self._localBestFinalFuncs[...] = state["localBestFinalFuncs"]
+        self._finalFuncs[...] = state["finalFuncs"]
+        self._globalBestFinalFunc = float(state["globalBestFinalFunc"])
+        self._setGlobalBestPosition(state["globalBestPosition"])
+
+        self._minvalues = np.array(state["minvalues"], dtype=self._dtype)
+        self._maxvalues = np.array(state["maxvalues"], dtype=self._dtype)
+        self._currentVelocityRatio = float(state["currentVelocityRatio"])
+        self._localVelocityRatio = float(state["localVelocityRatio"])
+        self._globalVelocityRatio = float(state["globalVelocityRatio"])
+        self._commonRatio = float(state["commonRatio"])
+        self._maxVelocity = None
+        if "maxVelocity" in state:
+            self._maxVelocity = np.array(state["maxVelocity"], dtype=self._dtype)
+
+        self._iteration = int(state["iteration"])
+        self._evaluationCount = int(state["evaluationCount"])
+        self._elapsed = float(state["elapsed"])
+        self._rng.bit_generator.state = state["rngState"]
+
+        self._topology.setState(
+            {
+                name[len("topology."):]: value
+                for name, value in state.items()
+                if name.startswith("topology.")
+            }
+        )
+
+    def saveCheckpoint(self, path):
+        """
+        Записать контрольную точку роя в файл path (формат .npz).
+        Для периодического и фонового сохранения используйте checkpoint.CheckpointWriter
+        """
+        writeCheckpoint(path, self.getState())
+
+    def loadCheckpoint(self, path):
+        """
+        Продолжить работу с контрольной точки из файла path. Рой должен быть создан
+        с той же целевой функцией, размером, размерностью и типом чисел, что и сохраненный
+        """
+        self.setState(readCheckpoint(path))
+
+    def getDiameter(self) -> float:
+        """
+        Диаметр роя - длина диагонали наименьшего параллелепипеда, содержащего все частицы
+        """
+        return float(
+            np.linalg.norm(self._positions.max(axis=0) - self._positions.min(axis=0))
+        )
+
+    def addIterationCallback(self, callback):
+        """
+        Добавить функцию callback(swarm), вызываемую после каждой итерации
+        """
+        self._iterationCallbacks.append(callback)
+
+    def removeIterationCallback(self, callback):
+        self._iterationCallbacks.remove(callback)
+
+    def getBestParticles(self, count: int):
+        """
+        Возвращает лучшие положения и значения целевой функции count частиц,
+        отсортированные по возрастанию целевой функции (копии, а не представления массивов роя)
+        """
+        count = min(count, self._swarmsize)
+        best = np.argpartition(self._localBestFinalFuncs, count - 1)[:count]
+        best = best[np.argsort(self._localBestFinalFuncs[best])]
+
+        return self._localBestPositions[best], self._localBestFinalFuncs[best]
+
+    def replaceWorstParticles(self, positions, finalFuncs):
+        """
+        Заменить частицы с худшими лучшими значениями целевой функции на переданные
+        (используется для миграции частиц между роями). Новые частицы получают нулевую скорость
+        positions - матрица (K, dimension) положений новых частиц
+        finalFuncs - вектор (K,) значений целевой функции в этих положениях
+        """
+        positions = np.atleast_2d(positions)
+        finalFuncs = np.atleast_1d(finalFuncs)
+        count = min(len(finalFuncs), self._swarmsize)
+        if count == 0:
+            return
+
+        worst = np.argpartition(self._localBestFinalFuncs, -count)[-count:]
+        self._positions[worst] = positions[:count]
+        self._finalFuncs[worst] = finalFuncs[:count]
+        self._localBestPositions[worst] = positions[:count]
+        self._localBestFinalFuncs[worst] = finalFuncs[:count]
+        # Новые частицы начинают с нулевой скоростью, а не со скоростью замененных
+        self._velocities[worst] = 0.0
+
+        self._updateGlobalBest(positions[:count], finalFuncs[:count])
 
     @property
     def minvalues(self):
@@ -83,8 +558,136 @@ class Swarm(metaclass=ABCMeta):
     def globalVelocityRatio(self):
         return self._globalVelocityRatio
 
+    @property
+    def commonRatio(self):
+        """
+        Общий множитель скорости, рассчитанный по коэффициентам алгоритма
+        """
+        return self._commonRatio
+
+    @property
+    def boundary(self):
+        return self._boundary
+
+    def spawnGenerators(self, count: int):
+        """
+        Возвращает count независимых генераторов случайных чисел, порожденных от генератора роя.
+        Их потоки не пересекаются с потоком роя и друг с другом, а при одинаковом seed роя
+        совпадают от запуска к запуску
+        """
+        return self._rng.spawn(count)
+
+    @property
+    def rng(self):
+        """
+        Генератор случайных чисел роя (numpy.random.Generator)
+        """
+        return self._rng
+
+    @property
+    def topology(self):
+        return self._topology
+
+    @property
+    def maxVelocity(self):
+        return self._maxVelocity
+
+    @property
+    def positions(self):
+        """
+        Текущие положения частиц, матрица (swarmsize, dimension)
+        """
+        return self._positions
+
+    @property
+    def velocities(self):
+        """
+        Текущие скорости частиц, матрица (swarmsize, dimension)
+        """
+        return self._velocities
+
+    @property
+    def localBestPositions(self):
+        """
+        Лучшие положения, найденные каждой частицей, матрица (swarmsize, dimension)
+        """
+        return self._localBestPositions
+
+    @property
+    def localBestFinalFuncs(self):
+        """
+        Лучшие значения целевой функции для каждой частицы, вектор (swarmsize,)
+        """
+        return self._localBestFinalFuncs
+
+    @property
+    def finalFuncs(self):
+        """
+        Значения целевой функции в текущих положениях частиц, вектор (swarmsize,)
+        """
+        return self._finalFuncs
+
+    @property
+    def improved(self):
+        """
+        Маска частиц, улучшивших свое лучшее значение на последней итерации, вектор (swarmsize,)
+        """
+        return self._improved
+
+    @property
+    def iteration(self):
+        """
+        Количество выполненных итераций
+        """
+        return self._iteration
+
+    @property
+    def evaluationCount(self):
+        """
+        Количество выполненных расчетов целевой функции
+        """
+        return self._evaluationCount
+
+    @property
+    def elapsed(self):
+        """
+        Время выполнения итераций роя в секундах, включая итерации до контрольной точки,
+        с которой рой продолжен
+        """
+        return self._elapsed
+
+    @property
+    def dtype(self):
+        """
+        Тип чисел массивов состояния роя
+        """
+        return self._dtype
+
+    @property
+    def evaluator(self):
+        return self._evaluator
+
+    @property
+    def backend(self):
+        """
+        Способ выполнения итерации: "numba" или "numpy"
+        """
+        return "numpy" if self._fusedIteration is None else "numba"
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        self._instrumentation = instrumentation
+
     @property
     def globalBestPosition(self):
+        """
+        Лучшее положение роя. Это буфер, который обновляется на месте при каждом улучшении:
+        чтобы сохранить текущее значение, надо сделать копию
+        """
         return self._globalBestPosition
 
     @property
@@ -95,17 +698,38 @@ class Swarm(metaclass=ABCMeta):
         assert len(position) == len(self.minvalues)
 
         finalFunc = self._finalFunc(position)
+        self._evaluationCount += 1
 
         if self._globalBestFinalFunc is None or finalFunc < self._globalBestFinalFunc:
             self._globalBestFinalFunc = finalFunc
-            self._globalBestPosition = position[:]
+            self._setGlobalBestPosition(position)
 
         return finalFunc
 
+    def getFinalFuncBatch(self, positions):
+        """
+        Рассчитать целевую функцию сразу для всех строк матрицы positions (N, dimension).
+        Возвращает вектор (N,), лучшее глобальное значение обновляется одной редукцией
+        """
+        assert positions.shape[1] == len(self.minvalues)
+
+        finalFuncs = self._evaluate(positions)
+        self._updateGlobalBest(positions, finalFuncs)
+
+        return finalFuncs
+
     @abstractmethod
     def _finalFunc(self, position) -> float:
         return 0.0
 
+    def _finalFuncBatch(self, positions):
+        """
+        Целевая функция для матрицы положений (N, dimension), возвращает вектор (N,).
+        По умолчанию вызывает _finalFunc для каждой строки, производные классы
+        переопределяют этот метод векторизованной версией
+        """
+        return np.array([self._finalFunc(position) for position in positions], dtype=float)
+
     @property
     def dimension(self):
         """
@@ -119,20 +743,12 @@ class Swarm(metaclass=ABCMeta):
         position - координаты, для которых рассчитывается штраф
         ratio - вес штрафа
         """
-        penalty1 = sum(
-            [
-                ratio * abs(coord - minval)
-                for coord, minval in zip(position, self.minvalues)
-                if coord < minval
-            ]
-        )
-
-        penalty2 = sum(
-            [
-                ratio * abs(coord - maxval)
-                for coord, maxval in zip(position, self.maxvalues)
-                if coord > maxval
-            ]
-        )
+        return self._getPenaltyBatch(np.atleast_2d(position), ratio)[0]
 
-        return penalty1 + penalty2
+    def _getPenaltyBatch(self, positions, ratio):
+        """
+        Рассчитать штрафную функцию для каждой строки матрицы positions
+        positions - матрица (N, dimension) координат, для которых рассчитывается штраф
+        ratio - вес штрафа
+        """
+        return getPenalty(positions, self.minvalues, self.maxvalues, ratio)
@@ -0,0 +1,220 @@
+"""
+Запись показателей сходимости роя по итерациям.
+
+Telemetry подключается к рою как обратный вызов итерации и заполняет заранее выделенные
+столбцы NumPy (по одному на показатель). Когда буфер заполнен, он целиком записывается
+в файл: CSV и JSONL дописываются порциями, .npz (столбцы в двоичном виде)
+записывается при flush и close. Сводка в консоль выводится раз в summaryInterval итераций,
+поэтому вывод не замедляет короткие итерации:
+
+    with Telemetry("run.csv", summaryInterval=50) as telemetry:
+        telemetry.record(swarm)  # начальное состояние
+        swarm.addIterationCallback(telemetry)
+        swarm.run(maxIterations=500)
+"""
+
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+# Показатели и их типы
+COLUMNS = {
+    "iteration": np.int64,
+    "evaluations": np.int64,
+    "bestFinalFunc": np.float64,
+    "meanFinalFunc": np.float64,
+    "medianFinalFunc": np.float64,
+    "diameter": np.float64,
+    "meanVelocity": np.float64,
+    "improvements": np.int64,
+}
+
+# Расширения файлов и форматы записи
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".npz": "npz",
+}
+
+
+class Telemetry:
+    """
+    Буферизованная запись показателей сходимости роя
+    """
+
+    def __init__(
+        self,
+        path=None,
+        bufferSize: int = 1024,
+        summaryInterval=None,
+        stream=None,
+    ):
+        """
+        path - файл .csv, .jsonl или .npz. None - показатели только хранятся в памяти
+        bufferSize - количество итераций, накапливаемых перед записью в файл
+        summaryInterval - период вывода сводки в консоль в итерациях. None - сводка не выводится
+        stream - поток для сводки. None - sys.stdout
+        """
+        assert bufferSize >= 1
+        assert summaryInterval is None or summaryInterval >= 1
+
+        self._format = None
+        if path is not None:
+            extension = os.path.splitext(path)[1].lower()
+            self._format = FORMATS.get(extension)
+            if self._format is None:
+                raise ValueError(
+                    "Unknown telemetry format '{}', expected one of: {}".format(
+                        extension, ", ".join(FORMATS)
+                    )
+                )
+
+        self._path = path
+        self._summaryInterval = summaryInterval
+        self._stream = stream
+
+        self._buffer = {name: np.empty(bufferSize, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._count = 0
+        self._rowCount = 0
+        self._fileStarted = False
+
+        # Записанные порции хранятся, если столбцы нужны целиком (память или .npz)
+        self._keepHistory = self._format in (None, "npz")
+        self._chunks = []
+
+    def __call__(self, swarm):
+        self.record(swarm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, swarm):
+        """
+        Учесть текущее состояние роя swarm
+        """
+        row = self._count
+        buffer = self._buffer
+        finalFuncs = swarm.finalFuncs
+        velocities = swarm.velocities
+
+        buffer["iteration"][row] = swarm.iteration
+        buffer["evaluations"][row] = swarm.evaluationCount
+        buffer["bestFinalFunc"][row] = swarm.globalBestFinalFunc
+        buffer["meanFinalFunc"][row] = np.mean(finalFuncs)
+        buffer["medianFinalFunc"][row] = np.median(finalFuncs)
+        buffer["diameter"][row] = swarm.getDiameter()
+        buffer["meanVelocity"][row] = np.mean(
+            np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+        )
+        buffer["improvements"][row] = np.count_nonzero(swarm.improved)
+
+        self._count += 1
+        self._rowCount += 1
+
+        if self._summaryInterval is not None and swarm.iteration % self._summaryInterval == 0:
+            self._printSummary(row)
+
+        if self._count == len(buffer["iteration"]):
+            self._writeBuffer()
+
+    def _printSummary(self, row):
+        values = {name: column[row] for name, column in self._buffer.items()}
+        print(
+            "Iteration {iteration}: best {bestFinalFunc:.6g}, mean {meanFinalFunc:.6g}, "
+            "median {medianFinalFunc:.6g}, diameter {diameter:.4g}, "
+            "velocity {meanVelocity:.4g}, improvements {improvements}, "
+            "evaluations {evaluations}".format(**values),
+            file=self._stream or sys.stdout,
+        )
+
+    def _takeBuffer(self):
+        """
+        Возвращает копии заполненной части буфера и очищает его
+        """
+        chunk = {name: column[: self._count].copy() for name, column in self._buffer.items()}
+        self._count = 0
+        return chunk
+
+    def _writeBuffer(self):
+        """
+        Перенести накопленные строки в файл (для CSV и JSONL) или в историю
+        """
+        if self._count == 0:
+            return
+
+        chunk = self._takeBuffer()
+        if self._keepHistory:
+            self._chunks.append(chunk)
+
+        if self._format == "csv":
+            self._appendCsv(chunk)
+        elif self._format == "jsonl":
+            self._appendJsonLines(chunk)
+
+    def _openForAppend(self):
+        # Файл перезаписывается при первой записи и дописывается потом
+        mode = "a" if self._fileStarted else "w"
+        self._fileStarted = True
+        return open(self._path, mode, newline="", encoding="utf-8")
+
+    def _appendCsv(self, chunk):
+        header = not self._fileStarted
+        with self._openForAppend() as file:
+            writer = csv.writer(file)
+            if header:
+                writer.writerow(COLUMNS)
+            writer.writerows(zip(*(chunk[name].tolist() for name in COLUMNS)))
+
+    def _appendJsonLines(self, chunk):
+        with self._openForAppend() as file:
+            columns = [chunk[name].tolist() for name in COLUMNS]
+            file.writelines(
+                json.dumps(dict(zip(COLUMNS, values))) + "\n" for values in zip(*columns)
+            )
+
+    def _writeNpz(self):
+        temporaryPath = self._path + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            np.savez(file, **self.getColumns())
+
+        os.replace(temporaryPath, self._path)
+
+    def flush(self):
+        """
+        Записать в файл все накопленные показатели
+        """
+        self._writeBuffer()
+
+        if self._format == "npz":
+            self._writeNpz()
+
+    def close(self):
+        self.flush()
+
+    def getColumns(self):
+        """
+        Возвращает словарь столбцов показателей за все записанные итерации.
+        Для файлов CSV и JSONL история не хранится в памяти: возвращаются только
+        показатели, еще не записанные в файл
+        """
+        chunks = self._chunks + [
+            {name: column[: self._count] for name, column in self._buffer.items()}
+        ]
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def rowCount(self):
+        """
+        Количество учтенных итераций
+        """
+        return self._rowCount
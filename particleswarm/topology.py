@@ -0,0 +1,208 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+
+class Topology(metaclass=ABCMeta):
+    """
+    Базовый класс для топологии соседства частиц. Топология определяет, к какому
+    лучшему положению (лучшему положению соседей) притягивается каждая частица.
+    Лучшие положения соседей находятся сразу для всего роя
+    """
+
+    @abstractmethod
+    def getBestPositions(self, swarm):
+        """
+        Возвращает лучшие положения соседей для каждой частицы роя:
+        матрицу (swarmsize, dimension) или вектор (dimension,), общий для всех частиц
+        """
+        pass
+
+    def getState(self):
+        """
+        Возвращает словарь массивов, описывающих изменяемое состояние топологии
+        (для контрольных точек роя)
+        """
+        return {}
+
+    def setState(self, state):
+        """
+        Восстановить состояние, полученное из getState
+        """
+        pass
+
+
+class GlobalTopology(Topology):
+    """
+    Все частицы соседствуют друг с другом и притягиваются к лучшему положению всего роя
+    """
+
+    def getBestPositions(self, swarm):
+        return swarm.globalBestPosition
+
+
+class NeighbourTopology(Topology):
+    """
+    Топология, заданная матрицей номеров соседей (swarmsize, K): строка i содержит
+    номера частиц, лучшие положения которых учитывает частица i (включая ее саму).
+    Производные классы строят эту матрицу в _createNeighbours
+    """
+
+    def __init__(self):
+        self._neighbours = None
+        self._rows = None
+
+    @abstractmethod
+    def _createNeighbours(self, swarm):
+        """
+        Возвращает матрицу (swarmsize, K) номеров соседей каждой частицы роя swarm
+        """
+        pass
+
+    def _needRebuild(self, swarm):
+        """
+        Возвращает True, если матрицу соседей надо построить заново
+        """
+        return self._neighbours is None or len(self._neighbours) != len(swarm)
+
+    def getNeighbours(self, swarm):
+        """
+        Возвращает матрицу (swarmsize, K) номеров соседей каждой частицы
+        """
+        if self._needRebuild(swarm):
+            self._neighbours = self._createNeighbours(swarm)
+            self._rows = np.arange(len(swarm))
+
+        return self._neighbours
+
+    def getState(self):
+        if self._neighbours is None:
+            return {}
+
+        return {"neighbours": self._neighbours.copy()}
+
+    def setState(self, state):
+        if "neighbours" in state:
+            self._neighbours = np.array(state["neighbours"])
+            self._rows = np.arange(len(self._neighbours))
+
+    def getBestPositions(self, swarm):
+        neighbours = self.getNeighbours(swarm)
+
+        # Номер соседа с наименьшим лучшим значением для каждой частицы
+        finalFuncs = swarm.localBestFinalFuncs[neighbours]
+        best = neighbours[self._rows, np.argmin(finalFuncs, axis=1)]
+
+        return swarm.localBestPositions[best]
+
+
+class RingTopology(NeighbourTopology):
+    """
+    Частицы расположены по кольцу, соседи частицы - radius частиц с каждой стороны от нее
+    """
+
+    def __init__(self, radius: int = 1):
+        """
+        radius - количество соседей с каждой стороны
+        """
+        assert radius >= 1
+        super().__init__()
+        self._radius = radius
+
+    def _createNeighbours(self, swarm):
+        swarmsize = len(swarm)
+        offsets = np.arange(-self._radius, self._radius + 1)
+        return (np.arange(swarmsize)[:, np.newaxis] + offsets) % swarmsize
+
+
+class VonNeumannTopology(NeighbourTopology):
+    """
+    Частицы расположены на замкнутой двумерной сетке, соседи частицы -
+    четыре частицы сверху, снизу, слева и справа от нее
+    """
+
+    def _createNeighbours(self, swarm):
+        swarmsize = len(swarm)
+        columns = max(int(np.ceil(np.sqrt(swarmsize))), 1)
+        index = np.arange(swarmsize)
+        rowStart = index - index % columns
+
+        # Последняя строка сетки может быть неполной, номера за концом роя заворачиваются
+        left = (rowStart + (index - 1) % columns) % swarmsize
+        right = (rowStart + (index + 1) % columns) % swarmsize
+        up = (index - columns) % swarmsize
+        down = (index + columns) % swarmsize
+
+        return np.stack((index, left, right, up, down), axis=1)
+
+
+class RandomTopology(NeighbourTopology):
+    """
+    Каждая частица учитывает себя и count случайно выбранных частиц.
+    Соседи выбираются заново каждые rebuildInterval итераций
+    """
+
+    def __init__(self, count: int = 3, rebuildInterval: int = 10):
+        """
+        count - количество случайных соседей каждой частицы
+        rebuildInterval - период выбора новых соседей в итерациях
+        """
+        assert count >= 1
+        assert rebuildInterval >= 1
+        super().__init__()
+        self._count = count
+        self._rebuildInterval = rebuildInterval
+        self._builtIteration = None
+
+    def _needRebuild(self, swarm):
+        if (
+            super()._needRebuild(swarm)
+            or swarm.iteration - self._builtIteration >= self._rebuildInterval
+        ):
+            self._builtIteration = swarm.iteration
+            return True
+
+        return False
+
+    def getState(self):
+        state = super().getState()
+        if self._builtIteration is not None:
+            state["builtIteration"] = np.array(self._builtIteration)
+
+        return state
+
+    def setState(self, state):
+        super().setState(state)
+        if "builtIteration" in state:
+            self._builtIteration = int(state["builtIteration"])
+
+    def _createNeighbours(self, swarm):
+        swarmsize = len(swarm)
+        index = np.arange(swarmsize)[:, np.newaxis]
+        return np.hstack((index, swarm.rng.integers(0, swarmsize, (swarmsize, self._count))))
+
+
+_TOPOLOGIES = {
+    "global": GlobalTopology,
+    "ring": RingTopology,
+    "vonneumann": VonNeumannTopology,
+    "random": RandomTopology,
+}
+
+
+def createTopology(topology) -> Topology:
+    """
+    Возвращает объект топологии соседства
+    topology - экземпляр Topology или имя топологии: "global", "ring", "vonneumann", "random"
+    """
+    if isinstance(topology, Topology):
+        return topology
+
+    if topology not in _TOPOLOGIES:
+        raise ValueError(
+            "Unknown topology '{}', expected one of: {}".format(
+                topology, ", ".join(_TOPOLOGIES)
+            )
+        )
+
+    return _TOPOLOGIES[topology]()
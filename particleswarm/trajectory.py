@@ -0,0 +1,302 @@
+"""
+Запись траектории роя в файлы, отображаемые в память.
+
+Запись - это каталог:
+    meta.json - размер роя, размерность, тип данных, прореживание, количество кадров
+    positions.dat - положения частиц, массив (кадры, swarmsize, dimension)
+    finalFuncs.dat - значения целевой функции частиц, массив (кадры, swarmsize)
+    iterations.dat - номер итерации каждого кадра, вектор (кадры,) int64
+    bestFinalFuncs.dat - лучшее значение роя в каждом кадре, вектор (кадры,) float64
+
+TrajectoryRecorder пишет кадры прямо в отображенные файлы и увеличивает их вдвое,
+когда место заканчивается, поэтому память процесса не растет с длиной запуска.
+TrajectoryReader открывает запись без чтения в память: массивы - это numpy.memmap
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Версия формата записи
+TRAJECTORY_VERSION = 1
+
+_META_FILE = "meta.json"
+
+
+def _frameShapes(swarmsize, dimension):
+    """
+    Возвращает имя файла, форму одного кадра и тип данных каждого массива записи.
+    None вместо типа - тип хранения положений и значений целевой функции
+    """
+    return {
+        "positions": ((swarmsize, dimension), None),
+        "finalFuncs": ((swarmsize,), None),
+        "iterations": ((), np.int64),
+        "bestFinalFuncs": ((), np.float64),
+    }
+
+
+def _openArray(path, name, frameShape, dtype, frames, mode):
+    """
+    Отобразить в память файл name.dat записи path как массив (frames,) + frameShape
+    """
+    shape = (frames,) + frameShape
+    if frames == 0 or 0 in frameShape:
+        return np.empty(shape, dtype=dtype)
+
+    return np.memmap(os.path.join(path, name + ".dat"), dtype=dtype, mode=mode, shape=shape)
+
+
+class TrajectoryRecorder:
+    """
+    Потоковая запись положений и значений целевой функции частиц:
+
+        recorder = TrajectoryRecorder("run.traj", dtype="float32", decimation=5)
+        swarm.addIterationCallback(recorder)
+        recorder.record(swarm)  # начальное состояние
+        swarm.run(maxIterations=500)
+        recorder.close()
+    """
+
+    def __init__(self, path, dtype="float64", decimation: int = 1, capacity: int = 64):
+        """
+        path - каталог записи, создается при необходимости. Существующая запись перезаписывается
+        dtype - тип хранения положений и значений целевой функции ("float64" или "float32")
+        decimation - записывать только итерации, номер которых кратен decimation
+        capacity - начальное количество кадров, под которое выделяются файлы
+        """
+        assert decimation >= 1
+        assert capacity >= 1
+
+        self._path = path
+        self._dtype = np.dtype(dtype)
+        self._decimation = decimation
+        self._capacity = capacity
+
+        self._frames = 0
+        self._swarmsize = None
+        self._dimension = None
+        self._arrays = None
+
+    def __call__(self, swarm):
+        if swarm.iteration % self._decimation == 0:
+            self.record(swarm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create(self, swarm):
+        """
+        Создать файлы записи под размер роя swarm
+        """
+        self._swarmsize = len(swarm)
+        self._dimension = swarm.dimension
+        os.makedirs(self._path, exist_ok=True)
+
+        self._arrays = {}
+        self._resize(self._capacity)
+        self._writeMeta()
+
+    def _truncateFiles(self, capacity):
+        """
+        Установить размер файлов записи в capacity кадров
+        """
+        for name, (frameShape, dtype) in _frameShapes(self._swarmsize, self._dimension).items():
+            frameSize = np.dtype(dtype or self._dtype).itemsize * int(np.prod(frameShape))
+            with open(os.path.join(self._path, name + ".dat"), "a+b") as file:
+                file.truncate(capacity * frameSize)
+
+    def _resize(self, capacity):
+        """
+        Изменить размер файлов записи до capacity кадров и заново отобразить их в память
+        """
+        self._closeArrays()
+        self._truncateFiles(capacity)
+
+        for name, (frameShape, dtype) in _frameShapes(self._swarmsize, self._dimension).items():
+            self._arrays[name] = _openArray(
+                self._path, name, frameShape, np.dtype(dtype or self._dtype), capacity, "r+"
+            )
+
+        self._capacity = capacity
+
+    def _closeArrays(self):
+        for array in self._arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+        self._arrays = {}
+
+    def _writeMeta(self):
+        meta = {
+            "version": TRAJECTORY_VERSION,
+            "swarmsize": self._swarmsize,
+            "dimension": self._dimension,
+            "dtype": self._dtype.name,
+            "decimation": self._decimation,
+            "frames": self._frames,
+        }
+
+        temporaryPath = os.path.join(self._path, _META_FILE + ".tmp")
+        with open(temporaryPath, "w", encoding="utf-8") as file:
+            json.dump(meta, file, indent=2)
+
+        os.replace(temporaryPath, os.path.join(self._path, _META_FILE))
+
+    def record(self, swarm):
+        """
+        Записать текущие положения и значения целевой функции роя swarm как новый кадр
+        """
+        if self._arrays is None:
+            self._create(swarm)
+
+        if (len(swarm), swarm.dimension) != (self._swarmsize, self._dimension):
+            raise ValueError(
+                "Swarm has shape {}, the recording expects {}".format(
+                    (len(swarm), swarm.dimension), (self._swarmsize, self._dimension)
+                )
+            )
+
+        if self._frames == self._capacity:
+            self._resize(2 * self._capacity)
+
+        frame = self._frames
+        self._arrays["positions"][frame] = swarm.positions
+        self._arrays["finalFuncs"][frame] = swarm.finalFuncs
+        self._arrays["iterations"][frame] = swarm.iteration
+        self._arrays["bestFinalFuncs"][frame] = swarm.globalBestFinalFunc
+        self._frames += 1
+
+    def flush(self):
+        """
+        Сбросить записанные кадры на диск и обновить meta.json,
+        чтобы запись можно было прочитать до окончания запуска
+        """
+        if self._arrays is None:
+            return
+
+        for array in self._arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+        self._writeMeta()
+
+    def close(self):
+        """
+        Обрезать файлы до фактического количества кадров и закрыть запись
+        """
+        if self._arrays is None:
+            return
+
+        self._closeArrays()
+        self._truncateFiles(self._frames)
+        self._arrays = None
+        self._writeMeta()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def frames(self):
+        """
+        Количество записанных кадров
+        """
+        return self._frames
+
+
+class TrajectoryReader:
+    """
+    Чтение записи TrajectoryRecorder. Массивы отображаются в память только для чтения,
+    в память процесса загружаются лишь те части, к которым идет обращение
+    """
+
+    def __init__(self, path):
+        """
+        path - каталог записи
+        """
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as file:
+            meta = json.load(file)
+
+        if meta["version"] != TRAJECTORY_VERSION:
+            raise ValueError(
+                "Unsupported trajectory version {} in '{}', expected {}".format(
+                    meta["version"], path, TRAJECTORY_VERSION
+                )
+            )
+
+        self._path = path
+        self._meta = meta
+        self._dtype = np.dtype(meta["dtype"])
+
+        self._arrays = {}
+        for name, (frameShape, dtype) in _frameShapes(meta["swarmsize"], meta["dimension"]).items():
+            self._arrays[name] = _openArray(
+                path, name, frameShape, np.dtype(dtype or self._dtype), meta["frames"], "r"
+            )
+
+    def __len__(self):
+        return self._meta["frames"]
+
+    def getFrame(self, index):
+        """
+        Возвращает номер итерации, положения (swarmsize, dimension)
+        и значения целевой функции (swarmsize,) кадра index
+        """
+        return (
+            int(self._arrays["iterations"][index]),
+            self._arrays["positions"][index],
+            self._arrays["finalFuncs"][index],
+        )
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def swarmsize(self):
+        return self._meta["swarmsize"]
+
+    @property
+    def dimension(self):
+        return self._meta["dimension"]
+
+    @property
+    def decimation(self):
+        return self._meta["decimation"]
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def positions(self):
+        """
+        Положения частиц, массив (кадры, swarmsize, dimension)
+        """
+        return self._arrays["positions"]
+
+    @property
+    def finalFuncs(self):
+        """
+        Значения целевой функции частиц, массив (кадры, swarmsize)
+        """
+        return self._arrays["finalFuncs"]
+
+    @property
+    def iterations(self):
+        """
+        Номер итерации каждого кадра
+        """
+        return self._arrays["iterations"]
+
+    @property
+    def bestFinalFuncs(self):
+        """
+        Лучшее значение целевой функции роя в каждом кадре
+        """
+        return self._arrays["bestFinalFuncs"]
@@ -0,0 +1,221 @@
+"""
+Оптимизация роя в отдельном потоке с передачей снимков состояния для отрисовки.
+
+OptimizerThread выполняет итерации роя и после каждой порции итераций публикует снимок
+положений и значений целевой функции в тройной буфер (SnapshotBuffer). Программа
+визуализации берет последний полный снимок и рисует его, не дожидаясь расчета:
+скорость оптимизации не ограничена частотой кадров, а медленная итерация не останавливает окно.
+
+    optimizer = OptimizerThread(swarm, maxIterations=300, iterationsPerFrame=1)
+    optimizer.start()
+    while not optimizer.finished:
+        snapshot = optimizer.getSnapshot()
+        draw(snapshot.positions, snapshot.finalFuncs)
+    optimizer.stop()
+"""
+
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class SwarmSnapshot(NamedTuple):
+    """
+    Снимок состояния роя после итерации iteration
+    version - номер публикации, растет с каждым новым снимком
+    positions - положения частиц (swarmsize, dimension), только для чтения
+    finalFuncs - значения целевой функции частиц (swarmsize,), только для чтения
+    globalBestFinalFunc - лучшее значение целевой функции роя
+    """
+
+    version: int
+    iteration: int
+    positions: np.ndarray
+    finalFuncs: np.ndarray
+    globalBestFinalFunc: float
+
+
+class _SnapshotSlot:
+    """
+    Массивы одного снимка в буфере и их представления только для чтения
+    """
+
+    def __init__(self, swarmsize, dimension, dtype):
+        self.positions = np.empty((swarmsize, dimension), dtype=dtype)
+        self.finalFuncs = np.empty(swarmsize, dtype=dtype)
+        self.snapshot = None
+
+        self.readonlyPositions = self.positions.view()
+        self.readonlyPositions.flags.writeable = False
+        self.readonlyFinalFuncs = self.finalFuncs.view()
+        self.readonlyFinalFuncs.flags.writeable = False
+
+
+class SnapshotBuffer:
+    """
+    Тройной буфер снимков роя для одного писателя и одного читателя.
+    Писатель заполняет свой слот, затем меняет его местами со слотом готового снимка;
+    читатель забирает готовый снимок, меняя его местами со своим слотом.
+    Ни одна из сторон не ждет другую дольше обмена номерами слотов,
+    а снимок, который сейчас рисуется, не перезаписывается до следующего acquire
+    """
+
+    def __init__(self, swarmsize: int, dimension: int, dtype=np.float64):
+        self._slots = [_SnapshotSlot(swarmsize, dimension, dtype) for _ in range(3)]
+        self._lock = threading.Lock()
+
+        # Слоты читателя, готового снимка и писателя
+        self._front = 0
+        self._ready = 1
+        self._back = 2
+
+        self._version = 0
+        self._hasNew = False
+
+    def publish(self, swarm):
+        """
+        Скопировать положения и значения целевой функции роя swarm в новый снимок
+        """
+        slot = self._slots[self._back]
+        np.copyto(slot.positions, swarm.positions)
+        np.copyto(slot.finalFuncs, swarm.finalFuncs)
+
+        with self._lock:
+            self._version += 1
+            slot.snapshot = SwarmSnapshot(
+                version=self._version,
+                iteration=swarm.iteration,
+                positions=slot.readonlyPositions,
+                finalFuncs=slot.readonlyFinalFuncs,
+                globalBestFinalFunc=swarm.globalBestFinalFunc,
+            )
+            self._back, self._ready = self._ready, self._back
+            self._hasNew = True
+
+    def acquire(self) -> Optional[SwarmSnapshot]:
+        """
+        Возвращает последний опубликованный снимок (None, пока снимков не было).
+        Массивы снимка не меняются до следующего вызова acquire
+        """
+        with self._lock:
+            if self._hasNew:
+                self._front, self._ready = self._ready, self._front
+                self._hasNew = False
+
+            return self._slots[self._front].snapshot
+
+    @property
+    def version(self):
+        """
+        Номер последнего опубликованного снимка (0, пока снимков не было)
+        """
+        return self._version
+
+
+class OptimizerThread(threading.Thread):
+    """
+    Поток, выполняющий итерации роя и публикующий снимки его состояния.
+    Пока поток работает, рой нельзя менять из других потоков;
+    обратные вызовы роя (addIterationCallback) выполняются в этом потоке
+    """
+
+    def __init__(self, swarm, maxIterations: int, iterationsPerFrame: Optional[int] = None):
+        """
+        swarm - рой частиц
+        maxIterations - количество итераций
+        iterationsPerFrame - количество итераций на каждый снимок, взятый через getSnapshot:
+            поток выполняет их и ждет следующего кадра. None - итерации выполняются
+            без ожидания, снимок публикуется после каждой итерации
+        """
+        super().__init__(daemon=True)
+        assert iterationsPerFrame is None or iterationsPerFrame >= 1
+
+        self._swarm = swarm
+        self._maxIterations = maxIterations
+        self._iterationsPerFrame = iterationsPerFrame
+
+        self._buffer = SnapshotBuffer(len(swarm), swarm.dimension, swarm.positions.dtype)
+        self._frameRequested = threading.Event()
+        self._stopRequested = threading.Event()
+        self._finished = threading.Event()
+        self._error = None
+
+        # Начальное состояние доступно для отрисовки сразу
+        self._buffer.publish(swarm)
+
+    def run(self):
+        try:
+            if self._iterationsPerFrame is None:
+                self._runFree()
+            else:
+                self._runPaced()
+        except Exception as error:
+            self._error = error
+        finally:
+            self._finished.set()
+
+    def _runFree(self):
+        for _ in range(self._maxIterations):
+            if self._stopRequested.is_set():
+                return
+
+            self._swarm.nextIteration()
+            self._buffer.publish(self._swarm)
+
+    def _runPaced(self):
+        remaining = self._maxIterations
+        while remaining > 0:
+            self._frameRequested.wait()
+            self._frameRequested.clear()
+            if self._stopRequested.is_set():
+                return
+
+            count = min(self._iterationsPerFrame, remaining)
+            for _ in range(count):
+                self._swarm.nextIteration()
+
+            remaining -= count
+            self._buffer.publish(self._swarm)
+
+    def getSnapshot(self) -> SwarmSnapshot:
+        """
+        Возвращает последний полный снимок роя. При заданном iterationsPerFrame
+        разрешает потоку рассчитать следующую порцию итераций
+        """
+        snapshot = self._buffer.acquire()
+        self._frameRequested.set()
+        return snapshot
+
+    def stop(self):
+        """
+        Остановить поток после текущей итерации и дождаться его завершения.
+        Ошибка, возникшая в потоке, выбрасывается здесь
+        """
+        self._stopRequested.set()
+        self._frameRequested.set()
+
+        if self.is_alive():
+            self.join()
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    @property
+    def swarm(self):
+        return self._swarm
+
+    @property
+    def finished(self):
+        """
+        True, когда поток закончил работу и его последний снимок опубликован
+        """
+        return self._finished.is_set()
+
+    @property
+    def version(self):
+        """
+        Номер последнего опубликованного снимка
+        """
+        return self._buffer.version
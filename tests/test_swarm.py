@@ -0,0 +1,62 @@
+"""
+Лучшие положения частиц и роя не расходятся со своими значениями целевой функции
+"""
+
+import numpy as np
+import pytest
+
+from particleswarm import SwarmRastrigin, SwarmX2
+
+TOPOLOGIES = ["global", "ring", "random"]
+SWARM_CLASSES = [(SwarmRastrigin, 5.12), (SwarmX2, 100.0)]
+ITERATIONS = 50
+
+
+def createSwarm(swarmClass, bound, topology):
+    dimension = 4
+    return swarmClass(
+        200,
+        [-bound] * dimension,
+        [bound] * dimension,
+        0.5,
+        2.0,
+        5.0,
+        topology=topology,
+        seed=1,
+        backend="numpy",
+    )
+
+
+@pytest.mark.parametrize("swarmClass, bound", SWARM_CLASSES)
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_bestsMatchTheirFinalFuncs(swarmClass, bound, topology):
+    swarm = createSwarm(swarmClass, bound, topology)
+
+    for _ in range(ITERATIONS):
+        swarm.nextIteration()
+
+        np.testing.assert_array_equal(
+            swarm._finalFuncBatch(swarm.localBestPositions), swarm.localBestFinalFuncs
+        )
+        assert (
+            swarm._finalFuncBatch(swarm.globalBestPosition[np.newaxis])[0]
+            == swarm.globalBestFinalFunc
+        )
+
+
+@pytest.mark.parametrize("swarmClass, bound", SWARM_CLASSES)
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_bestsChangeOnlyOnImprovement(swarmClass, bound, topology):
+    swarm = createSwarm(swarmClass, bound, topology)
+
+    for _ in range(ITERATIONS):
+        localBestPositions = swarm.localBestPositions.copy()
+        localBestFinalFuncs = swarm.localBestFinalFuncs.copy()
+        globalBestFinalFunc = swarm.globalBestFinalFunc
+
+        swarm.nextIteration()
+
+        kept = ~swarm.improved
+        np.testing.assert_array_equal(swarm.localBestPositions[kept], localBestPositions[kept])
+        np.testing.assert_array_equal(swarm.localBestFinalFuncs[kept], localBestFinalFuncs[kept])
+        assert swarm.globalBestFinalFunc <= globalBestFinalFunc
@@ -1,11 +1,21 @@
-import tkinter as tk
-import glfw
-from OpenGL.GL import *
-from OpenGL.GLU import *
+from particleswarm.lazy import lazyImport
+from particleswarm.rendering import LevelOfDetailSurface, ParticleRenderer, SurfaceRenderer
+from particleswarm.replay import ReplayPlayer, createKeyCallback
+from particleswarm.surfacecache import SurfaceMeshCache
+from particleswarm.telemetry import Telemetry
+from particleswarm.worker import OptimizerThread
+import argparse
+import time
 import numpy as np
 from swarm_x2 import SwarmX2
 from utils import printResult
 
+# Графические библиотеки загружаются только при первом обращении
+tk = lazyImport("tkinter")
+glfw = lazyImport("glfw")
+gl = lazyImport("OpenGL.GL")
+glu = lazyImport("OpenGL.GLU")
+
 # Глобальные переменные для управления вращением
 rotation_x = 0
 rotation_y = 0
@@ -29,112 +39,54 @@ globalVelocityRatio = 5.0
 def paraboloid(x, y):
     return x**2 + y**2
 
-# Класс для роя частиц
-class Particle:
-    def __init__(self, dimension=2, bounds=(-100.0, 100.0)):
-        self.position = np.random.uniform(bounds[0], bounds[1], dimension)
-        self.velocity = np.random.uniform(-1, 1, dimension)
-        self.best_position = np.copy(self.position)
-        self.best_value = paraboloid(*self.position)
-
-    def update_velocity(self, global_best_position, w=0.5, c1=1.5, c2=1.5):
-        r1 = np.random.rand(len(self.position))
-        r2 = np.random.rand(len(self.position))
-        cognitive_velocity = c1 * r1 * (self.best_position - self.position)
-        social_velocity = c2 * r2 * (global_best_position - self.position)
-        self.velocity = w * self.velocity + cognitive_velocity + social_velocity
-
-    def update_position(self, bounds=(-100.0, 100.0)):
-        self.position += self.velocity
-        self.position = np.clip(self.position, bounds[0], bounds[1])
-        value = paraboloid(*self.position)
-        if value < self.best_value:
-            self.best_value = value
-            self.best_position = np.copy(self.position)
-
-class SwarmX2:
-    def __init__(self, swarmsize, minvalues, maxvalues, currentVelocityRatio, localVelocityRatio, globalVelocityRatio):
-        self.particles = [Particle(dimension=dimension, bounds=(minvalues[0], maxvalues[0])) for _ in range(swarmsize)]
-        self.global_best_position = np.copy(self.particles[0].best_position)
-        self.global_best_value = self.particles[0].best_value
-        self.minvalues = minvalues
-        self.maxvalues = maxvalues
-        self.currentVelocityRatio = currentVelocityRatio
-        self.localVelocityRatio = localVelocityRatio
-        self.globalVelocityRatio = globalVelocityRatio
-
-    def nextIteration(self):
-        for particle in self.particles:
-            particle.update_velocity(self.global_best_position)
-            particle.update_position(bounds=(self.minvalues[0], self.maxvalues[0]))
-
-            if particle.best_value < self.global_best_value:
-                self.global_best_value = particle.best_value
-                self.global_best_position = np.copy(particle.best_position)
-
-def draw_2d_particles(swarm):
-    """Рисует частицы в 2D на плоскости X-Y."""
-    positions = np.array([particle.position for particle in swarm.particles])
-    glColor3f(1.0, 0.0, 0.0)  # Красный цвет для частиц
-
-    glPointSize(5)
-    glBegin(GL_POINTS)
-    for pos in positions:
-        glVertex2f(pos[0], pos[1])  # Отображаем только X и Y
-    glEnd()
-
-# Отрисовка параболоидной поверхности
-def draw_surface(X, Y, Z):
-    glBegin(GL_QUADS)
-    for i in range(len(X) - 1):
-        for j in range(len(Y) - 1):
-            glColor3f(0.8, 0.8, 0.1)  # Цвет параболоида
-            glVertex3f(X[i, j], Y[i, j], Z[i, j])
-            glVertex3f(X[i + 1, j], Y[i + 1, j], Z[i + 1, j])
-            glVertex3f(X[i + 1, j + 1], Y[i + 1, j + 1], Z[i + 1, j + 1])
-            glVertex3f(X[i, j + 1], Y[i, j + 1], Z[i, j + 1])
-    glEnd()
+# Наибольшее значение функции в области поиска
+PARABOLOID_MAX = sum(max(low**2, high**2) for low, high in zip(minvalues, maxvalues))
+
+# Частицы рисуются из массивов вершин: в 3D высота - уже рассчитанное значение функции,
+# в 2D - красные точки на плоскости X-Y
+particles_3d = ParticleRenderer(pointSize=10, color=(0.0, 1.0, 1.0))
+particles_2d = ParticleRenderer(pointSize=5, color=(1.0, 0.0, 0.0))
 
 def draw_axes():
-    glLineWidth(2)
+    gl.glLineWidth(2)
 
     # Рисуем оси
-    glBegin(GL_LINES)
-    glColor3f(1.0, 1.0, 1.0)  # Белый цвет для осей
+    gl.glBegin(gl.GL_LINES)
+    gl.glColor3f(1.0, 1.0, 1.0)  # Белый цвет для осей
 
     # Ось X
-    glVertex3f(-200, 0, 0)  # Начало оси X
-    glVertex3f(200, 0, 0)   # Конец оси X
+    gl.glVertex3f(-200, 0, 0)  # Начало оси X
+    gl.glVertex3f(200, 0, 0)   # Конец оси X
 
     # Ось Y
-    glVertex3f(0, -200, 0)  # Начало оси Y
-    glVertex3f(0, 200, 0)   # Конец оси Y
+    gl.glVertex3f(0, -200, 0)  # Начало оси Y
+    gl.glVertex3f(0, 200, 0)   # Конец оси Y
 
     # Ось Z
-    glVertex3f(0, 0, -200)  # Начало оси Z
-    glVertex3f(0, 0, 200)   # Конец оси Z
-    glEnd()
+    gl.glVertex3f(0, 0, -200)  # Начало оси Z
+    gl.glVertex3f(0, 0, 200)   # Конец оси Z
+    gl.glEnd()
 
     # Рисуем разметку
-    glLineWidth(1)
-    glBegin(GL_LINES)
+    gl.glLineWidth(1)
+    gl.glBegin(gl.GL_LINES)
 
     # Разметка оси X
     for i in range(-200, 201, 10):  # Разметка через 10 единичных отрезков
-        glVertex3f(i, -2, 0)  # Маленькая отметка ниже оси
-        glVertex3f(i, 2, 0)   # Маленькая отметка выше оси
+        gl.glVertex3f(i, -2, 0)  # Маленькая отметка ниже оси
+        gl.glVertex3f(i, 2, 0)   # Маленькая отметка выше оси
 
     # Разметка оси Y
     for i in range(-200, 201, 10):  # Разметка через 10 единичных отрезков
-        glVertex3f(-2, i, 0)  # Маленькая отметка слева от оси
-        glVertex3f(2, i, 0)   # Маленькая отметка справа от оси
+        gl.glVertex3f(-2, i, 0)  # Маленькая отметка слева от оси
+        gl.glVertex3f(2, i, 0)   # Маленькая отметка справа от оси
 
     # Разметка оси Z
     for i in range(-200, 201, 10):  # Разметка через 10 единичных отрезков
-        glVertex3f(0, -2, i)  # Маленькая отметка ниже оси
-        glVertex3f(0, 2, i)   # Маленькая отметка выше оси
+        gl.glVertex3f(0, -2, i)  # Маленькая отметка ниже оси
+        gl.glVertex3f(0, 2, i)   # Маленькая отметка выше оси
 
-    glEnd()
+    gl.glEnd()
 
 # Функция для создания окна Tkinter для ввода числа итераций и коэффициентов
 def get_parameters_from_user():
@@ -217,9 +169,126 @@ def mouse_button_callback(window, button, action, mods):
         elif action == glfw.RELEASE:
             mouse_dragging = False
 
+# Отрисовка одного кадра в оба окна
+def draw_frame(window_3d, window_2d, surface_3d, surface_2d, positions, finalFuncs):
+    # ======= Отрисовка 3D =======
+    glfw.make_context_current(window_3d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+    gl.glLoadIdentity()
+
+    # Камера и вращение для 3D
+    glu.gluPerspective(45, 800 / 600, 0.1, 500)
+
+    # Расстояние камеры и её вращение
+    camera_position = np.array([np.sin(np.radians(rotation_y)) * camera_distance,
+                                np.sin(np.radians(rotation_x)) * camera_distance,
+                                camera_distance])
+
+    # Устанавливаем позицию камеры
+    glu.gluLookAt(camera_position[0], camera_position[1], camera_position[2],
+              0, 0, 0,  # Камера смотрит в центр (0, 0, 0)
+              0, 1, 0)  # Вектор вверх по оси Y
+
+    draw_axes()
+    surface_3d.draw(np.linalg.norm(camera_position))
+
+    # Отображаем частицы в 3D
+    # Значения целевой функции включают штраф за выход за границы (в записях роев
+    # со штрафом), поэтому высота ограничивается наибольшим значением функции в области поиска
+    particles_3d.update(positions, np.minimum(finalFuncs, PARABOLOID_MAX))
+    particles_3d.draw()
+
+    # ======= Отрисовка 2D =======
+    glfw.make_context_current(window_2d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+    gl.glLoadIdentity()
+
+    # Камера и вращение для 2D
+    gl.glOrtho(-100, 100, -100, 100, -1, 1)
+    draw_axes()
+
+    # Рисуем параболоид в 2D
+    surface_2d.draw()
+
+    # Отображаем частицы в 2D
+    particles_2d.update(positions, 0.0)
+    particles_2d.draw()
+
+    # Обновление окна
+    glfw.swap_buffers(window_3d)
+    glfw.swap_buffers(window_2d)
+    glfw.poll_events()
+
+# Воспроизведение записанной траектории: кадры читаются из файла, рой не пересчитывается
+def run_replay(window_3d, window_2d, surface_3d, surface_2d, player):
+    keyCallback = createKeyCallback(player, glfw)
+    glfw.set_key_callback(window_3d, keyCallback)
+    glfw.set_key_callback(window_2d, keyCallback)
+
+    last_time = time.perf_counter()
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        now = time.perf_counter()
+        player.update(now - last_time)
+        last_time = now
+
+        _, positions, finalFuncs = player.frame
+        glfw.set_window_title(window_3d, "Paraboloid replay: " + player.getStatus())
+        draw_frame(window_3d, window_2d, surface_3d, surface_2d, positions, finalFuncs)
+
+# Рой считается в отдельном потоке, окна рисуют последний готовый снимок его состояния,
+# поэтому расчет не ждет смены кадров, а медленная итерация не останавливает окна.
+# iterations_per_frame - итераций на кадр, 0 - расчет без ожидания кадров
+# telemetry - Telemetry, в который записываются показатели сходимости каждой итерации
+def run_optimization(window_3d, window_2d, surface_3d, surface_2d, swarm, iterations_per_frame, telemetry):
+    telemetry.record(swarm)
+    swarm.addIterationCallback(telemetry)
+
+    optimizer = OptimizerThread(swarm, iterCount, iterationsPerFrame=iterations_per_frame or None)
+    optimizer.start()
+
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        finished = optimizer.finished
+        snapshot = optimizer.getSnapshot()
+        draw_frame(window_3d, window_2d, surface_3d, surface_2d, snapshot.positions, snapshot.finalFuncs)
+
+        # Последний снимок нарисован
+        if finished:
+            break
+
+    optimizer.stop()
+    telemetry.close()
+    print(printResult(swarm, swarm.iteration))
+
+# Аргументы командной строки: --replay включает воспроизведение записи вместо расчета
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Swarm optimization on the paraboloid")
+    parser.add_argument("--replay", help="play back a trajectory recorded with --record")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed")
+    parser.add_argument("--frame-skip", type=int, default=1, help="show every k-th frame")
+    parser.add_argument("--loop", action="store_true", help="loop the playback")
+    parser.add_argument("--surface-cache", help="directory for cached surface meshes")
+    parser.add_argument(
+        "--iterations-per-frame",
+        type=int,
+        default=1,
+        help="optimiser iterations per drawn frame, 0 - run without waiting for frames",
+    )
+    parser.add_argument("--telemetry", help="write per-iteration metrics to .csv, .jsonl or .npz")
+    parser.add_argument(
+        "--summary-interval", type=int, default=10, help="print progress every k iterations"
+    )
+    return parser.parse_args(argv)
+
 # Основная функция
-def main():
-    get_parameters_from_user()  # Получаем параметры через Tkinter
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    # Запись воспроизводится сразу, без окна параметров
+    replay = None
+    if args.replay is not None:
+        replay = ReplayPlayer(args.replay, speed=args.speed, frameSkip=args.frame_skip, loop=args.loop)
+    else:
+        get_parameters_from_user()  # Получаем параметры через Tkinter
 
     if not glfw.init():
         print("Не удалось инициализировать GLFW")
@@ -241,86 +310,55 @@ def main():
 
     # Установка контекста OpenGL для первого окна
     glfw.make_context_current(window_3d)
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.1, 0.1, 0.1, 1.0)
-
-    # Инициализация роя частиц
-    swarm = SwarmX2(
-        swarmsize,
-        minvalues,
-        maxvalues,
-        currentVelocityRatio,
-        localVelocityRatio,
-        globalVelocityRatio,
-    )
+    gl.glEnable(gl.GL_DEPTH_TEST)
+    gl.glClearColor(0.1, 0.1, 0.1, 1.0)
+
+    # Инициализация роя частиц (частицы не выходят за границы области)
+    if replay is None:
+        swarm = SwarmX2(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+            boundary="clip",
+        )
 
     # Регистрация обработчиков событий
     glfw.set_cursor_pos_callback(window_3d, cursor_position_callback)
     glfw.set_mouse_button_callback(window_3d, mouse_button_callback)
 
-    # Основной цикл оптимизации
-    iteration = 0
-    while iteration < iterCount and not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
-        # ======= Отрисовка 3D =======
-        glfw.make_context_current(window_3d)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-
-        # Камера и вращение для 3D
-        gluPerspective(45, 800 / 600, 0.1, 500)
-
-        # Расстояние камеры и её вращение
-        camera_position = np.array([np.sin(np.radians(rotation_y)) * camera_distance,
-                                    np.sin(np.radians(rotation_x)) * camera_distance,
-                                    camera_distance])
-
-        # Устанавливаем позицию камеры
-        gluLookAt(camera_position[0], camera_position[1], camera_position[2],
-                  0, 0, 0,  # Камера смотрит в центр (0, 0, 0)
-                  0, 1, 0)  # Вектор вверх по оси Y
-
-        draw_axes()
-
-        # Рисуем параболоид
-        x = np.linspace(-30, 100, 100)
-        y = np.linspace(-30, 100, 100)
-        X, Y = np.meshgrid(x, y)
-        Z = X**2 + Y**2
-        draw_surface(X, Y, Z)
-
-        # Отображаем частицы в 3D
-        positions = np.array([particle.position for particle in swarm.particles])
-        glColor3f(0.0, 1.0, 1.0)
-        glPointSize(10)
-        glBegin(GL_POINTS)
-        for pos in positions:
-            glVertex3f(pos[0], pos[1], paraboloid(pos[0], pos[1]))
-        glEnd()
-
-        # ======= Отрисовка 2D =======
-        glfw.make_context_current(window_2d)
-        glClear(GL_COLOR_BUFFER_BIT)
-        glLoadIdentity()
-
-        # Камера и вращение для 2D
-        glOrtho(-100, 100, -100, 100, -1, 1)
-        draw_axes()
-
-        # Рисуем параболоид в 2D
-        draw_surface(X, Y, Z)
-
-        # Отображаем частицы в 2D
-        draw_2d_particles(swarm)
-
-        # Обновление роя частиц
-        swarm.nextIteration()
-
-        # Обновление окна
-        glfw.swap_buffers(window_3d)
-        glfw.swap_buffers(window_2d)
-        glfw.poll_events()
-
-        iteration += 1
+    # Сетки поверхности параболоида берутся из общего кэша (и каталога --surface-cache).
+    # В 3D детализация выбирается по расстоянию камеры, в 2D сетка постоянная.
+    # У каждого окна свой контекст OpenGL, поэтому буферы загружаются в каждое окно отдельно
+    surface_cache = SurfaceMeshCache(directory=args.surface_cache)
+    surface_3d = LevelOfDetailSurface(
+        surface_cache,
+        "paraboloid",
+        paraboloid,
+        (-30, 100),
+        (-30, 100),
+        color=(0.8, 0.8, 0.1),
+        pixelsPerCell=2,
+        minResolution=64,
+    )
+    surface_2d = SurfaceRenderer(
+        surface_cache.getMesh("paraboloid", paraboloid, (-30, 100), (-30, 100), 100, (0.8, 0.8, 0.1))
+    )
+
+    if replay is not None:
+        run_replay(window_3d, window_2d, surface_3d, surface_2d, replay)
+    else:
+        run_optimization(
+            window_3d,
+            window_2d,
+            surface_3d,
+            surface_2d,
+            swarm,
+            args.iterations_per_frame,
+            Telemetry(args.telemetry, summaryInterval=args.summary_interval),
+        )
 
     # Закрытие окна и завершение работы
     glfw.terminate()
@@ -1,13 +1,23 @@
-import glfw
-from OpenGL.GL import *
-from OpenGL.GLU import *
+from particleswarm.lazy import lazyImport
+from particleswarm.rendering import LevelOfDetailSurface, ParticleRenderer
+from particleswarm.replay import ReplayPlayer, createKeyCallback
+from particleswarm.surfacecache import SurfaceMeshCache
+from particleswarm.telemetry import Telemetry
+from particleswarm.worker import OptimizerThread
+import argparse
+import time
 import numpy as np
 from swarm_rastrigin import SwarmRastrigin  # Подкласс роя частиц для Растригина
 from utils import printResult  # Функция для вывода результатов
-import tkinter as tk
-from tkinter import messagebox
 from threading import Thread
 
+# Графические библиотеки загружаются только при первом обращении
+glfw = lazyImport("glfw")
+gl = lazyImport("OpenGL.GL")
+glu = lazyImport("OpenGL.GLU")
+tk = lazyImport("tkinter")
+messagebox = lazyImport("tkinter.messagebox")
+
 # Глобальные переменные для управления вращением и камерами
 rotation_x = 0
 rotation_y = 0
@@ -32,72 +42,53 @@ def rastrigin_function(x, y):
     A = 10
     return A * 2 + (x ** 2 - A * np.cos(2 * np.pi * x)) + (y ** 2 - A * np.cos(2 * np.pi * y))
 
-# Отрисовка поверхности функции Растригина
-def draw_surface(X, Y, Z):
-    glBegin(GL_QUADS)
-    for i in range(len(X) - 1):
-        for j in range(len(Y) - 1):
-            color_value_1 = 0.5 + 0.5 * Z[i, j] / Z.max()
-            color_value_2 = 0.5 + 0.5 * Z[i + 1, j] / Z.max()
-            color_value_3 = 0.5 + 0.5 * Z[i + 1, j + 1] / Z.max()
-            color_value_4 = 0.5 + 0.5 * Z[i, j + 1] / Z.max()
-
-            glColor3f(0.2, color_value_1, 0.8)
-            glVertex3f(X[i, j], Y[i, j], Z[i, j])
-
-            glColor3f(0.2, color_value_2, 0.8)
-            glVertex3f(X[i + 1, j], Y[i, j], Z[i + 1, j])
+# Наибольшее значение функции Растригина в области поиска
+RASTRIGIN_MAX = 80.71
 
-            glColor3f(0.2, color_value_3, 0.8)
-            glVertex3f(X[i + 1, j + 1], Y[i, j + 1], Z[i + 1, j + 1])
-
-            glColor3f(0.2, color_value_4, 0.8)
-            glVertex3f(X[i, j + 1], Y[i, j + 1], Z[i, j + 1])
-    glEnd()
+# Цвет поверхности зависит от высоты. Высота нормируется на максимум по всей области,
+# чтобы сетки разной детализации и разных частей области окрашивались одинаково
+def surface_colors(Z):
+    green = 0.5 + 0.5 * np.clip(Z / RASTRIGIN_MAX, 0.0, 1.0)
+    return np.stack((np.full_like(Z, 0.2), green, np.full_like(Z, 0.8)), axis=-1)
 
 # Отрисовка осей
 def draw_axes():
-    glLineWidth(2)
+    gl.glLineWidth(2)
 
-    glBegin(GL_LINES)
-    glColor3f(1.0, 1.0, 1.0)
+    gl.glBegin(gl.GL_LINES)
+    gl.glColor3f(1.0, 1.0, 1.0)
 
-    glVertex3f(-1000, 0, 0)
-    glVertex3f(1000, 0, 0)
+    gl.glVertex3f(-1000, 0, 0)
+    gl.glVertex3f(1000, 0, 0)
 
-    glVertex3f(0, -1000, 0)
-    glVertex3f(0, 1000, 0)
+    gl.glVertex3f(0, -1000, 0)
+    gl.glVertex3f(0, 1000, 0)
 
-    glVertex3f(0, 0, -1000)
-    glVertex3f(0, 0, 1000)
-    glEnd()
+    gl.glVertex3f(0, 0, -1000)
+    gl.glVertex3f(0, 0, 1000)
+    gl.glEnd()
 
-    glLineWidth(1)
-    glBegin(GL_LINES)
+    gl.glLineWidth(1)
+    gl.glBegin(gl.GL_LINES)
 
     for i in np.arange(-10, 10, 1):
-        glVertex3f(i, -0.1, 0)
-        glVertex3f(i, 0.1, 0)
+        gl.glVertex3f(i, -0.1, 0)
+        gl.glVertex3f(i, 0.1, 0)
 
     for i in np.arange(-10, 10, 1):
-        glVertex3f(-0.1, i, 0)
-        glVertex3f(0.1, i, 0)
+        gl.glVertex3f(-0.1, i, 0)
+        gl.glVertex3f(0.1, i, 0)
 
     for i in np.arange(-10, 10, 1):
-        glVertex3f(0, -0.1, i)
-        glVertex3f(0, 0.1, i)
+        gl.glVertex3f(0, -0.1, i)
+        gl.glVertex3f(0, 0.1, i)
 
-    glEnd()
+    gl.glEnd()
 
-# Отрисовка частиц в 2D
-def draw_particles_2d(swarm):
-    positions = np.array([particle.position for particle in swarm])
-    glColor3f(1.0, 0.0, 0.0)  # Красный цвет для частиц
-    glPointSize(5)
-    glBegin(GL_POINTS)
-    for pos in positions:
-        glVertex2f(pos[0], pos[1])  # Используем только x и y для 2D
-    glEnd()
+# Частицы рисуются из массивов вершин: в 3D высота - уже рассчитанное значение функции,
+# цвет - от желтого (лучшие) до красного (худшие); в 2D - красные точки на плоскости
+particles_3d = ParticleRenderer(pointSize=8, colorByFitness=True)
+particles_2d = ParticleRenderer(pointSize=5, color=(1.0, 0.0, 0.0))
 
 # Обработчик движения мыши
 def mouse_motion_callback(window, xpos, ypos):
@@ -126,8 +117,92 @@ def scroll_callback(window, xoffset, yoffset):
     camera_distance += yoffset * 2  # Умножаем на 2 для ускорения изменения
     camera_distance = max(10, min(200, camera_distance))  # Ограничиваем расстояние камеры
 
+# Отрисовка одного кадра в оба окна
+def draw_frame(window_3d, window_2d, surface, positions, finalFuncs):
+    glfw.make_context_current(window_3d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+    gl.glLoadIdentity()
+
+    glu.gluPerspective(45, 800 / 600, 0.1, 250)
+    glu.gluLookAt(camera_distance, camera_distance, camera_distance, 0, 0, 0, 0, 1, 0)
+
+    gl.glRotatef(rotation_x, 1, 0, 0)
+    gl.glRotatef(rotation_y, 0, 1, 0)
+
+    draw_axes()
+    # Камера стоит в точке (d, d, d), поэтому ее расстояние до центра - d * sqrt(3)
+    surface.draw(np.sqrt(3) * camera_distance)
+
+    # Значения целевой функции включают штраф за выход за границы. Высота и цвет частиц
+    # ограничиваются наибольшим значением функции в области поиска: частицы за границами
+    # не улетают за дальнюю плоскость и не растягивают шкалу цветов остальных частиц
+    heights = np.minimum(finalFuncs, RASTRIGIN_MAX)
+    particles_3d.update(positions, heights, heights)
+    particles_3d.draw()
+
+    glfw.swap_buffers(window_3d)
+    glfw.poll_events()
+
+    # 2D-визуализация
+    glfw.make_context_current(window_2d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+    gl.glLoadIdentity()
+    gl.glOrtho(-5.12, 5.12, -5.12, 5.12, -1, 1)
+
+    particles_2d.update(positions, 0.0)
+    particles_2d.draw()
+
+    glfw.swap_buffers(window_2d)
+    glfw.poll_events()
+
+# Воспроизведение записанной траектории: кадры читаются из файла, рой не пересчитывается
+def run_replay(window_3d, window_2d, surface, player):
+    keyCallback = createKeyCallback(player, glfw)
+    glfw.set_key_callback(window_3d, keyCallback)
+    glfw.set_key_callback(window_2d, keyCallback)
+
+    last_time = time.perf_counter()
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        now = time.perf_counter()
+        player.update(now - last_time)
+        last_time = now
+
+        _, positions, finalFuncs = player.frame
+        glfw.set_window_title(window_3d, "Rastrigin replay: " + player.getStatus())
+        draw_frame(window_3d, window_2d, surface, positions, finalFuncs)
+
+# Рой считается в отдельном потоке, окна рисуют последний готовый снимок его состояния,
+# поэтому расчет не ждет смены кадров, а медленная итерация не останавливает окна.
+# iterations_per_frame - итераций на кадр, 0 - расчет без ожидания кадров
+# telemetry - Telemetry, в который записываются показатели сходимости каждой итерации
+def run_optimization(window_3d, window_2d, surface, swarm, iterations_per_frame, telemetry):
+    telemetry.record(swarm)
+    swarm.addIterationCallback(telemetry)
+
+    optimizer = OptimizerThread(swarm, iterCount, iterationsPerFrame=iterations_per_frame or None)
+    optimizer.start()
+
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        finished = optimizer.finished
+        snapshot = optimizer.getSnapshot()
+        draw_frame(window_3d, window_2d, surface, snapshot.positions, snapshot.finalFuncs)
+
+        # Последний снимок нарисован
+        if finished:
+            break
+
+    optimizer.stop()
+    telemetry.close()
+    print(printResult(swarm, swarm.iteration))
+
 # Основная функция для OpenGL визуализации
-def run_opengl_visualization():
+# replay - ReplayPlayer для воспроизведения записи вместо расчета
+# surface_cache - каталог для сохранения сеток поверхности между запусками
+# iterations_per_frame - итераций роя на кадр, 0 - расчет без ожидания кадров
+# telemetry - файл показателей сходимости, summary_interval - период вывода сводки в консоль
+def run_opengl_visualization(
+    replay=None, surface_cache=None, iterations_per_frame=1, telemetry=None, summary_interval=10
+):
     if not glfw.init():
         print("Не удалось инициализировать GLFW")
         return
@@ -150,121 +225,143 @@ def run_opengl_visualization():
     glfw.set_mouse_button_callback(window_3d, mouse_button_callback)
     glfw.set_scroll_callback(window_3d, scroll_callback)
 
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.1, 0.1, 0.1, 1.0)
-
-    swarm = SwarmRastrigin(
-        swarmsize,
-        minvalues,
-        maxvalues,
-        currentVelocityRatio,
-        localVelocityRatio,
-        globalVelocityRatio,
+    gl.glEnable(gl.GL_DEPTH_TEST)
+    gl.glClearColor(0.1, 0.1, 0.1, 1.0)
+
+    if replay is None:
+        swarm = SwarmRastrigin(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+        )
+
+    # Детализация сетки поверхности выбирается по расстоянию камеры. Построенные сетки
+    # хранятся в кэше (и в каталоге surface_cache), их буферы - в видеопамяти
+    surface = LevelOfDetailSurface(
+        SurfaceMeshCache(directory=surface_cache),
+        "rastrigin",
+        rastrigin_function,
+        (-5.12, 5.12),
+        (-5.12, 5.12),
+        color=surface_colors,
+        pixelsPerCell=2,
+        minResolution=64,
     )
 
-    x = np.linspace(-5.12, 5.12, 100)
-    y = np.linspace(-5.12, 5.12, 100)
-
-    X, Y = np.meshgrid(x, y)
-    Z = rastrigin_function(X, Y)
-    Z = Z - np.min(Z)
-
-    for n in range(iterCount):
-        glfw.make_context_current(window_3d)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-
-        gluPerspective(45, 800 / 600, 0.1, 250)
-        gluLookAt(camera_distance, camera_distance, camera_distance, 0, 0, 0, 0, 1, 0)
-
-        glRotatef(rotation_x, 1, 0, 0)
-        glRotatef(rotation_y, 0, 1, 0)
-
-        draw_axes()
-        draw_surface(X, Y, Z)
-
-        positions = np.array([particle.position for particle in swarm])
-        glColor3f(1.0, 0.0, 0.0)
-        glPointSize(8)
-        glBegin(GL_POINTS)
-        for pos in positions:
-            glVertex3f(pos[0], pos[1], rastrigin_function(pos[0], pos[1]))
-        glEnd()
-
-        swarm.nextIteration()
-
-        print(printResult(swarm, n))
-
-        glfw.swap_buffers(window_3d)
-        glfw.poll_events()
-
-        # 2D-визуализация
-        glfw.make_context_current(window_2d)
-        glClear(GL_COLOR_BUFFER_BIT)
-        glLoadIdentity()
-        glOrtho(-5.12, 5.12, -5.12, 5.12, -1, 1)
-
-        draw_particles_2d(swarm)
-
-        glfw.swap_buffers(window_2d)
-        glfw.poll_events()
+    if replay is not None:
+        run_replay(window_3d, window_2d, surface, replay)
+    else:
+        run_optimization(
+            window_3d,
+            window_2d,
+            surface,
+            swarm,
+            iterations_per_frame,
+            Telemetry(telemetry, summaryInterval=summary_interval),
+        )
 
     glfw.terminate()
 
-# Функция для запуска программы через Tkinter
-def start_optimization():
-    global iterCount, dimension, swarmsize, currentVelocityRatio, localVelocityRatio, globalVelocityRatio
-
-    try:
-        iterCount = int(iter_count_entry.get())
-
-        swarmsize = int(swarmsize_entry.get())
-        currentVelocityRatio = float(velocity_inertia_entry.get())
-        localVelocityRatio = float(velocity_personal_entry.get())
-        globalVelocityRatio = float(velocity_global_entry.get())
-
-        if dimension != 2:
-            messagebox.showerror("Ошибка", "В текущей версии поддерживается только двумерное пространство!")
-            return
-
-        thread = Thread(target=run_opengl_visualization)
-        thread.start()
-    except ValueError:
-        messagebox.showerror("Ошибка", "Все параметры должны быть числовыми!")
-
-# Создание окна Tkinter
-root = tk.Tk()
-root.title("Swarm Optimization")
-
-# Поля для ввода параметров
-tk.Label(root, text="Количество итераций:").pack()
-iter_count_entry = tk.Entry(root)
-iter_count_entry.insert(0, str(iterCount))
-iter_count_entry.pack()
-
-
-tk.Label(root, text="Размер роя:").pack()
-swarmsize_entry = tk.Entry(root)
-swarmsize_entry.insert(0, str(swarmsize))
-swarmsize_entry.pack()
-
-tk.Label(root, text="Коэффициент инерции:").pack()
-velocity_inertia_entry = tk.Entry(root)
-velocity_inertia_entry.insert(0, str(currentVelocityRatio))
-velocity_inertia_entry.pack()
-
-tk.Label(root, text="Коэффициент личного опыта:").pack()
-velocity_personal_entry = tk.Entry(root)
-velocity_personal_entry.insert(0, str(localVelocityRatio))
-velocity_personal_entry.pack()
-
-tk.Label(root, text="Коэффициент глобального опыта:").pack()
-velocity_global_entry = tk.Entry(root)
-velocity_global_entry.insert(0, str(globalVelocityRatio))
-velocity_global_entry.pack()
-
-# Кнопка для запуска визуализации
-start_button = tk.Button(root, text="Начать визуализацию", command=start_optimization)
-start_button.pack(pady=20)
+# Аргументы командной строки: --replay включает воспроизведение записи вместо расчета
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Swarm optimization on the Rastrigin function")
+    parser.add_argument("--replay", help="play back a trajectory recorded with --record")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed")
+    parser.add_argument("--frame-skip", type=int, default=1, help="show every k-th frame")
+    parser.add_argument("--loop", action="store_true", help="loop the playback")
+    parser.add_argument("--surface-cache", help="directory for cached surface meshes")
+    parser.add_argument(
+        "--iterations-per-frame",
+        type=int,
+        default=1,
+        help="optimiser iterations per drawn frame, 0 - run without waiting for frames",
+    )
+    parser.add_argument("--telemetry", help="write per-iteration metrics to .csv, .jsonl or .npz")
+    parser.add_argument(
+        "--summary-interval", type=int, default=10, help="print progress every k iterations"
+    )
+    return parser.parse_args(argv)
+
+# Окно Tkinter для ввода параметров и запуска визуализации
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    # Запись воспроизводится сразу, без окна параметров
+    if args.replay is not None:
+        run_opengl_visualization(
+            ReplayPlayer(args.replay, speed=args.speed, frameSkip=args.frame_skip, loop=args.loop),
+            surface_cache=args.surface_cache,
+        )
+        return
 
-root.mainloop()
+    # Функция для запуска программы через Tkinter
+    def start_optimization():
+        global iterCount, dimension, swarmsize, currentVelocityRatio, localVelocityRatio, globalVelocityRatio
+
+        try:
+            iterCount = int(iter_count_entry.get())
+
+            swarmsize = int(swarmsize_entry.get())
+            currentVelocityRatio = float(velocity_inertia_entry.get())
+            localVelocityRatio = float(velocity_personal_entry.get())
+            globalVelocityRatio = float(velocity_global_entry.get())
+
+            if dimension != 2:
+                messagebox.showerror("Ошибка", "В текущей версии поддерживается только двумерное пространство!")
+                return
+
+            thread = Thread(
+                target=run_opengl_visualization,
+                kwargs={
+                    "surface_cache": args.surface_cache,
+                    "iterations_per_frame": args.iterations_per_frame,
+                    "telemetry": args.telemetry,
+                    "summary_interval": args.summary_interval,
+                },
+            )
+            thread.start()
+        except ValueError:
+            messagebox.showerror("Ошибка", "Все параметры должны быть числовыми!")
+
+    # Создание окна Tkinter
+    root = tk.Tk()
+    root.title("Swarm Optimization")
+
+    # Поля для ввода параметров
+    tk.Label(root, text="Количество итераций:").pack()
+    iter_count_entry = tk.Entry(root)
+    iter_count_entry.insert(0, str(iterCount))
+    iter_count_entry.pack()
+
+
+    tk.Label(root, text="Размер роя:").pack()
+    swarmsize_entry = tk.Entry(root)
+    swarmsize_entry.insert(0, str(swarmsize))
+    swarmsize_entry.pack()
+
+    tk.Label(root, text="Коэффициент инерции:").pack()
+    velocity_inertia_entry = tk.Entry(root)
+    velocity_inertia_entry.insert(0, str(currentVelocityRatio))
+    velocity_inertia_entry.pack()
+
+    tk.Label(root, text="Коэффициент личного опыта:").pack()
+    velocity_personal_entry = tk.Entry(root)
+    velocity_personal_entry.insert(0, str(localVelocityRatio))
+    velocity_personal_entry.pack()
+
+    tk.Label(root, text="Коэффициент глобального опыта:").pack()
+    velocity_global_entry = tk.Entry(root)
+    velocity_global_entry.insert(0, str(globalVelocityRatio))
+    velocity_global_entry.pack()
+
+    # Кнопка для запуска визуализации
+    start_button = tk.Button(root, text="Начать визуализацию", command=start_optimization)
+    start_button.pack(pady=20)
+
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
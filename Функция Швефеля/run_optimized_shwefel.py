@@ -1,10 +1,20 @@
-import glfw
-from OpenGL.GL import *
-from OpenGL.GLU import *
+from particleswarm.lazy import lazyImport
+from particleswarm.rendering import LevelOfDetailSurface, ParticleRenderer
+from particleswarm.replay import ReplayPlayer, createKeyCallback
+from particleswarm.surfacecache import SurfaceMeshCache
+from particleswarm.telemetry import Telemetry
+from particleswarm.worker import OptimizerThread
+import argparse
+import time
 import numpy as np
 from swarm_schwefel import SwarmSchwefel
 from utils import printResult
 
+# Графические библиотеки загружаются только при первом обращении
+glfw = lazyImport("glfw")
+gl = lazyImport("OpenGL.GL")
+glu = lazyImport("OpenGL.GLU")
+
 # Глобальные переменные для управления вращением
 rotation_x = 0
 rotation_y = 0
@@ -28,49 +38,35 @@ globalVelocityRatio = 5.0
 def schwefel_function(x, y):
     return 418.9829 * 2 - (x * np.sin(np.sqrt(np.abs(x))) + y * np.sin(np.sqrt(np.abs(y))))
 
-# Отрисовка поверхности функции Швефеля
-def draw_surface(X, Y, Z):
-    glBegin(GL_QUADS)
-    for i in range(len(X) - 1):
-        for j in range(len(Y) - 1):
-            glColor3f(0.2, 0.5, 0.8)  # Цвет поверхности
-            glVertex3f(X[i, j], Y[i, j], Z[i, j])
-            glVertex3f(X[i + 1, j], Y[i, j], Z[i + 1, j])
-            glVertex3f(X[i + 1, j + 1], Y[i, j + 1], Z[i + 1, j + 1])
-            glVertex3f(X[i, j + 1], Y[i, j + 1], Z[i, j + 1])
-    glEnd()
+# Верхняя оценка функции в области поиска: x * sin(sqrt(|x|)) на [-500, 500] не меньше -418.9829
+SCHWEFEL_MAX = 2 * 418.9829 * dimension
 
 # Отрисовка осей с разметкой
 def draw_axes():
-    glLineWidth(2)
-    glBegin(GL_LINES)
+    gl.glLineWidth(2)
+    gl.glBegin(gl.GL_LINES)
 
     # Ось X (красная)
-    glColor3f(1.0, 1.0, 1.0)
-    glVertex3f(-10000, 0, 0)
-    glVertex3f(10000, 0, 0)
+    gl.glColor3f(1.0, 1.0, 1.0)
+    gl.glVertex3f(-10000, 0, 0)
+    gl.glVertex3f(10000, 0, 0)
 
     # Ось Y (зелёная)
-    glColor3f(1.0, 1.0, 1.0)
-    glVertex3f(0, -10000, 0)
-    glVertex3f(0, 10000, 0)
+    gl.glColor3f(1.0, 1.0, 1.0)
+    gl.glVertex3f(0, -10000, 0)
+    gl.glVertex3f(0, 10000, 0)
 
     # Ось Z (синяя)
-    glColor3f(1.0, 1.0, 1.0)
-    glVertex3f(0, 0, -10000)
-    glVertex3f(0, 0, 10000)
-
-    glEnd()
-
-# Отрисовка частиц в 2D
-def draw_particles_2d(swarm):
-    positions = np.array([particle.position for particle in swarm])
-    glColor3f(1.0, 0.0, 0.0)  # Красный цвет для частиц
-    glPointSize(5)
-    glBegin(GL_POINTS)
-    for pos in positions:
-        glVertex2f(pos[0], pos[1])  # Используем только x и y для 2D
-    glEnd()
+    gl.glColor3f(1.0, 1.0, 1.0)
+    gl.glVertex3f(0, 0, -10000)
+    gl.glVertex3f(0, 0, 10000)
+
+    gl.glEnd()
+
+# Частицы рисуются из массивов вершин. Цвет в 3D - от желтого (лучшие) до красного (худшие)
+# по уже рассчитанным значениям целевой функции; в 2D - красные точки на плоскости
+particles_3d = ParticleRenderer(pointSize=8, colorByFitness=True)
+particles_2d = ParticleRenderer(pointSize=5, color=(1.0, 0.0, 0.0))
 
 # Обработчик движения мыши
 def mouse_motion_callback(window, xpos, ypos):
@@ -93,8 +89,126 @@ def mouse_button_callback(window, button, action, mods):
         elif action == glfw.RELEASE:
             mouse_dragging = False
 
+# Отрисовка одного кадра в оба окна
+def draw_frame(window_3d, window_2d, surface, positions, finalFuncs):
+    # Обновляем 3D-окно
+    glfw.make_context_current(window_3d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
+    gl.glLoadIdentity()
+
+    # Камера
+    glu.gluPerspective(45, 800 / 600, 0.1, 2500)
+    glu.gluLookAt(1200, 1200, 1200, 0, 0, 0, 0, 1, 0)
+
+    # Вращение сцены
+    gl.glRotatef(rotation_x, 1, 0, 0)
+    gl.glRotatef(rotation_y, 0, 1, 0)
+
+    # Рисуем оси
+    draw_axes()
+
+    # Рисуем поверхность функции Швефеля. Камера стоит в точке (1200, 1200, 1200),
+    # ее расстояние до центра сцены - 1200 * sqrt(3)
+    surface.draw(np.sqrt(3) * 1200)
+
+    # Рисуем 3D частицы. Задача трехмерная, поэтому высота точки на двумерной поверхности
+    # считается по первым двум координатам (одной векторной операцией для всего роя)
+    # Цвет - по значению целевой функции, ограниченному ее оценкой в области поиска:
+    # штраф частиц за границами не растягивает шкалу цветов остальных частиц
+    particles_3d.update(
+        positions,
+        schwefel_function(positions[:, 0], positions[:, 1]),
+        np.minimum(finalFuncs, SCHWEFEL_MAX),
+    )
+    particles_3d.draw()
+
+    glfw.swap_buffers(window_3d)
+    glfw.poll_events()
+
+    # Обновляем 2D-окно
+    glfw.make_context_current(window_2d)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+    gl.glLoadIdentity()
+
+    # Устанавливаем ортогональную проекцию для 2D
+    gl.glOrtho(-500, 500, -500, 500, -1, 1)  # 2D пространство для частиц
+    gl.glViewport(0, 0, 800, 600)  # Размеры окна 2D
+
+    # Рисуем 2D частицы
+    particles_2d.update(positions, 0.0)
+    particles_2d.draw()
+
+    glfw.swap_buffers(window_2d)
+    glfw.poll_events()
+
+# Воспроизведение записанной траектории: кадры читаются из файла, рой не пересчитывается
+def run_replay(window_3d, window_2d, surface, player):
+    keyCallback = createKeyCallback(player, glfw)
+    glfw.set_key_callback(window_3d, keyCallback)
+    glfw.set_key_callback(window_2d, keyCallback)
+
+    last_time = time.perf_counter()
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        now = time.perf_counter()
+        player.update(now - last_time)
+        last_time = now
+
+        _, positions, finalFuncs = player.frame
+        glfw.set_window_title(window_3d, "Schwefel replay: " + player.getStatus())
+        draw_frame(window_3d, window_2d, surface, positions, finalFuncs)
+
+# Рой считается в отдельном потоке, окна рисуют последний готовый снимок его состояния,
+# поэтому расчет не ждет смены кадров, а медленная итерация не останавливает окна.
+# iterations_per_frame - итераций на кадр, 0 - расчет без ожидания кадров
+# telemetry - Telemetry, в который записываются показатели сходимости каждой итерации
+def run_optimization(window_3d, window_2d, surface, swarm, iterations_per_frame, telemetry):
+    telemetry.record(swarm)
+    swarm.addIterationCallback(telemetry)
+
+    optimizer = OptimizerThread(swarm, iterCount, iterationsPerFrame=iterations_per_frame or None)
+    optimizer.start()
+
+    while not glfw.window_should_close(window_3d) and not glfw.window_should_close(window_2d):
+        finished = optimizer.finished
+        snapshot = optimizer.getSnapshot()
+        draw_frame(window_3d, window_2d, surface, snapshot.positions, snapshot.finalFuncs)
+
+        # Последний снимок нарисован
+        if finished:
+            break
+
+    optimizer.stop()
+    telemetry.close()
+    print(printResult(swarm, swarm.iteration))
+
+# Аргументы командной строки: --replay включает воспроизведение записи вместо расчета
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Swarm optimization on the Schwefel function")
+    parser.add_argument("--replay", help="play back a trajectory recorded with --record")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed")
+    parser.add_argument("--frame-skip", type=int, default=1, help="show every k-th frame")
+    parser.add_argument("--loop", action="store_true", help="loop the playback")
+    parser.add_argument("--surface-cache", help="directory for cached surface meshes")
+    parser.add_argument(
+        "--iterations-per-frame",
+        type=int,
+        default=1,
+        help="optimiser iterations per drawn frame, 0 - run without waiting for frames",
+    )
+    parser.add_argument("--telemetry", help="write per-iteration metrics to .csv, .jsonl or .npz")
+    parser.add_argument(
+        "--summary-interval", type=int, default=10, help="print progress every k iterations"
+    )
+    return parser.parse_args(argv)
+
 # Основная функция
-def main():
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    replay = None
+    if args.replay is not None:
+        replay = ReplayPlayer(args.replay, speed=args.speed, frameSkip=args.frame_skip, loop=args.loop)
+
     if not glfw.init():
         print("Не удалось инициализировать GLFW")
         return
@@ -117,78 +231,44 @@ def main():
     glfw.set_cursor_pos_callback(window_3d, mouse_motion_callback)
     glfw.set_mouse_button_callback(window_3d, mouse_button_callback)
 
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.1, 0.1, 0.1, 1.0)
-
-    # Создаём рой частиц
-    swarm = SwarmSchwefel(
-        swarmsize,
-        minvalues,
-        maxvalues,
-        currentVelocityRatio,
-        localVelocityRatio,
-        globalVelocityRatio,
+    gl.glEnable(gl.GL_DEPTH_TEST)
+    gl.glClearColor(0.1, 0.1, 0.1, 1.0)
+
+    # Создаём рой частиц (при воспроизведении записи он не нужен)
+    if replay is None:
+        swarm = SwarmSchwefel(
+            swarmsize,
+            minvalues,
+            maxvalues,
+            currentVelocityRatio,
+            localVelocityRatio,
+            globalVelocityRatio,
+        )
+
+    # Сетка поверхности функции Швефеля: детализация выбирается по расстоянию камеры,
+    # построенные сетки хранятся в кэше (и в каталоге --surface-cache)
+    surface = LevelOfDetailSurface(
+        SurfaceMeshCache(directory=args.surface_cache),
+        "schwefel",
+        schwefel_function,
+        (-500, 500),
+        (-500, 500),
+        color=(0.2, 0.5, 0.8),
+        pixelsPerCell=2,
+        minResolution=64,
     )
 
-    # Создаём сетку для визуализации функции Швефеля
-    x = np.linspace(-500, 500, 200)
-    y = np.linspace(-500, 500, 200)
-
-    X, Y = np.meshgrid(x, y)
-    Z = schwefel_function(X, Y)
-
-    for n in range(iterCount):
-        # Обновляем 3D-окно
-        glfw.make_context_current(window_3d)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-
-        # Камера
-        gluPerspective(45, 800 / 600, 0.1, 2500)
-        gluLookAt(1200, 1200, 1200, 0, 0, 0, 0, 1, 0)
-
-        # Вращение сцены
-        glRotatef(rotation_x, 1, 0, 0)
-        glRotatef(rotation_y, 0, 1, 0)
-
-        # Рисуем оси
-        draw_axes()
-
-        # Рисуем поверхность функции Швефеля
-        draw_surface(X, Y, Z)
-
-        # Рисуем 3D частицы
-        positions = np.array([particle.position for particle in swarm])
-        glColor3f(1.0, 0.0, 0.0)  # Красный цвет для частиц
-        glPointSize(8)
-        glBegin(GL_POINTS)
-        for pos in positions:
-            glVertex3f(pos[0], pos[1], schwefel_function(pos[0], pos[1]))
-        glEnd()
-
-        # Обновляем рой частиц
-        swarm.nextIteration()
-
-        # Выводим информацию об итерации
-        print(printResult(swarm, n))
-
-        glfw.swap_buffers(window_3d)
-        glfw.poll_events()
-
-        # Обновляем 2D-окно
-        glfw.make_context_current(window_2d)
-        glClear(GL_COLOR_BUFFER_BIT)
-        glLoadIdentity()
-
-        # Устанавливаем ортогональную проекцию для 2D
-        glOrtho(-500, 500, -500, 500, -1, 1)  # 2D пространство для частиц
-        glViewport(0, 0, 800, 600)  # Размеры окна 2D
-
-        # Рисуем 2D частицы
-        draw_particles_2d(swarm)
-
-        glfw.swap_buffers(window_2d)
-        glfw.poll_events()
+    if replay is not None:
+        run_replay(window_3d, window_2d, surface, replay)
+    else:
+        run_optimization(
+            window_3d,
+            window_2d,
+            surface,
+            swarm,
+            args.iterations_per_frame,
+            Telemetry(args.telemetry, summaryInterval=args.summary_interval),
+        )
 
     glfw.terminate()
 